@@ -1,10 +1,94 @@
 # blackjack/analysis.py
 
 import math
-import statistics
+import numpy as np
+
+class RunningStats:
+    """
+        Mergeable one-pass accumulator (Welford updates, Chan et al. merge):
+            - count, mean and M2 (sum of squared deviations) give the population variance
+            - min and max
+            - ruin_count = number of values at or below ruin_threshold
+        Workers can fill their own RunningStats and combine them with merge(); the merged
+        result does not depend on how the values were split between workers.
+    """
+    __slots__ = ("count", "mean", "m2", "min", "max", "ruin_count", "ruin_threshold")
+
+    def __init__(self, ruin_threshold=0.0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.ruin_count = 0
+        self.ruin_threshold = ruin_threshold
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.ruin_threshold:
+            self.ruin_count += 1
+        return self
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+        return self
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max, self.ruin_count = other.min, other.max, other.ruin_count
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.ruin_count += other.ruin_count
+        return self
+
+    def variance(self):
+        # Population variance, matching statistics.pstdev
+        return self.m2 / self.count if self.count else 0.0
+
+    def std_dev(self):
+        return math.sqrt(self.variance())
+
+    def sample_variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+def merge_stats(accumulators):
+    merged = RunningStats()
+    for accumulator in accumulators:
+        merged.merge(accumulator)
+    return merged
+
+def accumulate_results(results, stats=None):
+    # Fold result dicts into a RunningStats over final bankrolls (clipped at 0)
+    if stats is None:
+        stats = RunningStats()
+    for res in results:
+        stats.push(max(res["final_bankroll"], 0.0))
+    return stats
 
 def compute_basic_stats(results):
-    if not results:
+    if isinstance(results, RunningStats):
+        stats = results
+    else:
+        stats = RunningStats().extend(results)
+
+    if not stats.count:
         return {
             "mean": 0,
             "std_dev": 0,
@@ -12,16 +96,11 @@ def compute_basic_stats(results):
             "max": 0,
         }
 
-    mean_val = statistics.mean(results)
-    std_dev_val = statistics.pstdev(results)
-    min_val = min(results)
-    max_val = max(results)
-
     return {
-        "mean": mean_val,
-        "std_dev": std_dev_val,
-        "min": min_val,
-        "max": max_val,
+        "mean": stats.mean,
+        "std_dev": stats.std_dev(),
+        "min": stats.min,
+        "max": stats.max,
     }
 
 def confidence_interval(mean, stddev, n, confidence=0.95):
@@ -31,6 +110,26 @@ def confidence_interval(mean, stddev, n, confidence=0.95):
     margin_of_error = z * (stddev / math.sqrt(n))
     return (mean - margin_of_error, mean + margin_of_error)
 
+def batch_means_half_width(batch_stats, z=1.96):
+    """
+        95% CI half-width of the overall mean from a RunningStats of batch means. Batches long
+        enough to span many shoes are close to independent even though hands within a shoe are
+        not, so this does not give the falsely tight interval per-hand variance would.
+    """
+    if batch_stats.count < 2:
+        return math.inf
+    return z * math.sqrt(batch_stats.sample_variance() / batch_stats.count)
+
+def wilson_interval(successes, n, z=1.96):
+    # Wilson score interval for a proportion; sensible even with 0 or n successes
+    if n <= 0:
+        return (0.0, 1.0)
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return (max(center - margin, 0.0), min(center + margin, 1.0))
+
 def compute_risk_of_ruin_monte_carlo(bankroll_history, ruin_threshold=0):
     if not bankroll_history:
         return 0.0
@@ -39,34 +138,73 @@ def compute_risk_of_ruin_monte_carlo(bankroll_history, ruin_threshold=0):
     return bankrupt_count / len(bankroll_history)
 
 
+def _history_blocks(histories, block_rows):
+    # Row blocks of a (possibly memory-mapped) history matrix, so only one block is in RAM
+    for start in range(0, histories.shape[0], block_rows):
+        yield np.asarray(histories[start:start + block_rows], dtype=np.float64)
+
+def final_history_values(histories, block_rows=4096):
+    """
+        Last recorded bankroll of every row of a history matrix (runs x samples, NaN after a
+        run's last sample, as written by history_file runs). Rows with no samples are skipped.
+    """
+    finals = []
+    for block in _history_blocks(histories, block_rows):
+        recorded = ~np.isnan(block)
+        last = block.shape[1] - 1 - np.argmax(recorded[:, ::-1], axis=1)
+        has_samples = recorded.any(axis=1)
+        finals.append(block[np.flatnonzero(has_samples), last[has_samples]])
+    return np.concatenate(finals) if finals else np.empty(0)
+
+def mean_bankroll_history(histories, block_rows=4096):
+    # Mean bankroll at each sample over the runs still recorded there, read block by block
+    total = np.zeros(histories.shape[1])
+    count = np.zeros(histories.shape[1])
+    for block in _history_blocks(histories, block_rows):
+        recorded = ~np.isnan(block)
+        total += np.where(recorded, block, 0.0).sum(axis=0)
+        count += recorded.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+def _final_bankroll_stats(results):
+    # results: a RunningStats, result dicts, RunningStats from several workers, any
+    # (possibly one-shot) iterable of either, or a history matrix (see final_history_values)
+    if isinstance(results, RunningStats):
+        return results
+    if isinstance(results, np.ndarray) and results.ndim == 2:
+        return RunningStats().extend(np.maximum(final_history_values(results), 0.0).tolist())
+    stats = RunningStats()
+    for item in results:
+        if isinstance(item, RunningStats):
+            stats.merge(item)
+        else:
+            stats.push(max(item["final_bankroll"], 0.0))
+    return stats
+
 def analyze_simulation_results(results, bankroll):
-    if not results:
+    final_stats = _final_bankroll_stats(results)
+    n = final_stats.count
+    if not n:
         return {}
-    
-    final_bankrolls = [max(res["final_bankroll"], 0.0) for res in results]
-    net_profit = [max(res["final_bankroll"], 0.0) - bankroll for res in results]
 
-    stats = compute_basic_stats(net_profit)
-    mean = stats["mean"]
-    stddev = stats["std_dev"]
-    n = len(final_bankrolls)
+    # Net profit is the clipped final bankroll shifted by the starting bankroll
+    mean = final_stats.mean - bankroll
+    stddev = final_stats.std_dev()
 
     # Confidence Interval
     ci_lower, ci_upper = confidence_interval(mean, stddev, n)
 
     # Risk of Ruin
-    ror = compute_risk_of_ruin_monte_carlo(final_bankrolls, ruin_threshold=0.0)
-
-    final_stats = compute_basic_stats(final_bankrolls)
-
+    ror = final_stats.ruin_count / n
 
     analysis_results = {
         "mean_profit": mean,
         "stddev_profit": stddev,
         "CI_95": (ci_lower, ci_upper),
         "risk_of_ruin": ror,
-        "min_final_bankroll": max(final_stats["min"], 0.0),
-        "max_final_bankroll": final_stats["max"],
+        "min_final_bankroll": max(final_stats.min, 0.0),
+        "max_final_bankroll": final_stats.max,
     }
 
     return analysis_results
@@ -0,0 +1,443 @@
+# blackjack/batch.py
+
+import os
+import numpy as np
+from .cards import RANKS, ACE
+from .history import HISTORY_POLICIES, create_history_file, history_samples, open_history_file
+from .hand import ACTIVE, STOOD, BUSTED, SURRENDERED, HARD_VALUES
+from .rules import BlackjackRules
+from .strategy import (BasicStrategy, RANK_COLUMNS, HAND_ROWS, PAIR_ROWS,
+                       HIT, STAND, DOUBLE_HIT, DOUBLE_STAND, SPLIT, SPLIT_HIT, SURRENDER_HIT)
+
+# Split hands per round are capped; with 8 slots the cap is practically never reached
+MAX_HANDS = 8
+
+_HARD_VALUES = np.array(HARD_VALUES, dtype=np.int16)
+_RANK_COLUMNS = np.array(RANK_COLUMNS, dtype=np.int64)
+_HAND_ROWS = np.array(HAND_ROWS, dtype=np.int64)
+_PAIR_ROWS = np.array(PAIR_ROWS, dtype=np.int64)
+
+class BatchSimulator:
+    """
+        Plays many independent shoes in lockstep with NumPy arrays, one lane per shoe.
+        Uses the same BlackjackRules and compiled BasicStrategy tables as Simulator, and
+        run_simulation returns one run_simulation-style result dict per lane.
+    """
+    def __init__(self, num_shoes=1000, seed=None, debug=False, rng=None):
+        self.debug = debug
+        self.num_shoes = num_shoes
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+        self.rules = None
+        self.strategy = None
+        self.num_hands = 1000
+
+    def setup(self, num_decks=6, num_hands=1000000, base_bet=15, double_after_split=True,
+              dealer_hits_soft_17=False, blackjack_payout=1.5, surrender_allowed=False,
+              insurance_threshold=3, counting_system="hi-lo", strategy_name="basic",
+              spread_name="basic", penetration=0.25):
+
+        self.num_hands = num_hands
+        self.rules = BlackjackRules(decks=num_decks, dealer_hits_soft_17=dealer_hits_soft_17, blackjack_payout=blackjack_payout, surrender_allowed=surrender_allowed, double_after_split_allowed=double_after_split, deck_penetration=penetration)
+        self.strategy = BasicStrategy(bet=base_bet, strategy_name=strategy_name, spread_name=spread_name, counting_system=counting_system, insurance_count_threshold=insurance_threshold)
+        self._compile()
+
+        self.shoe_size = 52 * num_decks
+        self._base_shoe = np.tile(np.arange(len(RANKS), dtype=np.uint8), 4 * num_decks)
+        self.shoes = np.empty((self.num_shoes, self.shoe_size), dtype=np.uint8)
+        self._flat_shoes = self.shoes.reshape(-1)
+        self.cursor = np.zeros(self.num_shoes, dtype=np.int64)
+        self.running_count = np.zeros(self.num_shoes)
+        self._reshuffle(np.arange(self.num_shoes))
+
+        hand_shape = (MAX_HANDS, self.num_shoes)
+        self._first = np.zeros(hand_shape, dtype=np.int64)
+        self._hard = np.zeros(hand_shape, dtype=np.int64)
+        self._aces = np.zeros(hand_shape, dtype=np.int64)
+        self._num_cards = np.zeros(hand_shape, dtype=np.int64)
+        self._pair = np.zeros(hand_shape, dtype=bool)
+        self._status = np.zeros(hand_shape, dtype=np.int8)
+        self._bets = np.zeros(hand_shape)
+
+    def _compile(self):
+        strategy = self.strategy
+        self._table = np.frombuffer(strategy._table, dtype=np.uint8).copy()
+        self._layers = strategy._layers
+        self._tags = np.array(strategy._tags, dtype=np.float64)
+
+        # Same per-true-count records as BasicStrategy.count_record, one array per field
+        self._records_low = strategy._records_low
+        multipliers, insure, bases = zip(*strategy._records)
+        self._record_multipliers = np.array(multipliers, dtype=np.float64)
+        self._record_insure = np.array(insure, dtype=bool)
+        self._record_bases = np.array(bases, dtype=np.int64)
+
+# ================SHOES=================
+    def _reshuffle(self, lanes):
+        self.shoes[lanes] = self.rng.permuted(np.tile(self._base_shoe, (len(lanes), 1)), axis=1)
+        self.cursor[lanes] = 0
+        self.running_count[lanes] = 0
+
+    def _deal(self, lanes, count=True):
+        cursor = self.cursor[lanes]
+        empty = cursor >= self.shoe_size
+        if empty.any():
+            self._reshuffle(lanes[empty])           # If a shoe is empty, reshuffle it
+            cursor = self.cursor[lanes]
+        codes = self._flat_shoes.take(lanes * self.shoe_size + cursor)
+        self.cursor[lanes] = cursor + 1
+        if count:
+            self.running_count[lanes] += self._tags[codes]
+        return codes
+
+    def _true_count(self, lanes):
+        decks_remaining = (self.shoe_size - self.cursor[lanes]) / 52
+        running_count = self.running_count[lanes]
+        return np.where(decks_remaining < 1, running_count, running_count / np.maximum(decks_remaining, 1))
+# ======================================
+
+    def _record_index(self, lanes):
+        index = np.floor(self._true_count(lanes)).astype(np.int64) - self._records_low
+        return np.clip(index, 0, len(self._record_bases) - 1)
+
+    def _get_bet(self, lanes):
+        return self._record_multipliers[self._record_index(lanes)] * self.strategy.bet
+
+    def _decide(self, lanes, hard, aces, pair_code, dealer_card):
+        soft = (aces > 0) & (hard <= 11)
+        total = hard + 10 * soft
+        if self._layers > 1:
+            base = self._record_bases[self._record_index(lanes)]
+        else:
+            base = 0
+        row = np.where(pair_code >= 0, _PAIR_ROWS[np.maximum(pair_code, 0)], _HAND_ROWS[soft.astype(np.int64), np.minimum(total, 31)])
+        return self._table[base + row + _RANK_COLUMNS[dealer_card]]
+
+    def step(self, lanes):
+        # One round on lanes: shoes past the penetration card are reshuffled first
+        reshuffle = (self.shoe_size - self.cursor[lanes]) / 52 < self.rules.deck_penetration
+        if reshuffle.any():
+            self._reshuffle(lanes[reshuffle])
+        return self.play_round(lanes)
+
+    def play_round(self, lanes):
+        rules = self.rules
+        strategy = self.strategy
+        n = len(lanes)
+
+        # The bet is sized before the player's own cards are counted, as in Simulator.play_hand
+        first_card = self._deal(lanes, count=False)
+        second_card = self._deal(lanes, count=False)
+        bet = self._get_bet(lanes)
+        self.running_count[lanes] += self._tags[first_card] + self._tags[second_card]
+        dealer_card = self._deal(lanes)
+        hole_card = self._deal(lanes, count=False)
+
+        round_net = np.zeros(n)
+        amount_bet = np.zeros(n)
+        done = np.zeros(n, dtype=bool)
+
+        player_bj = ((first_card == ACE) & (_HARD_VALUES[second_card] == 10)) | ((second_card == ACE) & (_HARD_VALUES[first_card] == 10))
+        dealer_bj = ((dealer_card == ACE) & (_HARD_VALUES[hole_card] == 10)) | ((hole_card == ACE) & (_HARD_VALUES[dealer_card] == 10))
+
+        # Player blackjack: push against a dealer blackjack, otherwise paid at the blackjack payout
+        paid = player_bj & ~dealer_bj
+        round_net[paid] = bet[paid] * rules.blackjack_payout
+        self.running_count[lanes[paid]] += self._tags[hole_card[paid]]
+        amount_bet[player_bj] += bet[player_bj]
+        done |= player_bj
+
+        if strategy.insurance_count_threshold:
+            insured = ~done & (dealer_card == ACE)
+            insured[insured] = self._record_insure[self._record_index(lanes[insured])]
+            amount_bet[insured] += bet[insured] / 2
+            insurance_paid = insured & dealer_bj
+            amount_bet[insurance_paid] += bet[insurance_paid]
+            done |= insurance_paid
+            round_net[insured & ~dealer_bj] = -bet[insured & ~dealer_bj] / 2
+
+        lost = ~done & dealer_bj
+        round_net[lost] = -bet[lost]
+        amount_bet[lost] += bet[lost]
+        done |= lost
+
+        playing = np.flatnonzero(~done)
+        if len(playing):
+            net, wagered, hole = self._play_out(lanes[playing], first_card[playing], second_card[playing], bet[playing], dealer_card[playing], hole_card[playing])
+            round_net[playing] += net
+            amount_bet[playing] += wagered
+            self.running_count[lanes[playing]] += self._tags[hole]
+
+        return round_net, amount_bet
+
+    def _play_out(self, lanes, first_card, second_card, bet, dealer_card, hole_card):
+        rules = self.rules
+        n = len(lanes)
+
+        # Hand state is slot-major, so each split slot is a contiguous row of lanes.
+        # The buffers are reused every round; a slot is fully written before it is read.
+        first = self._first[:, :n]
+        hard = self._hard[:, :n]
+        aces = self._aces[:, :n]
+        num_cards = self._num_cards[:, :n]
+        pair = self._pair[:, :n]
+        status = self._status[:, :n]
+        bets = self._bets[:, :n]
+        num_player_hands = np.ones(n, dtype=np.int64)
+
+        first[0] = first_card
+        hard[0] = _HARD_VALUES[first_card] + _HARD_VALUES[second_card]
+        aces[0] = (first_card == ACE).astype(np.int64) + (second_card == ACE)
+        num_cards[0] = 2
+        pair[0] = first_card == second_card
+        status[0] = ACTIVE
+        bets[0] = bet
+
+        # ================PLAYER TURN=================
+        slot = 0
+        while slot < MAX_HANDS:
+            slot_hard = hard[slot]
+            slot_aces = aces[slot]
+            slot_status = status[slot]
+            rows = np.flatnonzero((num_player_hands > slot) & (slot_status == ACTIVE))
+            if not len(rows):
+                if slot + 1 >= num_player_hands.max():
+                    break
+                slot += 1
+                continue
+
+            while len(rows):
+                pair_code = np.where(pair[slot, rows], first[slot, rows], -1)
+                action = self._decide(lanes[rows], slot_hard[rows], slot_aces[rows], pair_code, dealer_card[rows])
+
+                can_two_card = num_cards[slot, rows] == 2
+                do_hit = action == HIT
+                stand = action == STAND
+
+                double = ((action == DOUBLE_HIT) | (action == DOUBLE_STAND)) & can_two_card
+                do_hit |= (action == DOUBLE_HIT) & ~can_two_card
+                stand |= (action == DOUBLE_STAND) & ~can_two_card
+
+                splits = (action == SPLIT) | (action == SPLIT_HIT)
+                if splits.any():
+                    split_allowed = (action == SPLIT) | rules.double_after_split_allowed
+                    split = splits & pair[slot, rows] & split_allowed & (num_player_hands[rows] < MAX_HANDS)
+                    do_hit |= splits & ~split
+                else:
+                    split = splits
+
+                surrender = action == SURRENDER_HIT
+                if rules.surrender_allowed:
+                    do_hit |= surrender & ~can_two_card
+                    surrender &= can_two_card
+                else:
+                    do_hit |= surrender
+                    surrender = np.zeros_like(surrender)
+
+                slot_status[rows[stand]] = STOOD
+                slot_status[rows[surrender]] = SURRENDERED
+
+                if double.any():
+                    r = rows[double]
+                    bets[slot, r] *= 2
+                    do_hit |= double
+
+                if split.any():
+                    r = rows[split]
+                    new_card_for_first = self._deal(lanes[r])
+                    new_card_for_second = self._deal(lanes[r])
+                    new_slot = num_player_hands[r]
+                    pair_card = first[slot, r]
+                    for target, codes in ((slot, new_card_for_first), (new_slot, new_card_for_second)):
+                        first[target, r] = pair_card
+                        hard[target, r] = _HARD_VALUES[pair_card] + _HARD_VALUES[codes]
+                        aces[target, r] = (pair_card == ACE).astype(np.int64) + (codes == ACE)
+                        num_cards[target, r] = 2
+                        pair[target, r] = pair_card == codes
+                        status[target, r] = ACTIVE
+                        bets[target, r] = bets[slot, r]
+                    num_player_hands[r] += 1
+
+                if do_hit.any():
+                    r = rows[do_hit]
+                    codes = self._deal(lanes[r])
+                    slot_hard[r] += _HARD_VALUES[codes]
+                    slot_aces[r] += codes == ACE
+                    num_cards[slot, r] += 1
+                    pair[slot, r] = False
+                    busted = slot_hard[r] > 21
+                    slot_status[r[busted]] = BUSTED
+                    r = rows[double]
+                    stood = slot_status[r] == ACTIVE
+                    slot_status[r[stood]] = STOOD
+
+                rows = rows[slot_status[rows] == ACTIVE]
+            slot += 1
+        # ============================================
+
+        # ================DEALER TURN=================
+        dealer_hard = _HARD_VALUES[dealer_card].astype(np.int64) + _HARD_VALUES[hole_card]
+        dealer_aces = (dealer_card == ACE).astype(np.int64) + (hole_card == ACE)
+        dealer_soft = (dealer_aces > 0) & (dealer_hard <= 11)
+        dealer_total = dealer_hard + 10 * dealer_soft
+        rows = np.arange(n)
+        while True:
+            hits = (dealer_total[rows] < 17) | ((dealer_total[rows] == 17) & dealer_soft[rows] & rules.dealer_hits_soft_17)
+            rows = rows[hits]
+            if not len(rows):
+                break
+            codes = self._deal(lanes[rows])
+            dealer_hard[rows] += _HARD_VALUES[codes]
+            dealer_aces[rows] += codes == ACE
+            dealer_soft[rows] = (dealer_aces[rows] > 0) & (dealer_hard[rows] <= 11)
+            dealer_total[rows] = dealer_hard[rows] + 10 * dealer_soft[rows]
+        # ============================================
+
+        used = num_player_hands.max()
+        hard = hard[:used]
+        status = status[:used]
+        bets = bets[:used]
+        soft = (aces[:used] > 0) & (hard <= 11)
+        total = hard + 10 * soft
+        in_play = np.arange(used)[:, None] < num_player_hands[None, :]
+
+        outcome = np.sign(total - dealer_total).astype(np.float64)
+        outcome[:, dealer_total > 21] = 1.0
+        outcome[status == BUSTED] = -1.0
+        outcome[status == SURRENDERED] = -0.5
+        bets = bets * in_play
+        return (outcome * bets).sum(axis=0), bets.sum(axis=0), hole_card
+
+    def run_simulation(self, num_hands=None, bankroll_limit=None, history="full", history_stride=1, history_file=None,
+                       on_progress=None, progress_every=10000):
+        # history_file = .npy matrix (history.create_history_file; created if missing) whose
+        # first num_shoes rows receive the lanes' histories instead of an in-memory array.
+        # on_progress(hands) is called every progress_every hands; returning True stops all lanes.
+        if num_hands:
+            self.num_hands = num_hands
+        if history not in HISTORY_POLICIES:
+            raise ValueError(f"Unknown history policy '{history}', expected one of: {', '.join(HISTORY_POLICIES)}")
+        if history_stride < 1:
+            raise ValueError("History stride must be at least 1")
+        stride = history_stride if history in ("stride", "minmax") else 1
+        if history_file is not None and history not in ("full", "stride"):
+            raise ValueError("A history file needs the 'full' or 'stride' history policy")
+
+        num_shoes = self.num_shoes
+        bankroll = np.full(num_shoes, float(bankroll_limit) if bankroll_limit else 0.0)
+        amount_bet = np.zeros(num_shoes)
+        hands_played = np.zeros(num_shoes, dtype=np.int64)
+        alive = np.ones(num_shoes, dtype=bool)
+
+        # Online accumulators, same meaning as BankrollRecorder
+        result_sum = np.zeros(num_shoes)
+        result_sum_sq = np.zeros(num_shoes)
+        min_bankroll = bankroll.copy()
+        max_bankroll = bankroll.copy()
+        peak_bankroll = bankroll.copy()
+        max_drawdown = np.zeros(num_shoes)
+
+        num_samples = history_samples(self.num_hands, history, stride)
+        samples = np.zeros(num_shoes, dtype=np.int64)
+        if history_file is None:
+            bankroll_history = np.empty((num_shoes, num_samples))
+        elif os.path.exists(history_file):
+            bankroll_history = open_history_file(history_file, mode="r+")
+            if bankroll_history.shape[0] < num_shoes or bankroll_history.shape[1] < num_samples:
+                raise ValueError(f"History file {history_file} is {bankroll_history.shape[0]} x {bankroll_history.shape[1]}, "
+                                 f"need at least {num_shoes} x {num_samples}")
+        else:
+            bankroll_history = create_history_file(history_file, num_shoes, num_samples)
+        if history == "minmax":
+            history_min = np.empty((num_shoes, num_samples))
+            history_max = np.empty((num_shoes, num_samples))
+            bucket_min = np.full(num_shoes, np.inf)
+            bucket_max = np.full(num_shoes, -np.inf)
+
+        def flush(lanes):
+            lanes = lanes[np.isfinite(bucket_min[lanes])]
+            index = samples[lanes]
+            bankroll_history[lanes, index] = bankroll[lanes]
+            history_min[lanes, index] = bucket_min[lanes]
+            history_max[lanes, index] = bucket_max[lanes]
+            samples[lanes] += 1
+            bucket_min[lanes] = np.inf
+            bucket_max[lanes] = -np.inf
+
+        for hand_index in range(self.num_hands):
+            lanes = np.flatnonzero(alive)
+            if not len(lanes):
+                break
+            round_net, wagered = self.step(lanes)
+            bankroll[lanes] += round_net
+            amount_bet[lanes] += wagered
+            hands_played[lanes] += 1
+
+            current = bankroll[lanes]
+            result_sum[lanes] += round_net
+            result_sum_sq[lanes] += round_net * round_net
+            min_bankroll[lanes] = np.minimum(min_bankroll[lanes], current)
+            max_bankroll[lanes] = np.maximum(max_bankroll[lanes], current)
+            peak = np.maximum(peak_bankroll[lanes], current)
+            peak_bankroll[lanes] = peak
+            max_drawdown[lanes] = np.maximum(max_drawdown[lanes], peak - current)
+
+            end_of_bucket = (hand_index + 1) % stride == 0
+            if history == "full" or (history == "stride" and end_of_bucket):
+                bankroll_history[lanes, samples[lanes]] = current
+                samples[lanes] += 1
+            elif history == "minmax":
+                bucket_min[lanes] = np.minimum(bucket_min[lanes], current)
+                bucket_max[lanes] = np.maximum(bucket_max[lanes], current)
+                if end_of_bucket:
+                    flush(lanes)
+
+            if bankroll_limit:
+                ruined = lanes[current < 0]
+                alive[ruined] = False
+                if history == "minmax":
+                    flush(ruined)
+            if on_progress and (hand_index + 1) % progress_every == 0 and on_progress(hand_index + 1):
+                break
+
+        if history == "minmax":
+            flush(np.arange(num_shoes))          # Keep trailing partial buckets
+        elif history == "stride":
+            # Lanes that stopped mid-stride (ruin) still end on their final bankroll
+            partial = np.flatnonzero(hands_played % stride != 0)
+            bankroll_history[partial, samples[partial]] = bankroll[partial]
+            samples[partial] += 1
+        if history_file is not None:
+            for i in range(num_shoes):
+                bankroll_history[i, samples[i]:] = np.nan
+            bankroll_history.flush()
+
+        results = []
+        for i in range(num_shoes):
+            count = int(hands_played[i])
+            mean = result_sum[i] / count
+            result = {
+                "hands_played": count,
+                "final_bankroll": float(bankroll[i]),
+                "amount_bet": float(amount_bet[i]),
+                "avg_profit_per_hand": float(bankroll[i]) / count,
+                "House Advantage (%)":  (1 - (bankroll[i] + amount_bet[i]) / amount_bet[i]) * 100,
+                "bankroll_history": bankroll_history[i, :samples[i]],
+                "history_policy": history,
+                "history_stride": stride,
+                "result_sum": float(result_sum[i]),
+                "result_sum_sq": float(result_sum_sq[i]),
+                "mean_result": float(mean),
+                "stddev_result": float(np.sqrt(max(result_sum_sq[i] / count - mean * mean, 0.0))),
+                "min_bankroll": float(min_bankroll[i]),
+                "max_bankroll": float(max_bankroll[i]),
+                "peak_bankroll": float(peak_bankroll[i]),
+                "max_drawdown": float(max_drawdown[i]),
+            }
+            if history == "minmax":
+                result["history_min"] = history_min[i, :samples[i]]
+                result["history_max"] = history_max[i, :samples[i]]
+            if history_file is not None:
+                result.update(history_file=history_file, history_row=i, history_length=int(samples[i]))
+            results.append(result)
+        return results
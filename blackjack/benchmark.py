@@ -0,0 +1,111 @@
+# blackjack/benchmark.py
+
+import json
+import platform
+import time
+import timeit
+import numpy as np
+from .cards import Card, Shoe, CompactShoe
+from .counting import load_counting_systems
+from .rules import BlackjackRules
+from .simulation import Simulator
+from .strategy import BasicStrategy
+
+BASELINE_PATH = "benchmarks/baseline.json"
+
+# Every simulation case starts from this setup and changes one thing
+BASE_SETUP = dict(num_decks=6, base_bet=10, counting_system="hi-lo", strategy_name="basic",
+                  spread_name="basic", penetration=0.25, compact_shoe=True)
+
+def simulation_cases():
+    """
+        (name, setup kwargs) for each simulation benchmark: every counting system, both
+        charts, each spread, deck counts, penetrations, both shoe types and batch shuffles.
+    """
+    cases = [("sim/base", BASE_SETUP)]
+    for system in load_counting_systems():
+        cases.append((f"sim/counting={system}", dict(BASE_SETUP, counting_system=system)))
+    cases.append(("sim/chart=deviations", dict(BASE_SETUP, strategy_name="deviations")))
+    cases.append(("sim/spread=none", dict(BASE_SETUP, spread_name="none")))
+    for decks in (1, 2, 8):
+        cases.append((f"sim/decks={decks}", dict(BASE_SETUP, num_decks=decks)))
+    for penetration in (0.5, 1.5):
+        cases.append((f"sim/penetration={penetration}", dict(BASE_SETUP, penetration=penetration)))
+    cases.append(("sim/shoe=objects", dict(BASE_SETUP, compact_shoe=False)))
+    cases.append(("sim/shuffles=batch", dict(BASE_SETUP, shuffles="batch")))
+    return cases
+
+def bench_simulation(setup_kwargs, num_hands=20000, repeat=3, seed=0):
+    # Best-of-repeat hands per second for Simulator.run_simulation
+    best = 0.0
+    for _ in range(repeat):
+        simulator = Simulator(seed=seed)
+        simulator.setup(**setup_kwargs)
+        start = time.perf_counter()
+        simulator.run_simulation(num_hands=num_hands, history="off")
+        best = max(best, num_hands / (time.perf_counter() - start))
+    return best
+
+def _ops_per_second(func, number, repeat=3):
+    return number / min(timeit.repeat(func, number=number, repeat=repeat))
+
+def micro_benchmarks(number=20000):
+    """
+        Calls per second of the per-hand building blocks.
+    """
+    rules = BlackjackRules(decks=6)
+    strategy = BasicStrategy(bet=10, strategy_name="deviations")
+    strategy.running_count = 4
+    hand = [Card("A", "♠"), Card("6", "♥"), Card("4", "♦")]
+    codes = [card.code for card in hand]
+    dealer_card = Card("10", "♣")
+    shoe = Shoe(6)
+    compact_shoe = CompactShoe(6)
+
+    return {
+        "micro/hand_value": _ops_per_second(lambda: rules.hand_value(hand), number),
+        "micro/hand_value_codes": _ops_per_second(lambda: rules.hand_value_codes(codes), number),
+        "micro/deal_card": _ops_per_second(lambda: shoe.cards.append(shoe.deal_card()), number),
+        "micro/deal_code_compact": _ops_per_second(compact_shoe.deal_code, number),
+        "micro/decide_player_action": _ops_per_second(lambda: strategy.decide_player_action(hand, dealer_card, rules, 3.0), number),
+        "micro/decide_action": _ops_per_second(lambda: strategy.decide_action(21, True, -1, 8, 3.0), number),
+        "micro/get_bet": _ops_per_second(lambda: strategy.get_bet(3.0), number),
+    }
+
+def run_benchmarks(num_hands=20000, micro_number=20000, cases=None):
+    results = {}
+    for name, setup_kwargs in (cases if cases is not None else simulation_cases()):
+        results[name] = bench_simulation(setup_kwargs, num_hands)
+    results.update(micro_benchmarks(micro_number))
+    return results
+
+def write_results(results, path):
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "unit": "operations per second (hands per second for sim/*)",
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path, "r") as f:
+        return json.load(f)["results"]
+
+def compare_to_baseline(results, baseline, threshold=0.2):
+    """
+        Benchmarks that got more than threshold (a fraction) slower than the baseline, as
+        (name, baseline, current, change) tuples. Benchmarks missing on either side are ignored.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        change = current / reference - 1
+        if change < -threshold:
+            regressions.append((name, reference, current, change))
+    return regressions
@@ -0,0 +1,83 @@
+# blackjack/cache.py
+
+import hashlib
+import os
+import pickle
+import yaml
+
+CACHE_DIR = ".cache"
+
+# path -> (stat key, content hash, entry); entry = {"data": parsed yaml, "compiled": {key: value}}
+_memory = {}
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _cache_path(path, digest):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, CACHE_DIR, f"{os.path.splitext(name)[0]}-{digest[:16]}.pickle")
+
+def _write(path, digest, entry):
+    # Write atomically; a read-only config folder just means no disk cache
+    cache_path = _cache_path(path, digest)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+def _entry(path):
+    stat_key = _stat_key(path)
+    cached = _memory.get(path)
+    if cached is not None and cached[0] == stat_key:
+        return cached
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached[1] == digest:
+        cached = (stat_key, digest, cached[2])          # Touched but unchanged
+        _memory[path] = cached
+        return cached
+
+    entry = None
+    try:
+        with open(_cache_path(path, digest), "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    if entry is None:
+        entry = {"data": yaml.safe_load(raw), "compiled": {}}
+        _write(path, digest, entry)
+
+    cached = (stat_key, digest, entry)
+    _memory[path] = cached
+    return cached
+
+def load_config(path):
+    """
+        Parsed contents of a YAML config file, cached in-process (checked against the file's
+        mtime and size) and on disk next to it under .cache/, keyed by a hash of the contents.
+        Editing the file invalidates both. The result is shared: treat it as read-only.
+    """
+    return _entry(path)[2]["data"]
+
+def compiled(path, key, build):
+    """
+        build(parsed yaml) for the config file at path, cached like load_config under key
+        (e.g. ("chart", "deviations")). build must return something picklable and the result
+        is shared between callers, so it must not be modified.
+    """
+    _, digest, entry = _entry(path)
+    table = entry["compiled"]
+    if key not in table:
+        table[key] = build(entry["data"])
+        _write(path, digest, entry)
+    return table[key]
+
+def clear_memory_cache():
+    _memory.clear()
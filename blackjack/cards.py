@@ -1,55 +1,140 @@
 # blackjack/cards.py
 
 import random
+from array import array
+import numpy as np
+
+RANKS = [str(n) for n in range(2, 11)] + ["J", "Q", "K", "A"]
+RANK_CODES = {rank: code for code, rank in enumerate(RANKS)}
+RANK_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]
+ACE = RANK_CODES["A"]
+
+def shuffle_cards(cards, rng=None):
+    """
+        Shuffle a list of cards or an array('B') of rank codes in place. rng may be the
+        random module, a random.Random or a numpy Generator; numpy shuffles rank code
+        arrays in one bulk call instead of a Python-level swap loop.
+    """
+    if rng is None:
+        rng = random
+    if isinstance(rng, np.random.Generator):
+        if isinstance(cards, array):
+            rng.shuffle(np.frombuffer(cards, dtype=np.uint8))
+        else:
+            cards[:] = [cards[i] for i in rng.permutation(len(cards))]
+    else:
+        rng.shuffle(cards)
 
 class Card:
     def __init__(self, rank, suit):
         self.rank = rank
         self.suit = suit
+        self.code = RANK_CODES[rank]
 
 
     def __repr__(self):
         return f"{self.rank}{self.suit}"
     
     def value(self):
-        if self.rank in ["J", "Q", "K"]:
-            return 10
-        elif self.rank == "A":
-            return 11           # We'll treat Aces as 1 here and handle 11 logic elsewhere 
-        else:
-            return int(self.rank)
+        return RANK_VALUES[self.code]   # Aces are 11 here, soft/hard logic is handled elsewhere
 
 class Deck:
-    ranks = [str(n) for n in range(2, 11)] + ["J", "Q", "K", "A"]
+    ranks = RANKS
     suits = ["♠", "♥", "♦", "♣"]
 
     def __init__(self):
         self.cards = [Card(rank, suit) for suit in self.suits for rank in self.ranks]
 
-    def shuffle(self):
-        random.shuffle(self.cards)
+    def shuffle(self, rng=None):
+        shuffle_cards(self.cards, rng)
 
 class Shoe:
-    def __init__(self, num_decks):
+    def __init__(self, num_decks, rng=None):
         self.num_decks = num_decks
+        self.rng = rng if rng is not None else random.Random()
         self.cards = []
         self._build_shoe()
 
     def _build_shoe(self):
+        # One shuffle of the whole shoe; shuffling each deck first added nothing
         self.cards = []
         for _ in range(self.num_decks):
-            d = Deck()
-            d.shuffle()
-            self.cards.extend(d.cards)
-        random.shuffle(self.cards)
+            self.cards.extend(Deck().cards)
+        shuffle_cards(self.cards, self.rng)
+
+    def reshuffle(self):
+        self._build_shoe()
 
     def deal_card(self):
         if not self.cards:
             self._build_shoe()            # If shoe is empty, rebuild it
         return self.cards.pop()
 
+    def deal_code(self):
+        return self.deal_card().code
+
+    def rank_counts(self):
+        # Number of undealt cards of each rank code
+        counts = [0] * len(RANKS)
+        for card in self.cards:
+            counts[card.code] += 1
+        return counts
+
     def cards_remaining(self):
         return len(self.cards)
 
     def decks_remaining(self):
-        return len(self.cards) / 52
\ No newline at end of file
+        return len(self.cards) / 52
+
+class CompactShoe:
+    """
+        Shoe stored as an array of rank codes (indexes into RANKS) with a deal cursor.
+        The same buffer is reshuffled in place, so no Card objects are created while dealing.
+        With shuffles (a shuffles.ShuffleBank or ShuffleStream), each reshuffle copies in the
+        source's next pre-shuffled shoe instead of shuffling.
+    """
+    def __init__(self, num_decks, rng=None, shuffles=None):
+        if shuffles is not None and shuffles.num_decks != num_decks:
+            raise ValueError(f"Shuffle source has {shuffles.num_decks}-deck shoes, expected {num_decks}")
+        self.num_decks = num_decks
+        self.rng = rng if rng is not None else random.Random()
+        self.shuffles = shuffles
+        self.cards = array("B", range(len(RANKS))) * (4 * num_decks)
+        self.cursor = 0
+        self._codes = np.frombuffer(self.cards, dtype=np.uint8)     # Shares the buffer
+        self.reshuffle()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_codes"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._codes = np.frombuffer(self.cards, dtype=np.uint8)
+
+    def reshuffle(self):
+        if self.shuffles is not None:
+            self._codes[:] = self.shuffles.next_shoe()
+        else:
+            shuffle_cards(self.cards, self.rng)
+        self.cursor = 0
+
+    def deal_card(self):
+        if self.cursor >= len(self.cards):
+            self.reshuffle()              # If shoe is empty, reshuffle it
+        code = self.cards[self.cursor]
+        self.cursor += 1
+        return code
+
+    deal_code = deal_card
+
+    def rank_counts(self):
+        # Number of undealt cards of each rank code
+        return np.bincount(self._codes[self.cursor:], minlength=len(RANKS))
+
+    def cards_remaining(self):
+        return len(self.cards) - self.cursor
+
+    def decks_remaining(self):
+        return (len(self.cards) - self.cursor) / 52
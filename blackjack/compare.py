@@ -0,0 +1,188 @@
+# blackjack/compare.py
+
+import math
+import random
+from array import array
+import numpy as np
+from .analysis import RunningStats, batch_means_half_width
+from .cards import RANKS, shuffle_cards
+from .shuffles import ShuffleBank
+from .simulation import Simulator
+
+class SharedShoe:
+    """
+        One shuffled card stream shared by several simulators. The buffer holds the current
+        shoe followed by the already shuffled next one, so a round that runs past the end of
+        the current shoe keeps dealing real cards. start is where the next round begins.
+        With shuffles (a shuffles.ShuffleBank or ShuffleStream) shoes come from it instead.
+    """
+    def __init__(self, num_decks, rng, shuffles=None):
+        self.num_decks = num_decks
+        self.rng = rng
+        self.shuffles = shuffles
+        self.size = len(RANKS) * 4 * num_decks
+        self.cards = self._shuffled() + self._shuffled()
+        self.start = 0
+
+    def _shuffled(self):
+        if self.shuffles is not None:
+            return array("B", self.shuffles.next_shoe().tobytes())
+        cards = array("B", range(len(RANKS))) * (4 * self.num_decks)
+        shuffle_cards(cards, self.rng)
+        return cards
+
+    def decks_remaining(self):
+        return (self.size - self.start) / 52
+
+    def next_shoe(self, start=0):
+        # Move on to the next shoe, dealing from start (cards already used from it this round)
+        self.cards = self.cards[self.size:] + self._shuffled()
+        self.start = start
+
+class ShoeView:
+    # A simulator's own deal cursor into a SharedShoe, reset to the shared start every round
+    def __init__(self, shared):
+        self.shared = shared
+        self.cursor = shared.start
+
+    def deal_code(self):
+        code = self.shared.cards[self.cursor]
+        self.cursor += 1
+        return code
+
+    deal_card = deal_code
+
+    def _shoe_end(self):
+        # Past the end of the current shoe the view is dealing from the next one
+        size = self.shared.size
+        return size if self.cursor < size else 2 * size
+
+    def cards_remaining(self):
+        return self._shoe_end() - self.cursor
+
+    def decks_remaining(self):
+        return self.cards_remaining() / 52
+
+    def rank_counts(self):
+        codes = np.frombuffer(self.shared.cards, dtype=np.uint8)[self.cursor:self._shoe_end()]
+        return np.bincount(codes, minlength=len(RANKS))
+
+def compare_configurations(configs, num_hands=100000, seed=None, names=None, shuffles=None, batches=20):
+    """
+        Play every configuration (a dict of Simulator.setup arguments) on the same card stream
+        and compare each one with the first, hand by hand (common random numbers).
+            - every round starts at the same shoe position for all configurations; afterwards
+              each one sees (and counts) the cards the others drew beyond its own, like cards
+              dealt to other seats, so all stay on one stream
+            - all configurations share num_decks and penetration, since they share the shoe
+            - shuffles = a shuffle bank (path or shuffles.ShuffleBank) to replay, so separate
+              comparisons can be run on exactly the same shoes
+        Returns per-configuration results and, for each configuration after the first, the mean
+        per-hand difference from the first with its 95% CI, next to the CI two independent runs
+        of the same length would give. Both CIs come from the means of `batches` equal batches
+        of hands, since with spreads or deviations hands within a shoe are not independent.
+    """
+    if len(configs) < 2:
+        raise ValueError("Need at least two configurations to compare")
+    names = names or [f"config {index}" for index in range(len(configs))]
+
+    simulators = []
+    for config in configs:
+        simulator = Simulator(seed=seed)
+        simulator.setup(**dict(config, compact_shoe=True))
+        simulators.append(simulator)
+    rules = simulators[0].rules
+    for simulator, name in zip(simulators, names):
+        if simulator.rules.decks != rules.decks or simulator.rules.deck_penetration != rules.deck_penetration:
+            raise ValueError(f"'{name}' must use the same num_decks and penetration as '{names[0]}' to share a shoe")
+
+    if isinstance(shuffles, str):
+        shuffles = ShuffleBank(shuffles)
+    if shuffles is not None and shuffles.num_decks != rules.decks:
+        raise ValueError(f"Shuffle bank has {shuffles.num_decks}-deck shoes, expected {rules.decks}")
+    shared = SharedShoe(rules.decks, random.Random(seed), shuffles)
+    views = [ShoeView(shared) for _ in simulators]
+    for simulator, view in zip(simulators, views):
+        simulator.shoe = view
+
+    results = [RunningStats(ruin_threshold=-math.inf) for _ in simulators]
+    differences = [RunningStats(ruin_threshold=-math.inf) for _ in simulators[1:]]
+    round_results = [0.0] * len(simulators)
+
+    # Per-batch means of each configuration and of each paired difference
+    batch_hands = max(1, num_hands // batches)
+    batch_sums = [0.0] * len(simulators)
+    batch_results = [RunningStats(ruin_threshold=-math.inf) for _ in simulators]
+    batch_differences = [RunningStats(ruin_threshold=-math.inf) for _ in simulators[1:]]
+
+    def end_batch(hands):
+        for index, stats in enumerate(batch_results):
+            stats.push(batch_sums[index] / hands)
+        for index, stats in enumerate(batch_differences, 1):
+            stats.push((batch_sums[index] - batch_sums[0]) / hands)
+        batch_sums[:] = [0.0] * len(simulators)
+
+    for hand in range(num_hands):
+        if shared.decks_remaining() < rules.deck_penetration:
+            shared.next_shoe()
+            for simulator in simulators:
+                simulator.strategy.reset_count()
+
+        for index, (simulator, view) in enumerate(zip(simulators, views)):
+            view.cursor = shared.start
+            round_results[index] = simulator.play_hand()
+            simulator.hands_played += 1
+            results[index].push(round_results[index])
+            batch_sums[index] += round_results[index]
+
+        end = max(view.cursor for view in views)
+        for simulator, view in zip(simulators, views):
+            strategy = simulator.strategy
+            for code in shared.cards[view.cursor:end]:
+                strategy.update_count_code(code)
+        if end >= shared.size:
+            # The round ran into the next shoe: its count starts with the cards already dealt from it
+            shared.next_shoe(end - shared.size)
+            for simulator in simulators:
+                strategy = simulator.strategy
+                strategy.reset_count()
+                for code in shared.cards[:shared.start]:
+                    strategy.update_count_code(code)
+        else:
+            shared.start = end
+
+        first = round_results[0]
+        for index, stats in enumerate(differences, 1):
+            stats.push(round_results[index] - first)
+        if (hand + 1) % batch_hands == 0:
+            end_batch(batch_hands)
+    if num_hands % batch_hands:
+        end_batch(num_hands % batch_hands)
+
+    report = {"hands": num_hands, "configs": [], "differences": []}
+    for name, simulator, stats in zip(names, simulators, results):
+        report["configs"].append({
+            "name": name,
+            "mean_result": stats.mean,
+            "stddev_result": stats.std_dev(),
+            "amount_bet": simulator.amount_bet,
+            "House Advantage (%)": -stats.mean * stats.count / simulator.amount_bet * 100 if simulator.amount_bet else 0.0,
+        })
+    for index, stats in enumerate(differences, 1):
+        paired = batch_differences[index - 1]
+        half_width = batch_means_half_width(paired)
+        # Two independent runs: the variances of their batch means add
+        independent_variance = batch_results[0].sample_variance() + batch_results[index].sample_variance()
+        independent_half_width = 1.96 * math.sqrt(independent_variance / paired.count) if paired.count >= 2 else math.inf
+        paired_variance = paired.sample_variance()
+        report["differences"].append({
+            "name": f"{names[index]} - {names[0]}",
+            "mean": stats.mean,
+            "stddev": stats.std_dev(),
+            "batches": paired.count,
+            "CI_95": (stats.mean - half_width, stats.mean + half_width),
+            "independent_CI_95": (stats.mean - independent_half_width, stats.mean + independent_half_width),
+            # Hands two independent runs would need for the same CI width, per paired hand
+            "variance_reduction": independent_variance / paired_variance if paired_variance else math.inf,
+        })
+    return report
@@ -0,0 +1,23 @@
+# blackjack/counting.py
+
+from .cache import compiled, load_config
+from .cards import RANKS
+
+COUNTING_CONFIG = "config/counting.yaml"
+
+# Column in the counting.yaml tag list for each rank code (2-9, T, A)
+TAG_COLUMNS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8, 9]
+
+def load_counting_systems(file_path=COUNTING_CONFIG):
+    return load_config(file_path)
+
+def compile_tags(tags):
+    if len(tags) != 10:
+        raise ValueError(f"Expected 10 count tags (2-9, T, A), got {len(tags)}")
+    return [tags[TAG_COLUMNS[code]] for code in range(len(RANKS))]
+
+def load_count_tags(counting_system, file_path=COUNTING_CONFIG):
+    systems = load_counting_systems(file_path)
+    if counting_system not in systems:
+        raise ValueError(f"Unknown counting system '{counting_system}', expected one of: {', '.join(systems)}")
+    return compiled(file_path, ("tags", counting_system), lambda data: compile_tags(data[counting_system]["tags"]))
@@ -0,0 +1,455 @@
+# blackjack/ev.py
+
+from collections import OrderedDict
+import numpy as np
+from .cards import ACE
+from .strategy import (BasicStrategy, RANK_COLUMNS, HAND_ROWS, PAIR_ROWS, LAYER_SIZE,
+                       HIT, STAND, DOUBLE_HIT, DOUBLE_STAND, SPLIT, SPLIT_HIT, SURRENDER_HIT)
+
+# Shoe compositions are tuples of 10 counts in chart column order: 2-9, T, A
+NUM_VALUES = 10
+TEN, ACE_INDEX = 8, 9
+CARD_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+
+# Dealer outcomes, in the order dealer_probabilities returns them
+DEALER_OUTCOMES = ["17", "18", "19", "20", "21", "bust"]
+BUST = 5
+
+# Rank code of each composition index (tens as the 10), for chart pair rows
+_INDEX_CODES = [0, 1, 2, 3, 4, 5, 6, 7, 8, ACE]
+
+def shoe_composition(num_decks):
+    return tuple(4 * num_decks * 4 if index == TEN else 4 * num_decks for index in range(NUM_VALUES))
+
+def composition_from_rank_counts(rank_counts):
+    # Composition from per-rank-code counts (e.g. Shoe.rank_counts())
+    counts = [0] * NUM_VALUES
+    for code, count in enumerate(rank_counts):
+        counts[RANK_COLUMNS[code]] += count
+    return tuple(counts)
+
+def _remove(comp, index):
+    return comp[:index] + (comp[index] - 1,) + comp[index + 1:]
+
+def _add_card(total, soft, index):
+    # (total, soft) after drawing the card at index; soft means an ace is counted as 11
+    if index == ACE_INDEX and total + 11 <= 21:
+        return total + 11, True
+    total += 1 if index == ACE_INDEX else CARD_VALUES[index]
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+# _add_card for every state, indexed by [soft][total][index]
+_NEXT_STATE = [[[_add_card(total, soft, index) for index in range(NUM_VALUES)] for total in range(33)] for soft in (False, True)]
+
+def _peek_excluded(upcard):
+    # Hole card the dealer has already checked for: a ten under an ace, an ace under a ten
+    if upcard == ACE_INDEX:
+        return TEN
+    if upcard == TEN:
+        return ACE_INDEX
+    return -1
+
+def _dealer_moves(rules):
+    # For each [soft][total] the dealer draws on: (index, next total, next soft, outcome)
+    # per card, where outcome is the final outcome index or -1 if the dealer keeps drawing
+    def outcome(total, soft):
+        if rules.dealer_should_hit_total(total, soft):
+            return -1
+        return BUST if total > 21 else total - 17
+    return [[[(index,) + _NEXT_STATE[soft][total][index] + (outcome(*_NEXT_STATE[soft][total][index]),)
+              for index in range(NUM_VALUES)] for total in range(33)] for soft in (False, True)]
+
+class EVCalculator:
+    """
+        Exact composition-dependent expected values for one rule set, per unit bet.
+            - dealer_probabilities = dealer final-total distribution, given the dealer has no blackjack
+            - stand / hit / double / split / surrender EVs for a player hand against an upcard
+            - house_edge = EV of a whole round played with the best action on every hand, or
+              with the actions of a strategy.yaml chart (chart=name)
+        The dealer peeks for blackjack, so every player decision is conditioned on the hole
+        card not completing a natural, including the probability of each card the player draws.
+        Split hands are played out independently from the post-split composition without
+        resplitting; like the Simulator, they may hit (split aces too), and double if the
+        rules allow DAS. Results are memoized on composition, so repeated queries are cheap.
+    """
+    def __init__(self, rules, composition=None):
+        self.rules = rules
+        self.composition = composition if composition is not None else shoe_composition(rules.decks)
+        self._dealer_cache = {}
+        self._dealer_root_cache = {}
+        self._play_cache = {}
+        self._chart_cache = {}
+        self._charts = {}
+        self._moves = _dealer_moves(rules)
+
+    # ================DEALER=================
+    def _dealer_draw(self, comp, total, soft, weight, probs):
+        # Add weight * (distribution of the dealer drawing from (total, soft)) into probs
+        weight /= sum(comp)
+        for index, new_total, new_soft, outcome in self._moves[soft][total]:
+            count = comp[index]
+            if not count:
+                continue
+            if outcome >= 0:
+                probs[outcome] += weight * count
+            else:
+                p = weight * count
+                sub = self._dealer(comp[:index] + (count - 1,) + comp[index + 1:], new_total, new_soft)
+                probs[0] += p * sub[0]
+                probs[1] += p * sub[1]
+                probs[2] += p * sub[2]
+                probs[3] += p * sub[3]
+                probs[4] += p * sub[4]
+                probs[5] += p * sub[5]
+
+    def _dealer(self, comp, total, soft):
+        key = (comp, total, soft)
+        cached = self._dealer_cache.get(key)
+        if cached is not None:
+            return cached
+        probs = [0.0] * 6
+        self._dealer_draw(comp, total, soft, 1.0, probs)
+        self._dealer_cache[key] = probs
+        return probs
+
+    def dealer_probabilities(self, upcard, comp=None):
+        """
+            - upcard = composition index (0-9) of the dealer's upcard
+            - comp = shoe composition with the upcard (and any seen cards) removed
+        """
+        if comp is None:
+            comp = _remove(self.composition, upcard)
+        key = (comp, upcard)
+        cached = self._dealer_root_cache.get(key)
+        if cached is not None:
+            return cached
+
+        excluded = _peek_excluded(upcard)
+        n = sum(comp) - (comp[excluded] if excluded >= 0 else 0)
+        up_total, up_soft = _add_card(0, False, upcard)
+        probs = [0.0] * 6
+        for index, total, soft, outcome in self._moves[up_soft][up_total]:
+            count = comp[index]
+            if not count or index == excluded:
+                continue
+            if outcome >= 0:
+                probs[outcome] += count / n
+            else:
+                self._dealer_draw(_remove(comp, index), total, soft, count / n, probs)
+        self._dealer_root_cache[key] = probs
+        return probs
+
+    def dealer_blackjack_probability(self, upcard, comp=None):
+        if comp is None:
+            comp = _remove(self.composition, upcard)
+        excluded = _peek_excluded(upcard)
+        if excluded < 0:
+            return 0.0
+        return comp[excluded] / sum(comp)
+
+    # ================PLAYER=================
+    def _draw_probabilities(self, comp, upcard):
+        # Probability of each next card, given the hole card (still in comp) is not a natural
+        n = sum(comp)
+        excluded = _peek_excluded(upcard)
+        if excluded < 0:
+            return [count / n for count in comp]
+        no_natural = comp[excluded]
+        scale = (n - 1) * (n - no_natural)
+        return [comp[index] * (n - 1 - no_natural + (index == excluded)) / scale for index in range(NUM_VALUES)]
+
+    def stand_ev(self, total, comp, upcard):
+        if total > 21:
+            return -1.0
+        return expected_settlement(total, self.dealer_probabilities(upcard, comp))
+
+    def _best_after_hit(self, total, soft, comp, upcard):
+        # Best of standing and hitting once more cards have been drawn (no double or surrender)
+        if total > 21:
+            return -1.0
+        key = (comp, upcard, total, soft)
+        cached = self._play_cache.get(key)
+        if cached is not None:
+            return cached
+        best = max(self.stand_ev(total, comp, upcard), self.hit_ev(total, soft, comp, upcard))
+        self._play_cache[key] = best
+        return best
+
+    def hit_ev(self, total, soft, comp, upcard):
+        ev = 0.0
+        for index, p in enumerate(self._draw_probabilities(comp, upcard)):
+            if p:
+                new_total, new_soft = _NEXT_STATE[soft][total][index]
+                ev += p * self._best_after_hit(new_total, new_soft, _remove(comp, index), upcard)
+        return ev
+
+    def double_ev(self, total, soft, comp, upcard):
+        ev = 0.0
+        for index, p in enumerate(self._draw_probabilities(comp, upcard)):
+            if p:
+                new_total, _ = _add_card(total, soft, index)
+                ev += p * self.stand_ev(new_total, _remove(comp, index), upcard)
+        return 2 * ev
+
+    def surrender_ev(self):
+        return -0.5
+
+    def _split_hand_ev(self, pair, comp, upcard):
+        # One hand after a split: its second card is drawn, then the best action is taken
+        double_allowed = self.rules.double_after_split_allowed
+        start_total, start_soft = _add_card(0, False, pair)
+        ev = 0.0
+        for index, p in enumerate(self._draw_probabilities(comp, upcard)):
+            if not p:
+                continue
+            total, soft = _add_card(start_total, start_soft, index)
+            after = _remove(comp, index)
+            best = max(self.stand_ev(total, after, upcard), self.hit_ev(total, soft, after, upcard))
+            if double_allowed:
+                best = max(best, self.double_ev(total, soft, after, upcard))
+            ev += p * best
+        return ev
+
+    def split_ev(self, pair, comp, upcard):
+        """
+            - pair = composition index of the paired card
+            - comp = composition with both paired cards and the upcard removed
+        """
+        return 2 * self._split_hand_ev(pair, comp, upcard)
+
+    def action_evs(self, first, second, upcard, comp=None):
+        """
+            EV of every legal action for a two-card hand (composition indexes), given the
+            dealer does not have blackjack. comp defaults to the full shoe minus the three cards.
+        """
+        if comp is None:
+            comp = _remove(_remove(_remove(self.composition, first), second), upcard)
+        total, soft = _add_card(*_add_card(0, False, first), second)
+        evs = {
+            "S": self.stand_ev(total, comp, upcard),
+            "H": self.hit_ev(total, soft, comp, upcard),
+            "D": self.double_ev(total, soft, comp, upcard),
+        }
+        if first == second:
+            evs["P"] = self.split_ev(first, comp, upcard)
+        if self.rules.surrender_allowed:
+            evs["R"] = self.surrender_ev()
+        return evs
+
+    # ================CHART PLAY=================
+    def _chart(self, chart):
+        # (compiled action table, true count 0 layer base) of a strategy.yaml chart
+        if chart not in self._charts:
+            strategy = BasicStrategy(strategy_name=chart, spread_name=None)
+            self._charts[chart] = (strategy._table, strategy._layer_offset * LAYER_SIZE)
+        return self._charts[chart]
+
+    def _chart_play(self, chart, total, soft, pair, comp, upcard, two_cards):
+        """
+            EV of playing a hand from here by the chart, resolving its actions like
+            Simulator.player_turn: a two-card hand may double and (if the rules allow)
+            surrender, P splits, PH splits only with DAS, and anything not possible hits or
+            stands. pair = composition index of a splittable pair, or -1.
+        """
+        if total > 21:
+            return -1.0
+        key = (chart, comp, upcard, total, soft, pair, two_cards)
+        cached = self._chart_cache.get(key)
+        if cached is not None:
+            return cached
+
+        table, base = self._chart(chart)
+        row = PAIR_ROWS[_INDEX_CODES[pair]] if pair >= 0 else HAND_ROWS[soft][total]
+        action = table[base + row + upcard]
+        if action == DOUBLE_HIT or action == DOUBLE_STAND:
+            if two_cards:
+                ev = self.double_ev(total, soft, comp, upcard)
+            else:
+                action = HIT if action == DOUBLE_HIT else STAND
+        elif action == SPLIT or action == SPLIT_HIT:
+            if pair >= 0 and (action == SPLIT or self.rules.double_after_split_allowed):
+                ev = 2 * self._chart_split_hand(chart, pair, comp, upcard)
+            else:
+                action = HIT
+        elif action == SURRENDER_HIT:
+            if two_cards and self.rules.surrender_allowed:
+                ev = self.surrender_ev()
+            else:
+                action = HIT
+
+        if action == STAND:
+            ev = self.stand_ev(total, comp, upcard)
+        elif action == HIT:
+            ev = 0.0
+            for index, p in enumerate(self._draw_probabilities(comp, upcard)):
+                if p:
+                    new_total, new_soft = _NEXT_STATE[soft][total][index]
+                    ev += p * self._chart_play(chart, new_total, new_soft, -1, _remove(comp, index), upcard, False)
+        self._chart_cache[key] = ev
+        return ev
+
+    def _chart_split_hand(self, chart, pair, comp, upcard):
+        # One split hand played by the chart; a hand that pairs again is played by its total
+        start_total, start_soft = _add_card(0, False, pair)
+        ev = 0.0
+        for index, p in enumerate(self._draw_probabilities(comp, upcard)):
+            if p:
+                total, soft = _add_card(start_total, start_soft, index)
+                ev += p * self._chart_play(chart, total, soft, -1, _remove(comp, index), upcard, True)
+        return ev
+
+    def chart_ev(self, first, second, upcard, chart="basic", comp=None):
+        # EV of a two-card hand played by a strategy.yaml chart, given no dealer blackjack
+        if comp is None:
+            comp = _remove(_remove(_remove(self.composition, first), second), upcard)
+        total, soft = _add_card(*_add_card(0, False, first), second)
+        return self._chart_play(chart, total, soft, first if first == second else -1, comp, upcard, True)
+
+    def house_edge(self, chart=None):
+        """
+            Expected loss per initial unit bet, as a percentage, for a full round dealt from
+            self.composition.
+                - chart=None = the best action on every starting hand and after every draw,
+                  given the exact cards seen: composition-dependent optimal play, at least
+                  as good as any fixed chart
+                - chart=name = the true count 0 layer of that strategy.yaml chart, played like
+                  the Simulator does (see _chart_play), comparable with simulated house edges
+            Split hands are not resplit in either case.
+        """
+        comp = self.composition
+        payout = self.rules.blackjack_payout
+        ev = 0.0
+        n = sum(comp)
+        for first in range(NUM_VALUES):
+            if not comp[first]:
+                continue
+            p_first = comp[first] / n
+            after_first = _remove(comp, first)
+            for second in range(first, NUM_VALUES):
+                if not after_first[second]:
+                    continue
+                # Unordered starting hands: count both orders of a mixed hand
+                p_hand = p_first * after_first[second] / (n - 1)
+                if second != first:
+                    p_hand *= 2
+                after_hand = _remove(after_first, second)
+                natural = {first, second} == {TEN, ACE_INDEX}
+                for upcard in range(NUM_VALUES):
+                    if not after_hand[upcard]:
+                        continue
+                    p = p_hand * after_hand[upcard] / (n - 2)
+                    rest = _remove(after_hand, upcard)
+                    p_dealer_natural = self.dealer_blackjack_probability(upcard, rest)
+                    if natural:
+                        ev += p * (1 - p_dealer_natural) * payout
+                    else:
+                        if chart is None:
+                            best = max(self.action_evs(first, second, upcard, rest).values())
+                        else:
+                            best = self.chart_ev(first, second, upcard, chart, rest)
+                        ev += p * (p_dealer_natural * -1.0 + (1 - p_dealer_natural) * best)
+        return -ev * 100
+
+def _dealer_transitions(rules):
+    """
+        Per-card dealer transition matrices, flattened to shape (NUM_VALUES, states * states),
+        plus the state index of each upcard. States are the (total, soft) hands the dealer
+        draws on, then the 6 outcomes, which absorb. Weighting by the draw probabilities
+        gives one step of the dealer's play.
+    """
+    moves = _dealer_moves(rules)
+    hands = [(total, soft) for soft in (0, 1) for total in range(2, 22) if rules.dealer_should_hit_total(total, soft)]
+    states = {hand: state for state, hand in enumerate(hands)}
+    outcome_base = len(hands)
+    size = outcome_base + 6
+    transitions = np.zeros((NUM_VALUES, size, size))
+    for (total, soft), state in states.items():
+        for index, new_total, new_soft, outcome in moves[soft][total]:
+            target = outcome_base + outcome if outcome >= 0 else states[(new_total, new_soft)]
+            transitions[index, state, target] = 1.0
+    for outcome in range(6):
+        transitions[:, outcome_base + outcome, outcome_base + outcome] = 1.0
+    upcards = np.array([states[(total, int(soft))] for total, soft in _NEXT_STATE[False][0]])
+    return transitions.reshape(NUM_VALUES, -1), upcards
+
+def dealer_distributions(transitions, proportions):
+    """
+        Dealer final-total distribution (given no dealer blackjack) for every upcard index,
+        shape (NUM_VALUES, 6), when each card is drawn with the fixed probabilities in
+        proportions (no depletion within the dealer's own draws).
+    """
+    flat, upcards = transitions
+    size = int(np.sqrt(flat.shape[1]))
+    step = (proportions @ flat).reshape(size, size)
+    # The dealer takes at most 11 cards, so 16 steps always reach an outcome
+    final = step
+    for _ in range(4):
+        final = final @ final
+
+    # Upcard states, then the hole card, then the peek: drop the natural and renormalise
+    after_hole = step[upcards]
+    for upcard in (TEN, ACE_INDEX):
+        excluded = _peek_excluded(upcard)
+        after_hole[upcard, size - 2] -= proportions[excluded]
+        after_hole[upcard] /= 1.0 - proportions[excluded]
+    return (after_hole @ final)[:, size - 6:]
+
+# Composition column of each rank code as a (13, NUM_VALUES) 0/1 matrix
+_RANK_TO_COLUMN = np.eye(NUM_VALUES)[RANK_COLUMNS]
+
+class DealerOutcomeCache:
+    """
+        LRU cache of dealer final-total distributions (DEALER_OUTCOMES order, given no dealer
+        blackjack), for settling hands by expectation. Entries are keyed by composition bucket
+        and hold the distribution for every upcard.
+            - resolution = the unseen cards are rescaled to this many cards and rounded, so shoes
+              with nearly the same proportions share a bucket
+            - maxsize = buckets kept before the least recently used is dropped
+        Each bucket's distributions are computed from its proportions with dealer_distributions.
+    """
+    def __init__(self, rules, resolution=52, maxsize=4096):
+        if resolution < 1:
+            raise ValueError("Composition resolution must be at least 1 card")
+        self.resolution = resolution
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._transitions = _dealer_transitions(rules)
+        self._entries = OrderedDict()
+
+    def bucket(self, rank_counts):
+        comp = np.asarray(rank_counts) @ _RANK_TO_COLUMN
+        return np.rint(comp * (self.resolution / comp.sum()))
+
+    def probabilities(self, upcard_code, rank_counts):
+        """
+            - upcard_code = rank code of the dealer's upcard
+            - rank_counts = per-rank-code counts of the unseen cards, hole card included
+        """
+        bucket = self.bucket(rank_counts)
+        key = bucket.tobytes()
+        entries = self._entries
+        distributions = entries.get(key)
+        if distributions is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+        else:
+            self.misses += 1
+            distributions = dealer_distributions(self._transitions, bucket / bucket.sum()).tolist()
+            entries[key] = distributions
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return distributions[RANK_COLUMNS[upcard_code]]
+
+def expected_settlement(total, probs):
+    # Expected result per unit bet of standing on total against a dealer distribution
+    ev = probs[BUST]
+    for outcome in range(5):
+        dealer_total = 17 + outcome
+        if total > dealer_total:
+            ev += probs[outcome]
+        elif total < dealer_total:
+            ev -= probs[outcome]
+    return ev
@@ -0,0 +1,64 @@
+# blackjack/hand.py
+
+from .cards import ACE, RANK_VALUES
+
+ACTIVE, STOOD, BUSTED, SURRENDERED = range(4)
+STATUSES = ["active", "stood", "busted", "surrendered"]
+
+# Hard value of each rank code (aces count 1, the soft 10 is added on top)
+HARD_VALUES = [1 if code == ACE else value for code, value in enumerate(RANK_VALUES)]
+
+class Hand:
+    """
+        A hand that keeps its totals up to date as cards are added, so the
+        simulator never re-sums cards. Instances are reused between rounds via start().
+    """
+    __slots__ = ("first", "hard_total", "aces", "total", "soft", "num_cards", "pair", "status", "bet")
+
+    def __init__(self):
+        self.first = 0
+        self.hard_total = 0
+        self.aces = 0
+        self.total = 0
+        self.soft = False
+        self.num_cards = 0
+        self.pair = False
+        self.status = ACTIVE
+        self.bet = 0
+
+    def __repr__(self):
+        return f"Hand(total={self.total}, soft={self.soft}, cards={self.num_cards}, status={STATUSES[self.status]}, bet={self.bet})"
+
+    def start(self, first, second, bet=0):
+        self.first = first
+        self.hard_total = HARD_VALUES[first] + HARD_VALUES[second]
+        self.aces = (first == ACE) + (second == ACE)
+        self.num_cards = 2
+        self.pair = first == second
+        self.status = ACTIVE
+        self.bet = bet
+        self._update_total()
+
+    def add(self, code):
+        self.hard_total += HARD_VALUES[code]
+        if code == ACE:
+            self.aces += 1
+        self.num_cards += 1
+        self.pair = False
+        self._update_total()
+        if self.total > 21:
+            self.status = BUSTED
+
+    def _update_total(self):
+        if self.aces and self.hard_total <= 11:
+            self.total = self.hard_total + 10
+            self.soft = True
+        else:
+            self.total = self.hard_total
+            self.soft = False
+
+    def is_blackjack(self):
+        return self.num_cards == 2 and self.total == 21
+
+    def pair_code(self):
+        return self.first if self.pair else -1
@@ -0,0 +1,172 @@
+# blackjack/history.py
+
+import math
+import numpy as np
+
+HISTORY_POLICIES = ("off", "stride", "minmax", "full")
+
+# Samples buffered in memory before they are written to a history file row
+FILE_FLUSH_SAMPLES = 65536
+
+def history_samples(num_hands, policy="full", stride=1):
+    # Number of history samples a run of num_hands hands records under a policy
+    if policy == "off":
+        return 0
+    if policy == "full":
+        return num_hands
+    return -(-num_hands // stride)
+
+def create_history_file(path, num_runs, num_samples, dtype=np.float32):
+    """
+        Preallocate a .npy file of num_runs x num_samples bankroll histories, filled with NaN,
+        for runs to write into row by row (history_file=path, history_row=run). Samples a run
+        does not reach (it went broke first) stay NaN. Returns the file as a writable memmap.
+    """
+    histories = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(num_runs, num_samples))
+    histories[:] = np.nan
+    histories.flush()
+    return histories
+
+def open_history_file(path, mode="r"):
+    # The history matrix as a memmap: rows are read from disk only when touched
+    return np.load(path, mmap_mode=mode)
+
+class BankrollRecorder:
+    """
+        Online per-run statistics plus a bankroll history kept according to a policy:
+            - off = no history
+            - stride = bankroll after every `stride`-th hand, plus the final bankroll when the
+              run ends mid-stride
+            - minmax = bankroll at the end of every `stride` hands plus the bucket's min and max
+            - full = bankroll after every hand
+        The accumulators (result sum / sum of squares, bankroll min, max, peak and max
+        drawdown) are updated on every hand regardless of the policy.
+        With history_file (see create_history_file), full and stride histories go to row
+        history_row of that file instead of the bankroll_history list.
+    """
+    def __init__(self, policy="full", stride=1, start_bankroll=0.0, history_file=None, history_row=0):
+        if policy not in HISTORY_POLICIES:
+            raise ValueError(f"Unknown history policy '{policy}', expected one of: {', '.join(HISTORY_POLICIES)}")
+        if stride < 1:
+            raise ValueError("History stride must be at least 1")
+        if history_file is not None and policy not in ("full", "stride"):
+            raise ValueError("A history file needs the 'full' or 'stride' history policy")
+        self.policy = policy
+        self.stride = stride if policy in ("stride", "minmax") else 1
+
+        # With a history file, self.history only buffers samples not yet written to it
+        self.history_file = history_file
+        self.history_row = history_row
+        self.written = 0
+        self._flush_at = FILE_FLUSH_SAMPLES if history_file is not None else math.inf
+        self._file = None
+
+        self.history = []
+        self.history_min = []
+        self.history_max = []
+
+        self.count = 0
+        self.result_sum = 0.0
+        self.result_sum_sq = 0.0
+        self.min_bankroll = start_bankroll
+        self.max_bankroll = start_bankroll
+        self.peak_bankroll = start_bankroll
+        self.max_drawdown = 0.0
+
+        self._bucket_min = math.inf
+        self._bucket_max = -math.inf
+        self._bucket_close = None
+
+    def record(self, bankroll, result):
+        self.count += 1
+        self.result_sum += result
+        self.result_sum_sq += result * result
+        if bankroll < self.min_bankroll:
+            self.min_bankroll = bankroll
+        if bankroll > self.max_bankroll:
+            self.max_bankroll = bankroll
+        if bankroll > self.peak_bankroll:
+            self.peak_bankroll = bankroll
+        elif self.peak_bankroll - bankroll > self.max_drawdown:
+            self.max_drawdown = self.peak_bankroll - bankroll
+
+        policy = self.policy
+        if policy == "full":
+            self.history.append(bankroll)
+            if len(self.history) >= self._flush_at:
+                self._flush_file()
+        elif policy == "stride":
+            if self.count % self.stride == 0:
+                self.history.append(bankroll)
+                self._bucket_close = None
+                if len(self.history) >= self._flush_at:
+                    self._flush_file()
+            else:
+                self._bucket_close = bankroll
+        elif policy == "minmax":
+            if bankroll < self._bucket_min:
+                self._bucket_min = bankroll
+            if bankroll > self._bucket_max:
+                self._bucket_max = bankroll
+            self._bucket_close = bankroll
+            if self.count % self.stride == 0:
+                self._flush_bucket()
+
+    def _flush_bucket(self):
+        if self._bucket_close is None:
+            return
+        self.history.append(self._bucket_close)
+        self.history_min.append(self._bucket_min)
+        self.history_max.append(self._bucket_max)
+        self._bucket_min = math.inf
+        self._bucket_max = -math.inf
+        self._bucket_close = None
+
+    def _flush_file(self):
+        if self._file is None:
+            self._file = open_history_file(self.history_file, mode="r+")
+        end = self.written + len(self.history)
+        self._file[self.history_row, self.written:end] = self.history
+        self.written = end
+        self.history = []
+
+    def __getstate__(self):
+        # Checkpoints keep the file's path, not the mapped file
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
+
+    def summary(self):
+        if self.policy == "minmax":
+            self._flush_bucket()         # Keep the trailing partial bucket
+        elif self.policy == "stride" and self._bucket_close is not None:
+            # A run that stopped mid-stride (ruin) still ends on its final bankroll
+            self.history.append(self._bucket_close)
+            self._bucket_close = None
+        if self.history_file is not None:
+            self._flush_file()
+            self._file.flush()
+            self._file = None
+
+        mean = self.result_sum / self.count if self.count else 0.0
+        variance = self.result_sum_sq / self.count - mean * mean if self.count else 0.0
+
+        summary = {
+            "bankroll_history": self.history,
+            "history_policy": self.policy,
+            "history_stride": self.stride,
+            "result_sum": self.result_sum,
+            "result_sum_sq": self.result_sum_sq,
+            "mean_result": mean,
+            "stddev_result": math.sqrt(max(variance, 0.0)),
+            "min_bankroll": self.min_bankroll,
+            "max_bankroll": self.max_bankroll,
+            "peak_bankroll": self.peak_bankroll,
+            "max_drawdown": self.max_drawdown,
+        }
+        if self.policy == "minmax":
+            summary["history_min"] = self.history_min
+            summary["history_max"] = self.history_max
+        if self.history_file is not None:
+            summary.update(history_file=self.history_file, history_row=self.history_row, history_length=self.written)
+        return summary
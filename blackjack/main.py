@@ -1,18 +1,18 @@
 from blackjack.simulation import Simulator
 from blackjack.analysis import analyze_simulation_results
+from blackjack.parallel import run_parallel_stats
 
-def main():
-    # results = []
-    # initial_bankroll = 4500
-    # for _ in range(5000):
-    #     simulator = Simulator(debug=False)
-    #     simulator.setup_from_config(scenario=0)
-    #     result = simulator.run_simulation(num_hands=1000, bankroll_limit=initial_bankroll)
-    #     # print(f"Final Bankroll: ${result['final_bankroll']}")
-    #     results.append(result)
+def risk_of_ruin_study(num_runs=5000, num_hands=1000, initial_bankroll=4500, master_seed=0):
+    # Each run is an independent bankroll trial; runs are spread across all cores and only
+    # the merged statistics come back from the workers
+    setup_kwargs = dict(num_decks=2, base_bet=15, dealer_hits_soft_17=True, surrender_allowed=True,
+                        counting_system="zen count", strategy_name="deviations", spread_name="basic",
+                        compact_shoe=True)
+    stats = run_parallel_stats(setup_kwargs, num_runs, num_hands=num_hands, bankroll_limit=initial_bankroll, master_seed=master_seed)
+    return analyze_simulation_results(stats, initial_bankroll)
 
-    # analysis = analyze_simulation_results(results, initial_bankroll)
-    # print(analysis)
+def main():
+    # print(risk_of_ruin_study())
 
 
     simulator = Simulator(debug=False)
@@ -25,4 +25,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,205 @@
+# blackjack/parallel.py
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .analysis import RunningStats, batch_means_half_width, wilson_interval
+from .history import create_history_file, history_samples, open_history_file
+from .results import ResultsWriter
+from .simulation import Simulator
+from .utils import derive_seed
+
+def run_single(setup_kwargs, num_hands=None, bankroll_limit=None, seed=None, history="full", history_stride=1,
+               checkpoint_path=None, checkpoint_every=100000, history_file=None, history_row=0,
+               progress_queue=None, cancel_event=None, progress_every=10000):
+    # With a checkpoint path, an existing checkpoint is resumed (or its results returned).
+    # Every progress_every hands ("hands", history_row, hands played) goes on progress_queue,
+    # and the run stops early once cancel_event is set.
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        return Simulator.resume(checkpoint_path, checkpoint_every)
+    on_progress = None
+    if progress_queue is not None or cancel_event is not None:
+        def on_progress(hands_played):
+            if progress_queue is not None:
+                progress_queue.put(("hands", history_row, hands_played))
+            return cancel_event is not None and cancel_event.is_set()
+
+    simulator = Simulator(debug=False, seed=seed)
+    simulator.setup(**setup_kwargs)
+    return simulator.run_simulation(num_hands=num_hands, bankroll_limit=bankroll_limit, history=history, history_stride=history_stride,
+                                    checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every,
+                                    history_file=history_file, history_row=history_row,
+                                    on_progress=on_progress, progress_every=progress_every)
+
+def _checkpoint_path(checkpoint_dir, run):
+    if checkpoint_dir is None:
+        return None
+    return os.path.join(checkpoint_dir, f"run-{run}.ckpt")
+
+def _prepare_history_file(path, num_rows, num_hands, history, history_stride):
+    num_samples = history_samples(num_hands, history, history_stride)
+    if not os.path.exists(path):
+        create_history_file(path, num_rows, num_samples)
+        return
+    shape = open_history_file(path).shape
+    if shape[0] < num_rows or shape[1] < num_samples:
+        raise ValueError(f"History file {path} is {shape[0]} x {shape[1]}, need at least {num_rows} x {num_samples}")
+
+def run_parallel(setup_kwargs, num_runs, num_hands=None, bankroll_limit=None, master_seed=0, max_workers=None, on_result=None,
+                 history="full", history_stride=1, checkpoint_dir=None, checkpoint_every=100000, first_run=0,
+                 results_path=None, history_file=None, progress_queue=None, cancel_event=None, progress_every=10000):
+    """
+        Run num_runs independent simulations across a process pool. Run i is always seeded
+        with derive_seed(master_seed, i), so the results do not depend on the worker count.
+        Results are returned in run order; on_result(index, result) is called as runs finish.
+        With checkpoint_dir, every run checkpoints to checkpoint_dir/run-<i>.ckpt; calling
+        again with the same arguments skips finished runs and resumes interrupted ones.
+        first_run offsets the run indexes (and so the seeds), to continue an earlier study.
+        With results_path, every run is also appended to that results store (see
+        blackjack.results) as it finishes. With history_file, run i writes its bankroll history
+        into row first_run + i of that .npy matrix (created if missing) instead of returning it.
+        For progress inside runs and cancelling, pass progress_queue (receives ("hands", run,
+        hands played) every progress_every hands) and cancel_event; with more than one worker
+        both must come from a multiprocessing.Manager(). Once cancel_event is set, runs not yet
+        started are dropped (their results are None) and running ones stop early.
+    """
+    seeds = [derive_seed(master_seed, first_run + run) for run in range(num_runs)]
+    results = [None] * num_runs
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    if history_file is not None:
+        _prepare_history_file(history_file, first_run + num_runs, num_hands or setup_kwargs.get("num_hands", 1000000),
+                              history, history_stride)
+    writer = None
+    if results_path is not None:
+        writer = ResultsWriter(results_path, meta=dict(setup_kwargs=setup_kwargs, num_hands=num_hands, bankroll_limit=bankroll_limit,
+                                                       master_seed=master_seed, history=history, history_stride=history_stride))
+
+    def finish(run, result):
+        results[run] = result
+        if writer is not None:
+            writer.add(first_run + run, result)
+        if on_result:
+            on_result(run, result)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers <= 1:
+        for run, seed in enumerate(seeds):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            finish(run, run_single(setup_kwargs, num_hands, bankroll_limit, seed, history, history_stride,
+                                   _checkpoint_path(checkpoint_dir, first_run + run), checkpoint_every,
+                                   history_file, first_run + run, progress_queue, cancel_event, progress_every))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_single, setup_kwargs, num_hands, bankroll_limit, seed, history, history_stride,
+                                       _checkpoint_path(checkpoint_dir, first_run + run), checkpoint_every,
+                                       history_file, first_run + run, progress_queue, cancel_event, progress_every): run
+                       for run, seed in enumerate(seeds)}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                finish(futures[future], future.result())
+                if cancel_event is not None and cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+
+    if writer is not None:
+        writer.close()
+    return results
+
+def run_stats_chunk(setup_kwargs, seeds, num_hands=None, bankroll_limit=None):
+    # Play one run per seed and fold the final bankrolls into a RunningStats
+    stats = RunningStats()
+    for seed in seeds:
+        result = run_single(setup_kwargs, num_hands, bankroll_limit, seed, history="off")
+        stats.push(max(result["final_bankroll"], 0.0))
+    return stats
+
+def run_parallel_stats(setup_kwargs, num_runs, num_hands=None, bankroll_limit=None, master_seed=0, max_workers=None, chunk_size=None):
+    """
+        Like run_parallel, but each worker plays a chunk of runs and returns one merged
+        RunningStats instead of a result dict per run. Seeds are the same as run_parallel's.
+    """
+    seeds = [derive_seed(master_seed, run) for run in range(num_runs)]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-num_runs // (max_workers * 4)))
+    chunks = [seeds[start:start + chunk_size] for start in range(0, num_runs, chunk_size)]
+
+    stats = RunningStats()
+    if max_workers <= 1:
+        for chunk in chunks:
+            stats.merge(run_stats_chunk(setup_kwargs, chunk, num_hands, bankroll_limit))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_stats_chunk, setup_kwargs, chunk, num_hands, bankroll_limit) for chunk in chunks]
+        for future in as_completed(futures):
+            stats.merge(future.result())
+    return stats
+
+PRECISION_METRICS = ("house_edge", "risk_of_ruin")
+
+def run_parallel_until_precision(setup_kwargs, target_half_width, metric="house_edge", num_hands=None, bankroll_limit=None,
+                                 batch_runs=10, min_runs=20, max_runs=10000, master_seed=0, max_workers=None,
+                                 on_batch=None, history="full", history_stride=1, results_path=None,
+                                 progress_queue=None, cancel_event=None, progress_every=10000):
+    """
+        Launch batches of batch_runs runs until the 95% CI half-width (percentage points) of
+        the metric is at most target_half_width, or max_runs runs have finished.
+            - house_edge = each run's "House Advantage (%)" is one batch mean
+            - risk_of_ruin = share of runs ending at or below 0, with a Wilson interval
+        Runs are seeded exactly as run_parallel's. on_batch(results so far, precision) is
+        called after every batch; with results_path every run is appended to that results
+        store. progress_queue and cancel_event work as in run_parallel; a cancelled study
+        returns the runs that finished. Returns (results, precision).
+    """
+    if metric not in PRECISION_METRICS:
+        raise ValueError(f"Unknown precision metric '{metric}', expected one of: {', '.join(PRECISION_METRICS)}")
+
+    results = []
+    edges = RunningStats()
+    ruined = 0
+    precision = {"metric": metric, "estimate": math.nan, "CI_95": (math.nan, math.nan), "half_width": math.inf,
+                 "runs": 0, "converged": False}
+    while len(results) < max_runs:
+        batch = run_parallel(setup_kwargs, min(batch_runs, max_runs - len(results)), num_hands, bankroll_limit, master_seed,
+                             max_workers, history=history, history_stride=history_stride, first_run=len(results),
+                             results_path=results_path, progress_queue=progress_queue, cancel_event=cancel_event,
+                             progress_every=progress_every)
+        batch = [result for result in batch if result is not None]
+        if not batch:
+            break
+        results.extend(batch)
+        for result in batch:
+            edges.push(result["House Advantage (%)"])
+            ruined += result["final_bankroll"] <= 0
+
+        if metric == "house_edge":
+            half_width = batch_means_half_width(edges)
+            estimate = edges.mean
+            low, high = estimate - half_width, estimate + half_width
+        else:
+            low, high = (100 * bound for bound in wilson_interval(ruined, len(results)))
+            estimate = 100 * ruined / len(results)
+            half_width = (high - low) / 2
+        precision = {
+            "metric": metric,
+            "estimate": estimate,
+            "CI_95": (low, high),
+            "half_width": half_width,
+            "runs": len(results),
+            "converged": half_width <= target_half_width,
+        }
+        if on_batch:
+            on_batch(results, precision)
+        if len(results) >= min_runs and precision["converged"]:
+            break
+        if cancel_event is not None and cancel_event.is_set():
+            break
+    return results, precision
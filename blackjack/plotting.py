@@ -0,0 +1,105 @@
+# blackjack/plotting.py
+
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def _padded_blocks(histories, block_rows):
+    """
+        (block, last, final) for row blocks of histories: a list of per-run sequences or a
+        runs x samples matrix with NaN after each run's last sample. block is float64 with NaN
+        padding, last the index of each row's last sample and final its value. Rows without
+        any sample are dropped.
+    """
+    if isinstance(histories, np.ndarray) and histories.ndim == 2:
+        width = histories.shape[1]
+        rows = range(0, histories.shape[0], block_rows)
+        blocks = (np.asarray(histories[start:start + block_rows], dtype=np.float64) for start in rows)
+    else:
+        histories = [np.asarray(history, dtype=np.float64) for history in histories]
+        width = max((len(history) for history in histories), default=0)
+
+        def blocks_from_lists():
+            for start in range(0, len(histories), block_rows):
+                chunk = histories[start:start + block_rows]
+                block = np.full((len(chunk), width), np.nan)
+                for row, history in enumerate(chunk):
+                    block[row, :len(history)] = history
+                yield block
+        blocks = blocks_from_lists()
+
+    for block in blocks:
+        recorded = ~np.isnan(block)
+        has_samples = recorded.any(axis=1)
+        block, recorded = block[has_samples], recorded[has_samples]
+        last = width - 1 - np.argmax(recorded[:, ::-1], axis=1)
+        yield block, last, block[np.arange(len(block)), last]
+
+def _history_width(histories):
+    if isinstance(histories, np.ndarray) and histories.ndim == 2:
+        return histories.shape[1]
+    return max((len(history) for history in histories), default=0)
+
+def aggregate_histories(histories, stride=1, max_points=2000, percentiles=PERCENTILES, block_rows=1024, num_hands=None):
+    """
+        Everything the "bankroll over time" plot needs, downsampled to at most max_points
+        points and computed with array operations, a block of runs at a time.
+            - a run that stopped early (ruin) keeps its final bankroll for the rest of the
+              plot instead of cutting every run down to the shortest one
+            - hands = x values (sample index times the history stride). A history's trailing
+              sample is its final bankroll, recorded at the last hand rather than on a stride
+              boundary, so with num_hands (hands in a full-length run) the last point sits there
+            - mean, plus mean_min / mean_max = the extremes of the full-resolution mean in each
+              point's bucket, so short swings are not lost to downsampling
+            - bands = {percentile: values} across runs at each point
+            - stopped = share of runs that had stopped by each point
+        Returns None when there is no history to plot.
+    """
+    width = _history_width(histories)
+    if not width:
+        return None
+    num_points = min(width, max_points)
+    edges = np.linspace(0, width, num_points + 1).astype(np.int64)
+    columns = edges[1:] - 1                  # Each point is the last sample of its bucket
+
+    total = np.zeros(width)
+    carried = np.zeros(width + 1)            # Difference arrays: final values and stop counts
+    stops = np.zeros(width + 1)
+    picked = []
+    runs = 0
+    for block, last, final in _padded_blocks(histories, block_rows):
+        runs += len(block)
+        total += np.nansum(block, axis=0)
+        np.add.at(carried, last + 1, final)
+        np.add.at(stops, last + 1, 1)
+        values = block[:, columns]
+        picked.append(np.where(columns[None, :] > last[:, None], final[:, None], values))
+    if not runs:
+        return None
+
+    mean = (total + np.cumsum(carried)[:width]) / runs
+    picked = np.concatenate(picked)
+    bands = np.percentile(picked, percentiles, axis=0)
+    return {
+        "hands": (columns + 1) * stride if num_hands is None else np.minimum((columns + 1) * stride, num_hands),
+        "mean": mean[columns],
+        "mean_min": np.minimum.reduceat(mean, edges[:-1]),
+        "mean_max": np.maximum.reduceat(mean, edges[:-1]),
+        "bands": dict(zip(percentiles, bands)),
+        "stopped": np.cumsum(stops)[:width][columns] / runs,
+        "runs": runs,
+    }
+
+def draw_bankroll_bands(ax, aggregate):
+    # Draw an aggregate_histories result on a matplotlib Axes
+    hands = aggregate["hands"]
+    bands = aggregate["bands"]
+    if 5 in bands and 95 in bands:
+        ax.fill_between(hands, bands[5], bands[95], color='green', alpha=0.12, linewidth=0, label="5-95%")
+    if 25 in bands and 75 in bands:
+        ax.fill_between(hands, bands[25], bands[75], color='green', alpha=0.25, linewidth=0, label="25-75%")
+    if 50 in bands:
+        ax.plot(hands, bands[50], color='green', linestyle='--', linewidth=1, label="Median")
+    ax.fill_between(hands, aggregate["mean_min"], aggregate["mean_max"], color='darkgreen', alpha=0.4, linewidth=0)
+    ax.plot(hands, aggregate["mean"], color='darkgreen', linewidth=1.5, label="Mean")
+    ax.legend(loc="best", fontsize="small")
@@ -0,0 +1,66 @@
+# blackjack/profiling.py
+
+from time import perf_counter_ns
+
+class _TimedCall:
+    # Stands in for a method while profiling; picklable, so profiled simulators still checkpoint
+    __slots__ = ("profiler", "phase", "func")
+
+    def __init__(self, profiler, phase, func):
+        self.profiler = profiler
+        self.phase = phase
+        self.func = func
+
+    def __call__(self, *args):
+        start = perf_counter_ns()
+        try:
+            return self.func(*args)
+        finally:
+            self.profiler.add(self.phase, perf_counter_ns() - start)
+
+class PhaseProfiler:
+    """
+        Cumulative wall time and call counts per phase of a run, plus plain event counters.
+        Phases are timed inclusively: dealer_turn contains the deal_card and update_count
+        calls the dealer makes, and play_hand contains everything.
+    """
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+        self.events = {}
+
+    def add(self, phase, elapsed_ns):
+        self.times[phase] = self.times.get(phase, 0) + elapsed_ns
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def event(self, name):
+        self.events[name] = self.events.get(name, 0) + 1
+
+    def wrap(self, obj, method, phase=None):
+        # Replace obj.method with a timed version on this instance only
+        if isinstance(obj.__dict__.get(method), _TimedCall):
+            return
+        setattr(obj, method, _TimedCall(self, phase or method, getattr(obj, method)))
+
+    @staticmethod
+    def unwrap(obj, method):
+        if isinstance(obj.__dict__.get(method), _TimedCall):
+            delattr(obj, method)
+
+    def reset(self):
+        self.times.clear()
+        self.calls.clear()
+        self.events.clear()
+
+    def stats(self):
+        return {phase: {"calls": self.calls[phase], "seconds": self.times[phase] / 1e9} for phase in self.times}
+
+    def report(self):
+        total = self.times.get("play_hand") or sum(self.times.values()) or 1
+        lines = [f"{'phase':<24}{'calls':>12}{'seconds':>12}{'us/call':>10}{'% hand':>9}"]
+        for phase, elapsed in sorted(self.times.items(), key=lambda item: -item[1]):
+            calls = self.calls[phase]
+            lines.append(f"{phase:<24}{calls:>12,}{elapsed / 1e9:>12.3f}{elapsed / calls / 1e3:>10.2f}{100 * elapsed / total:>8.1f}%")
+        for name, count in sorted(self.events.items()):
+            lines.append(f"{name:<24}{count:>12,}")
+        return "\n".join(lines)
@@ -0,0 +1,152 @@
+# blackjack/results.py
+
+import csv
+import glob
+import json
+import os
+import numpy as np
+
+# Result keys stored under a shorter column name
+COLUMN_NAMES = {"House Advantage (%)": "house_edge"}
+
+META_FILE = "meta.json"
+
+def _summary_row(run, result):
+    # The scalar numbers of a result dict; histories, tuples and strings are left out
+    row = {"run": run}
+    for key, value in result.items():
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            row[COLUMN_NAMES.get(key, key)] = value
+    return row
+
+class ResultsWriter:
+    """
+        Writes runs to a results store: a directory of chunk-<n>.npz files, each holding
+        chunk_runs runs as one array per summary column, plus the bankroll histories of those
+        runs concatenated into history_values with history_offsets marking where each starts.
+            - runs can be added in any order; the run column keeps them apart
+            - history_every=k keeps every k-th history sample; histories=False drops them
+            - opening an existing store appends to it
+        meta (setup arguments, seeds, ...) is saved as meta.json.
+    """
+    def __init__(self, path, meta=None, chunk_runs=256, histories=True, history_every=1, history_dtype=np.float64):
+        self.path = path
+        self.chunk_runs = chunk_runs
+        self.histories = histories
+        self.history_every = history_every
+        self.history_dtype = history_dtype
+        self._rows = []
+        self._histories = []
+
+        os.makedirs(path, exist_ok=True)
+        self._next_chunk = len(glob.glob(os.path.join(path, "chunk-*.npz")))
+        if meta is not None:
+            with open(os.path.join(path, META_FILE), "w") as f:
+                json.dump(meta, f, indent=2, default=str)
+
+    def add(self, run, result):
+        self._rows.append(_summary_row(run, result))
+        if self.histories:
+            history = result.get("bankroll_history")
+            history = np.asarray(history if history is not None else [], dtype=self.history_dtype)
+            self._histories.append(history[self.history_every - 1::self.history_every])
+        if len(self._rows) >= self.chunk_runs:
+            self.flush()
+
+    def extend(self, results, first_run=0):
+        for run, result in enumerate(results, first_run):
+            self.add(run, result)
+
+    def flush(self):
+        if not self._rows:
+            return
+        names = []
+        for row in self._rows:
+            names.extend(name for name in row if name not in names)
+        arrays = {name: np.array([row.get(name, np.nan) for row in self._rows]) for name in names}
+        if self.histories:
+            arrays["history_offsets"] = np.cumsum([0] + [len(history) for history in self._histories])
+            arrays["history_values"] = np.concatenate(self._histories) if self._histories else np.empty(0, self.history_dtype)
+
+        # Written under a temporary name first so a reader never sees half a chunk
+        chunk_path = os.path.join(self.path, f"chunk-{self._next_chunk:05d}.npz")
+        tmp_path = f"{chunk_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, chunk_path)
+        self._next_chunk += 1
+        self._rows = []
+        self._histories = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_results(results, path, meta=None, first_run=0, **kwargs):
+    with ResultsWriter(path, meta, **kwargs) as writer:
+        writer.extend(results, first_run)
+
+def _chunks(path, histories=True):
+    # npz members load lazily, so skipping the histories skips reading them
+    for chunk_path in sorted(glob.glob(os.path.join(path, "chunk-*.npz"))):
+        with np.load(chunk_path) as chunk:
+            yield {name: chunk[name] for name in chunk.files if histories or not name.startswith("history_")}
+
+def read_meta(path):
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, "r") as f:
+        return json.load(f)
+
+def read_summary(path):
+    """
+        One array per summary column over every stored run, sorted by run. A run stored more
+        than once (e.g. a study resumed from checkpoints) keeps its latest copy.
+    """
+    chunks = list(_chunks(path, histories=False))
+    if not chunks:
+        return {}
+    names = []
+    for chunk in chunks:
+        names.extend(name for name in chunk if name not in names)
+    columns = {name: np.concatenate([chunk.get(name, np.full(len(chunk["run"]), np.nan)) for chunk in chunks]) for name in names}
+
+    # Last copy of each run wins: unique over the reversed order picks the latest
+    runs = columns["run"][::-1]
+    _, first = np.unique(runs, return_index=True)
+    keep = len(runs) - 1 - first
+    return {name: values[keep] for name, values in columns.items()}
+
+def read_histories(path, runs=None):
+    """
+        Bankroll history of each run as {run: array}, for all runs or just those in runs.
+        Chunks are read one at a time, so only the selected histories are held in memory.
+    """
+    wanted = None if runs is None else set(runs)
+    histories = {}
+    for chunk in _chunks(path):
+        if "history_offsets" not in chunk:
+            continue
+        offsets = chunk["history_offsets"]
+        values = chunk["history_values"]
+        for index, run in enumerate(chunk["run"].tolist()):
+            if wanted is None or run in wanted:
+                histories[run] = values[offsets[index]:offsets[index + 1]].copy()
+    return histories
+
+def write_summary_csv(results, path, first_run=0):
+    # Per-run summary columns of a results list as a CSV, one row per run
+    rows = [_summary_row(run, result) for run, result in enumerate(results, first_run)]
+    names = []
+    for row in rows:
+        names.extend(name for name in row if name not in names)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=names)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,132 @@
+# blackjack/ror.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .analysis import wilson_interval
+from .batch import BatchSimulator
+from .utils import derive_seed
+
+# Trial outcomes
+RUINED = 1
+WON = 2
+HAND_LIMIT = 3
+
+RUIN_PERCENTILES = (5, 25, 50, 75, 95)
+
+def run_ror_trials(setup_kwargs, num_trials, bankroll, win_goal=None, max_hands=None, seed=None, cancel_event=None):
+    """
+        Play num_trials bankroll trials side by side as BatchSimulator lanes (setup_kwargs are
+        BatchSimulator.setup arguments). Each trial starts with bankroll and stops at the first
+        of: ruin (bankroll at or below 0), reaching bankroll + win_goal, or max_hands hands.
+        Only the outcome and stopping point are kept. Returns (outcome, hands, final bankroll)
+        arrays, one entry per trial; if cancel_event is set, unfinished trials have outcome 0.
+    """
+    if bankroll <= 0:
+        raise ValueError("Risk of ruin needs a starting bankroll above 0")
+    if not win_goal and not max_hands:
+        raise ValueError("Give a win goal or a hand limit, or trials that never go broke would not stop")
+
+    simulator = BatchSimulator(num_shoes=num_trials, seed=seed)
+    simulator.setup(**setup_kwargs)
+    balance = np.full(num_trials, float(bankroll))
+    outcome = np.zeros(num_trials, dtype=np.int8)
+    hands = np.zeros(num_trials, dtype=np.int64)
+    goal = bankroll + win_goal if win_goal else np.inf
+
+    lanes = np.arange(num_trials)
+    hand = 0
+    while len(lanes):
+        round_net, _ = simulator.step(lanes)
+        current = balance[lanes] + round_net
+        balance[lanes] = current
+        hand += 1
+        hands[lanes] = hand
+
+        stopped = np.where(current <= 0, RUINED, np.where(current >= goal, WON, 0))
+        if max_hands and hand >= max_hands:
+            stopped[stopped == 0] = HAND_LIMIT
+        finished = stopped != 0
+        outcome[lanes[finished]] = stopped[finished]
+        lanes = lanes[~finished]
+        if cancel_event is not None and hand % 1000 == 0 and cancel_event.is_set():
+            break
+    return outcome, hands, balance
+
+def _report(outcomes, hands, finals, bankroll, win_goal, max_hands):
+    finished = outcomes != 0                    # Trials cut short by a cancel are left out
+    outcomes, hands, finals = outcomes[finished], hands[finished], finals[finished]
+    trials = len(outcomes)
+    ruined = int(np.count_nonzero(outcomes == RUINED))
+    won = int(np.count_nonzero(outcomes == WON))
+    low, high = wilson_interval(ruined, trials)
+    ruin_hands = np.sort(hands[outcomes == RUINED])
+    return {
+        "trials": trials,
+        "bankroll": bankroll,
+        "win_goal": win_goal,
+        "max_hands": max_hands,
+        "ruined": ruined,
+        "won": won,
+        "hand_limit": trials - ruined - won,
+        "risk_of_ruin": ruined / trials if trials else 0.0,
+        "CI_95": (low, high),
+        "win_probability": won / trials if trials else 0.0,
+        "mean_hands": float(hands.mean()) if trials else 0.0,
+        "mean_final_bankroll": float(finals.mean()) if trials else 0.0,
+        "ruin_hands": ruin_hands,
+        "ruin_hands_percentiles": dict(zip(RUIN_PERCENTILES, np.percentile(ruin_hands, RUIN_PERCENTILES).tolist()))
+                                  if len(ruin_hands) else {},
+    }
+
+def risk_of_ruin(setup_kwargs, num_trials, bankroll, win_goal=None, max_hands=None, master_seed=0, trials_per_batch=10000,
+                 max_workers=None, on_batch=None, cancel_event=None):
+    """
+        Risk of ruin over num_trials trials (see run_ror_trials), played in batches of
+        trials_per_batch lanes across a process pool. Batch i is seeded with
+        derive_seed(master_seed, i), so results do not depend on the worker count.
+        on_batch(report so far) is called as batches finish. Once cancel_event is set (with
+        more than one worker, a multiprocessing.Manager() event) play stops and the report
+        covers the trials that finished. The report has:
+            - risk_of_ruin with its Wilson 95% CI_95, win_probability, and the counts ruined,
+              won and hand_limit
+            - ruin_hands = sorted hands-to-ruin of every ruined trial, and its percentiles
+            - mean_hands and mean_final_bankroll over all trials
+    """
+    sizes = [min(trials_per_batch, num_trials - start) for start in range(0, num_trials, trials_per_batch)]
+    parts = {}
+
+    def report():
+        done = [parts[index] for index in sorted(parts)]
+        if not done:
+            return _report(np.empty(0, np.int8), np.empty(0, np.int64), np.empty(0), bankroll, win_goal, max_hands)
+        return _report(*(np.concatenate(column) for column in zip(*done)), bankroll, win_goal, max_hands)
+
+    def finish(index, part):
+        parts[index] = part
+        if on_batch:
+            on_batch(report())
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers <= 1:
+        for index, size in enumerate(sizes):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            finish(index, run_ror_trials(setup_kwargs, size, bankroll, win_goal, max_hands, derive_seed(master_seed, index),
+                                         cancel_event))
+        return report()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_ror_trials, setup_kwargs, size, bankroll, win_goal, max_hands,
+                                   derive_seed(master_seed, index), cancel_event): index
+                   for index, size in enumerate(sizes)}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            finish(futures[future], future.result())
+            if cancel_event is not None and cancel_event.is_set():
+                for pending in futures:
+                    pending.cancel()
+    return report()
@@ -1,5 +1,7 @@
 # blackjack/rules.py
 
+from .cards import RANK_VALUES, ACE
+
 class BlackjackRules:
     def __init__(self, decks=6, dealer_hits_soft_17=False, blackjack_payout=1.5, surrender_allowed=False, double_after_split_allowed=True, deck_penetration=0.25):
         self.decks = decks
@@ -15,8 +17,8 @@ class BlackjackRules:
     def hand_value(self, hand):
         total = sum(card.value() for card in hand)
         aces = sum(card.rank == "A" for card in hand) # Count Aces in hand
-        while aces > 0 and total + 10 <= 21:
-            total += 10
+        while aces > 0 and total > 21:
+            total -= 10
             aces -= 1
         return total
 
@@ -27,4 +29,26 @@ class BlackjackRules:
         if value == 17 and self.dealer_hits_soft_17:
             if any(card.rank == "A" for card in hand):
                 return True
-        return False
\ No newline at end of file
+        return False
+
+# ================RANK CODE HELPERS=================
+    def is_blackjack_codes(self, codes):
+        return len(codes) == 2 and self.hand_value_codes(codes) == 21
+
+    def hand_value_codes(self, codes):
+        total = 0
+        aces = 0
+        for code in codes:
+            total += RANK_VALUES[code]
+            if code == ACE:
+                aces += 1
+        while aces > 0 and total > 21:
+            total -= 10
+            aces -= 1
+        return total
+
+    def dealer_should_hit_total(self, total, soft):
+        if total < 17:
+            return True
+        return total == 17 and soft and self.dealer_hits_soft_17
+# ==================================================
@@ -0,0 +1,82 @@
+# blackjack/shuffles.py
+
+import numpy as np
+from .cards import RANKS
+
+def ordered_shoe(num_decks):
+    # Rank codes of num_decks unshuffled decks
+    return np.tile(np.arange(len(RANKS), dtype=np.uint8), 4 * num_decks)
+
+def shuffle_matrix(num_shoes, num_decks, rng=None):
+    """
+        num_shoes independent shoe permutations as a num_shoes x (52 * num_decks) uint8 matrix
+        of rank codes, made in one vectorized call. rng is a numpy Generator or a seed.
+    """
+    rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+    return rng.permuted(np.tile(ordered_shoe(num_decks), (num_shoes, 1)), axis=1)
+
+def create_shuffle_bank(path, num_shoes, num_decks, seed=None, block=4096):
+    """
+        Write num_shoes shuffled shoes to a .npy file (see shuffle_matrix), block shoes at a
+        time so the bank never has to fit in memory. Returns the bank as a read-only memmap.
+    """
+    rng = np.random.default_rng(seed)
+    bank = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(num_shoes, 52 * num_decks))
+    for start in range(0, num_shoes, block):
+        end = min(start + block, num_shoes)
+        bank[start:end] = shuffle_matrix(end - start, num_decks, rng)
+    bank.flush()
+    del bank
+    return np.load(path, mmap_mode="r")
+
+class ShuffleBank:
+    """
+        Replays the shoes of a shuffle bank file in order, starting at row start and wrapping
+        around at the end. Pickles as the path and position only, so a simulator using it can
+        be checkpointed or sent to a worker process.
+    """
+    def __init__(self, path, start=0):
+        self.path = path
+        self.position = start
+        self._shoes = None
+
+    @property
+    def shoes(self):
+        if self._shoes is None:
+            self._shoes = np.load(self.path, mmap_mode="r")
+        return self._shoes
+
+    @property
+    def num_decks(self):
+        return self.shoes.shape[1] // 52
+
+    def next_shoe(self):
+        shoes = self.shoes
+        shoe = shoes[self.position % len(shoes)]
+        self.position += 1
+        return shoe
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shoes"] = None
+        return state
+
+class ShuffleStream:
+    """
+        Endless supply of freshly shuffled shoes, generated block shoes at a time with
+        shuffle_matrix instead of one Python-level shuffle per shoe.
+    """
+    def __init__(self, num_decks, rng=None, block=256):
+        self.num_decks = num_decks
+        self.rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+        self.block = block
+        self._shoes = np.empty((0, 52 * num_decks), dtype=np.uint8)
+        self._next = 0
+
+    def next_shoe(self):
+        if self._next >= len(self._shoes):
+            self._shoes = shuffle_matrix(self.block, self.num_decks, self.rng)
+            self._next = 0
+        shoe = self._shoes[self._next]
+        self._next += 1
+        return shoe
@@ -1,14 +1,32 @@
 # blackjack/simulation.py
 
+import os
+import pickle
 import random
-from .cards import Shoe
+from .cards import Shoe, CompactShoe, ACE
+from .analysis import RunningStats, batch_means_half_width
+from .ev import DealerOutcomeCache, expected_settlement
+from .history import BankrollRecorder
+from .profiling import PhaseProfiler
+from .shuffles import ShuffleBank, ShuffleStream
+from .hand import Hand, ACTIVE, STOOD, BUSTED, SURRENDERED
 from .rules import BlackjackRules
-from .strategy import BasicStrategy
-from .utils import load_settings, set_random_seed
+from .strategy import BasicStrategy, HIT, STAND, DOUBLE_HIT, DOUBLE_STAND, SPLIT, SPLIT_HIT, SURRENDER_HIT
+from .utils import load_settings
+
+SETTLEMENTS = ("sampled", "expected")
+CHECKPOINT_VERSION = 3
 
 class Simulator:
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, rng=None, seed=None):
+        # debug turns on the per-phase profiler (see enable_profiling) from setup onwards
         self.debug = debug
+        self.profiler = PhaseProfiler() if debug else None
+
+        # Every source of randomness in a run (shoe shuffles) draws from this RNG: a
+        # random.Random or a numpy Generator. Nothing touches the global random module.
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
 
         self.rules = None
         self.strategy = None
@@ -19,27 +37,56 @@ class Simulator:
         self.num_hands=6
 
         self.stop_if_bankrupt = False
+        self.compact_shoe = False
+
+        # Where a compact shoe's reshuffles come from: None = shuffle in place, "batch" =
+        # blocks of NumPy shuffles, or a shuffle bank (path or shuffles.ShuffleBank) to replay
+        self.shuffles = None
+
+        # "expected" settles each finished hand at its expected payout over the dealer's
+        # outcomes for the unseen cards instead of the sampled dealer hand (less variance per hand)
+        self.settlement = "sampled"
+        self.settlement_resolution = 52
+        self._dealer_outcomes = None
+
+        # State of the run in progress, kept on the simulator so checkpoints can resume it
+        self._recorder = None
+        self._target_hands = 0
+        self._run_finished = False
 
-        set_random_seed(random.randint(0, 1000))
+        # Hands are reused every round; the pool grows if a round needs more splits
+        self._player_hands = [Hand() for _ in range(4)]
+        self._num_player_hands = 0
+        self._dealer_hand = Hand()
 
 
     def setup(self, num_decks=6, num_hands=1000000, base_bet=15, double_after_split=True,
               dealer_hits_soft_17=False, blackjack_payout=1.5, surrender_allowed=False,
               insurance_threshold=3, counting_system="hi-lo", strategy_name="basic",
-              spread_name="basic", penetration=0.25):
+              spread_name="basic", penetration=0.25, compact_shoe=False, settlement="sampled",
+              settlement_resolution=52, shuffles=None):
         
         self.num_hands = num_hands
+        self.compact_shoe = compact_shoe
+        self.shuffles = shuffles
         self.rules = BlackjackRules(decks=num_decks, dealer_hits_soft_17=dealer_hits_soft_17, blackjack_payout=blackjack_payout, surrender_allowed=surrender_allowed, double_after_split_allowed=double_after_split, deck_penetration=penetration)
         self.strategy = BasicStrategy(bet=base_bet, strategy_name=strategy_name, spread_name=spread_name, counting_system=counting_system, insurance_count_threshold=insurance_threshold)
+        self._setup_settlement(settlement, settlement_resolution)
         
-        self.shoe = Shoe(self.rules.decks)
+        self.shoe = self._new_shoe()
+        if self.profiler is not None:
+            self.enable_profiling(self.profiler)
 
     def setup_from_config(self, scenario=0):
         settings_data = load_settings("config/settings.yaml")
-        set_random_seed(random.randint(0, 1000))
 
         settings = settings_data["scenarios"][scenario]
 
+        # An explicit rng/seed wins; otherwise use the scenario's or the file's random_seed
+        config_seed = settings.get("random_seed", settings_data.get("random_seed"))
+        if self.seed is None and config_seed is not None and isinstance(self.rng, random.Random):
+            self.rng.seed(config_seed)
+
         decks = settings["decks"]
         soft_17 = settings["dealer_hits_soft_17"]
         bj_payout = settings["blackjack_payout"]
@@ -53,70 +100,148 @@ class Simulator:
         base_bet = settings["base_bet"]
 
         self.num_hands = settings["num_hands"]
+        self.compact_shoe = settings.get("compact_shoe", False)
+        self.shuffles = settings.get("shuffles")
 
         self.rules = BlackjackRules(decks=decks, dealer_hits_soft_17=soft_17, blackjack_payout=bj_payout, surrender_allowed=surrender, double_after_split_allowed=das, deck_penetration=penetration)
         self.strategy = BasicStrategy(bet=base_bet, strategy_name=strategy_name, spread_name=spread_name, counting_system=counting_system, insurance_count_threshold=insurance_threshold)
+        self._setup_settlement(settings.get("settlement", "sampled"), settings.get("settlement_resolution", 52))
         
-        self.shoe = Shoe(self.rules.decks)
+        self.shoe = self._new_shoe()
+        if self.profiler is not None:
+            self.enable_profiling(self.profiler)
+
+    def _setup_settlement(self, settlement, resolution):
+        if settlement not in SETTLEMENTS:
+            raise ValueError(f"Unknown settlement '{settlement}', expected one of: {', '.join(SETTLEMENTS)}")
+        self.settlement = settlement
+        self.settlement_resolution = resolution
+        if settlement == "expected":
+            self._dealer_outcomes = DealerOutcomeCache(self.rules, resolution=resolution)
+        else:
+            self._dealer_outcomes = None
+
+# ================PROFILING=================
+    # (object, method, phase) timed while profiling; the methods are swapped on the instances
+    # only, so a simulator without a profiler runs the untouched class methods
+    def _profiled_methods(self):
+        return [
+            (self, "play_hand", "play_hand"),
+            (self, "player_turn", "player_turn"),
+            (self, "dealer_turn", "dealer_turn"),
+            (self, "settle_bet", "settle_bet"),
+            (self, "settle_expected", "settle_bet"),
+            (self.shoe, "deal_code", "deal_card"),
+            (self.shoe, "reshuffle", "reshuffle"),
+            (self.strategy, "update_count_code", "update_count"),
+            (self.strategy, "decide_action", "decide_player_action"),
+            (self.strategy, "get_bet", "get_bet"),
+        ]
+
+    def enable_profiling(self, profiler=None):
+        # Call after setup(); returns the PhaseProfiler collecting the timings
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+        for obj, method, phase in self._profiled_methods():
+            self.profiler.wrap(obj, method, phase)
+        return self.profiler
+
+    def disable_profiling(self):
+        for obj, method, _ in self._profiled_methods():
+            PhaseProfiler.unwrap(obj, method)
+        self.profiler = None
+
+    def profile_report(self):
+        if self.profiler is None:
+            return "Profiling is not enabled"
+        return self.profiler.report()
+# ==========================================
+
+    def _new_shoe(self):
+        if self.compact_shoe:
+            return CompactShoe(self.rules.decks, self.rng, self._shuffle_source())
+        if self.shuffles is not None:
+            raise ValueError("Pre-generated shuffles need compact_shoe=True")
+        return Shoe(self.rules.decks, self.rng)
+
+    def _shuffle_source(self):
+        shuffles = self.shuffles
+        if shuffles is None or not isinstance(shuffles, str):
+            return shuffles
+        if shuffles == "batch":
+            # Seeded from the run's own RNG, so seeded runs stay reproducible
+            seed = self.rng.getrandbits(64) if isinstance(self.rng, random.Random) else self.rng.integers(2**63)
+            return ShuffleStream(self.rules.decks, seed)
+        return ShuffleBank(shuffles)
 
     def play_hand(self):
-        player_hands = [
-            {
-                "cards": [self.shoe.deal_card(), self.shoe.deal_card()],
-                "bet": self.strategy.get_bet(self.shoe.decks_remaining()),
-                "status": "active"
-            }
-        ]
-        dealer_hand = [self.shoe.deal_card(), self.shoe.deal_card()]
+        shoe = self.shoe
+        strategy = self.strategy
+
+        first_card = shoe.deal_code()
+        second_card = shoe.deal_code()
+        hand = self._player_hands[0]
+        hand.start(first_card, second_card, strategy.get_bet(shoe.decks_remaining()))
+        self._num_player_hands = 1
+
+        dealer_card = shoe.deal_code()
+        hole_card = shoe.deal_code()
+        dealer_hand = self._dealer_hand
+        dealer_hand.start(dealer_card, hole_card)
 
         round_net = 0.0
 
-        for card in player_hands[0]["cards"] + [dealer_hand[0]]:
-            self.strategy.update_count(card)
-        if self.rules.is_blackjack(player_hands[0]["cards"]):
-            if self.rules.is_blackjack(dealer_hand):
-                round_net == 0.0
+        strategy.update_count_code(first_card)
+        strategy.update_count_code(second_card)
+        strategy.update_count_code(dealer_card)
+        if hand.is_blackjack():
+            if dealer_hand.is_blackjack():
+                round_net = 0.0
             else:
-                self.strategy.update_count(dealer_hand[1])
-                round_net = player_hands[0]["bet"] * self.rules.blackjack_payout
-            self.amount_bet += player_hands[0]["bet"]
+                strategy.update_count_code(hole_card)
+                round_net = hand.bet * self.rules.blackjack_payout
+            self.amount_bet += hand.bet
             self.player_bankroll += round_net
             return round_net
-        if dealer_hand[0].rank == "A" and self.strategy.insurance_count_threshold:
-            if self.strategy.get_true_count(self.shoe.decks_remaining()) >= self.strategy.insurance_count_threshold:
-                if self.debug:
-                    print("Insurance Taken")
-                self.amount_bet += player_hands[0]["bet"] / 2
-                if self.rules.is_blackjack(dealer_hand):
+        if dealer_card == ACE and strategy.insurance_count_threshold:
+            if strategy.take_insurance(shoe.decks_remaining()):
+                if self.profiler is not None:
+                    self.profiler.event("insurance")
+                self.amount_bet += hand.bet / 2
+                if dealer_hand.is_blackjack():
                     round_net = 0
-                    self.amount_bet += player_hands[0]["bet"]
+                    self.amount_bet += hand.bet
                     return round_net
                 else:
-                    round_net = -player_hands[0]["bet"] / 2
-        if self.rules.is_blackjack(dealer_hand):   
-            round_net = -player_hands[0]["bet"]
+                    round_net = -hand.bet / 2
+        if dealer_hand.is_blackjack():
+            round_net = -hand.bet
             self.player_bankroll += round_net
-            self.amount_bet += player_hands[0]["bet"]
+            self.amount_bet += hand.bet
             return round_net
 
-        player_hands = self.player_turn(player_hands, dealer_hand[0])
-        dealer_outcome = self.dealer_turn(dealer_hand)
-
-        if self.debug:
-            print(f"Player: {player_hands}\nDealer: {dealer_hand}")
-
-        for hand in player_hands:
-            player_outcome = self.settle_bet(hand, self.rules.hand_value(dealer_hand))
-            if self.debug:
-                print(f"Player Outcome: {player_outcome}")
+        self.player_turn(dealer_card)
+        if self._dealer_outcomes is not None:
+            # Dealer distribution over the unseen cards (hole card included), taken before
+            # the dealer draws; the dealer still plays so the shoe and count move on as usual
+            rank_counts = self.shoe.rank_counts()
+            rank_counts[hole_card] += 1
+            dealer_probs = self._dealer_outcomes.probabilities(dealer_card, rank_counts)
+        self.dealer_turn(dealer_hand)
+
+        for i in range(self._num_player_hands):
+            hand = self._player_hands[i]
+            if self._dealer_outcomes is not None:
+                player_outcome = self.settle_expected(hand, dealer_probs)
+            else:
+                player_outcome = self.settle_bet(hand, dealer_hand.total)
             round_net += player_outcome
-            self.amount_bet += hand["bet"]
-        self.strategy.update_count(dealer_hand[1])
+            self.amount_bet += hand.bet
+        strategy.update_count_code(hole_card)
 
         self.player_bankroll += round_net
         return round_net
 
-    def player_turn(self, player_hands, dealer_card):
+    def player_turn(self, dealer_card):
         """
             - H = Hit
             - S = Stand
@@ -127,123 +252,106 @@ class Simulator:
             - RH = Surrender if allowed, otherwise hit
         """
         i = 0
-        while i < len(player_hands):
-            hand_info = player_hands[i]
-            if hand_info["status"] != "active":
-                i += 1
-                continue
-            while hand_info["status"] == "active":
-                action_code = self.strategy.decide_player_action(hand_info["cards"], dealer_card, self.rules, self.shoe.decks_remaining())
-                if action_code in ["H", "DH", "PH", "RH"]:
-                    did_fallback = False
-
-                    if action_code == "DH":
-                        if self._can_double(hand_info["cards"]):
-                            self._do_double(hand_info)
-                            break
-                        else:
-                            did_fallback  = True
-
-                    if action_code == "PH" and not did_fallback and self.rules.double_after_split_allowed:
-                        if self._can_split(hand_info["cards"]):
-                            self._do_split(player_hands, i)
-                            break
-                        else:
-                            did_fallback = True
-                    
-                    if action_code == "RH" and not did_fallback:
-                        if self.rules.surrender_allowed and self._can_surrender(hand_info["cards"]):
-                            self._do_surrender(hand_info)
-                            break
-                        else:
-                            did_fallback = True
-                    
-                    if action_code == "H" or did_fallback:
-                        new_card = self.shoe.deal_card()
-                        self.strategy.update_count(new_card)
-                        hand_info["cards"].append(new_card)
-                        if self.rules.hand_value(hand_info["cards"]) > 21:
-                            hand_info["status"] = "busted"
-                            break
-                            
-                elif action_code in ["S", "DS"]:
-                    if action_code == "DS" and self._can_double(hand_info["cards"]):
-                        self._do_double(hand_info)
-                        break
+        while i < self._num_player_hands:
+            hand = self._player_hands[i]
+            while hand.status == ACTIVE:
+                action_code = self.strategy.decide_action(hand.total, hand.soft, hand.pair_code(), dealer_card, self.shoe.decks_remaining())
+                if action_code == HIT:
+                    self._do_hit(hand)
+
+                elif action_code == STAND:
+                    hand.status = STOOD
+
+                elif action_code == DOUBLE_HIT or action_code == DOUBLE_STAND:
+                    if self._can_double(hand):
+                        self._do_double(hand)
+                    elif action_code == DOUBLE_HIT:
+                        self._do_hit(hand)
+                    else:
+                        hand.status = STOOD
+
+                elif action_code == SPLIT or action_code == SPLIT_HIT:
+                    if self._can_split(hand) and (action_code == SPLIT or self.rules.double_after_split_allowed):
+                        self._do_split(i)
+                    else:
+                        self._do_hit(hand)
+
+                elif action_code == SURRENDER_HIT:
+                    if self.rules.surrender_allowed and self._can_surrender(hand):
+                        self._do_surrender(hand)
                     else:
-                        hand_info["status"] = "stood"
-                        break
-                
-                elif action_code == "P":
-                    if self._can_split(hand_info["cards"]):
-                        self._do_split(player_hands, i)
-                        break
+                        self._do_hit(hand)
 
                 else:
                     print(f"Invalid action code: {action_code}")
-                    hand_info["status"] = "stood"
-                    break
+                    hand.status = STOOD
             i += 1
-        return player_hands    
+        return self._num_player_hands
         
     def _can_double(self, hand):
-        return len(hand) == 2
+        return hand.num_cards == 2
 
     def _can_split(self, hand):
-        return len(hand) == 2 and hand[0].rank == hand[1].rank
+        return hand.pair
 
     def _can_surrender(self, hand):
-        return len(hand) == 2
-
-    def _do_double(self, hand_info):
-        if self.debug:
-            print("Doubling down")
-        hand_info["bet"] *= 2
-        new_card = self.shoe.deal_card()
-        self.strategy.update_count(new_card)
-        hand_info["cards"].append(new_card)
-        if self.rules.hand_value(hand_info["cards"]) > 21:
-            hand_info["status"] = "busted"
-        else:
-            hand_info["status"] = "stood"
-
-    def _do_split(self, player_hands, i):
-        new_card_for_first = self.shoe.deal_card()
-        new_card_for_second = self.shoe.deal_card()
-
-        self.strategy.update_count(new_card_for_first)
-        self.strategy.update_count(new_card_for_second)
-
-        card_to_move = player_hands[i]["cards"].pop()
-
-        player_hands[i]["cards"] = [player_hands[i]["cards"][0], new_card_for_first]
-        player_hands[i]["status"] = "active"
-
-        second_hand = {
-            "cards": [card_to_move, new_card_for_second],
-            "bet": player_hands[i]["bet"],
-            "status": "active"
-        }
-        player_hands.insert(i + 1, second_hand)
-
-    def _do_surrender(self, hand_info):
-        hand_info["status"] = "surrendered"
+        return hand.num_cards == 2
+
+    def _do_hit(self, hand):
+        new_card = self.shoe.deal_code()
+        self.strategy.update_count_code(new_card)
+        hand.add(new_card)
+
+    def _do_double(self, hand):
+        if self.profiler is not None:
+            self.profiler.event("double")
+        hand.bet *= 2
+        self._do_hit(hand)
+        if hand.status == ACTIVE:
+            hand.status = STOOD
+
+    def _do_split(self, i):
+        if self.profiler is not None:
+            self.profiler.event("split")
+        new_card_for_first = self.shoe.deal_code()
+        new_card_for_second = self.shoe.deal_code()
+
+        self.strategy.update_count_code(new_card_for_first)
+        self.strategy.update_count_code(new_card_for_second)
+
+        hands = self._player_hands
+        if self._num_player_hands == len(hands):
+            hands.append(Hand())
+        # Move a spare hand from the end of the pool to sit right after the split hand
+        second_hand = hands.pop(self._num_player_hands)
+        hands.insert(i + 1, second_hand)
+        self._num_player_hands += 1
+
+        hand = hands[i]
+        pair_card = hand.first
+        second_hand.start(pair_card, new_card_for_second, hand.bet)
+        hand.start(pair_card, new_card_for_first, hand.bet)
+
+    def _do_surrender(self, hand):
+        if self.profiler is not None:
+            self.profiler.event("surrender")
+        hand.status = SURRENDERED
 
     def dealer_turn(self, dealer_hand):
-        while self.rules.dealer_should_hit(dealer_hand):
-            new_card = self.shoe.deal_card()
-            self.strategy.update_count(new_card)
-            dealer_hand.append(new_card)
+        while self.rules.dealer_should_hit_total(dealer_hand.total, dealer_hand.soft):
+            new_card = self.shoe.deal_code()
+            self.strategy.update_count_code(new_card)
+            dealer_hand.add(new_card)
         return dealer_hand
 
-    def settle_bet(self, hand_info, dealer_total):
-        status = hand_info["status"]
-        player_total = self.rules.hand_value(hand_info["cards"])
-        bet = hand_info["bet"]
+    def settle_bet(self, hand, dealer_total):
+        status = hand.status
+        player_total = hand.total
+        bet = hand.bet
 
-        if status == "surrendered":
+        if status == SURRENDERED:
             return -bet / 2
-        elif status == "busted":
+        elif status == BUSTED:
             return -bet
         else:
             if dealer_total > 21:
@@ -255,32 +363,140 @@ class Simulator:
             else:
                 return 0.0
 
-    def run_simulation(self, num_hands=None, bankroll_limit=None):
+    def settle_expected(self, hand, dealer_probs):
+        status = hand.status
+        if status == SURRENDERED:
+            return -hand.bet / 2
+        elif status == BUSTED:
+            return -hand.bet
+        return hand.bet * expected_settlement(hand.total, dealer_probs)
+
+    def run_simulation(self, num_hands=None, bankroll_limit=None, history="full", history_stride=1,
+                       checkpoint_path=None, checkpoint_every=100000, history_file=None, history_row=0,
+                       on_progress=None, progress_every=10000):
+        """
+            - checkpoint_path = file to save the full simulator state to every checkpoint_every
+              hands and when the run ends; Simulator.resume(checkpoint_path) continues the run
+              and gives exactly the results an uninterrupted run would have
+            - history_file = .npy history matrix (see history.create_history_file) to write the
+              bankroll history into, at row history_row, instead of returning it as a list
+            - on_progress(hands_played) is called every progress_every hands; if it returns True
+              the run stops there, unfinished (a checkpointed run can later be resumed)
+        """
         if num_hands:
             self.num_hands = num_hands
 
         if bankroll_limit:
             self.player_bankroll = bankroll_limit
             self.stop_if_bankrupt = True
-        bankroll_history = []
-
-        for _ in range(self.num_hands):
+        self._recorder = BankrollRecorder(history, history_stride, self.player_bankroll, history_file, history_row)
+        self._target_hands = self.hands_played + self.num_hands
+        self._run_finished = False
+        return self._run(checkpoint_path, checkpoint_every, on_progress, progress_every)
+
+    def _run(self, checkpoint_path=None, checkpoint_every=100000, on_progress=None, progress_every=10000):
+        recorder = self._recorder
+        stopped = False
+        while self.hands_played < self._target_hands:
             if self.shoe.decks_remaining() < self.rules.deck_penetration:
-                self.shoe = Shoe(self.rules.decks)
+                self.shoe.reshuffle()
                 self.strategy.reset_count()
             result = self.play_hand()
-            self.player_bankroll += result
             self.hands_played += 1
-            bankroll_history.append(self.player_bankroll)
+            recorder.record(self.player_bankroll, result)
             
             if self.stop_if_bankrupt and self.player_bankroll < 0:
                 break
+            if checkpoint_path and self.hands_played % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_path)
+            if on_progress and self.hands_played % progress_every == 0 and on_progress(self.hands_played):
+                stopped = True
+                break
+
+        self._run_finished = not stopped
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+        return self._results()
 
-        return {
+    def run_until_precision(self, target_half_width, batch_hands=10000, min_batches=10, max_hands=10000000,
+                            history="off", history_stride=1):
+        """
+            Play batches of batch_hands until the 95% CI half-width of the house edge (in
+            percentage points) is at most target_half_width, or max_hands have been played.
+            The CI comes from batch means: each batch's own house edge is one observation.
+        """
+        self.stop_if_bankrupt = False
+        self._recorder = BankrollRecorder(history, history_stride, self.player_bankroll)
+        self._target_hands = self.hands_played
+        start_hands = self.hands_played
+        batch_edges = RunningStats()
+        half_width = batch_means_half_width(batch_edges)
+
+        while self.hands_played - start_hands < max_hands:
+            bankroll, amount_bet = self.player_bankroll, self.amount_bet
+            self._target_hands += min(batch_hands, max_hands - (self.hands_played - start_hands))
+            self._run()
+            if self.amount_bet > amount_bet:
+                batch_edges.push(-(self.player_bankroll - bankroll) / (self.amount_bet - amount_bet) * 100)
+            half_width = batch_means_half_width(batch_edges)
+            if batch_edges.count >= min_batches and half_width <= target_half_width:
+                break
+
+        results = self._results()
+        edge = results["House Advantage (%)"]
+        results.update({
+            "batches": batch_edges.count,
+            "half_width": half_width,
+            "CI_95": (edge - half_width, edge + half_width),
+            "converged": half_width <= target_half_width,
+        })
+        return results
+
+    def _results(self):
+        results = {
             "hands_played": self.hands_played,
             "final_bankroll": self.player_bankroll,
-            "bankroll_history": bankroll_history,
             "amount_bet": self.amount_bet,
             "avg_profit_per_hand": self.player_bankroll / self.hands_played,
             "House Advantage (%)":  (1 - (self.player_bankroll + self.amount_bet) / self.amount_bet) * 100
-        }
\ No newline at end of file
+        }
+        results.update(self._recorder.summary())
+        return results
+
+# ================CHECKPOINTS=================
+    def __getstate__(self):
+        # The dealer outcome cache is rebuilt on load rather than saved
+        state = self.__dict__.copy()
+        state["_dealer_outcomes"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.settlement == "expected":
+            self._dealer_outcomes = DealerOutcomeCache(self.rules, resolution=self.settlement_resolution)
+
+    def save_checkpoint(self, path):
+        # Written to a temporary file and renamed, so a crash never leaves a torn checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": CHECKPOINT_VERSION, "simulator": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_checkpoint(path):
+        with open(path, "rb") as f:
+            checkpoint = pickle.load(f)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {checkpoint.get('version')} in {path}")
+        return checkpoint["simulator"]
+
+    @staticmethod
+    def resume(path, checkpoint_every=100000):
+        # Continue the run saved at path (or just return its results if it had finished)
+        simulator = Simulator.load_checkpoint(path)
+        if simulator._recorder is None:
+            raise ValueError(f"Checkpoint {path} has no run in progress")
+        if simulator._run_finished:
+            return simulator._results()
+        return simulator._run(path, checkpoint_every)
+# ============================================
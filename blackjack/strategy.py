@@ -1,73 +1,122 @@
 # blackjack/strategy.py
 
-import yaml
 import math 
+from .cache import compiled
+from .cards import ACE, RANK_VALUES
+from .counting import load_count_tags
 
-class Strategy:
-    def __init__(self, hand, dealer_card, rules):
-        self.hand = hand
-        self.dealer_card = dealer_card
-        self.rules = rules
-
-        self.dealer_index_map = {"2": 0, "3": 1, "4": 2, "5": 3, "6": 4, "7": 5, "8": 6, "9": 7, "10": 8, "J": 8, "Q": 8, "K": 8, "A": 9}         
-
-    
-    def get_coordinates(self):
-        if self._is_pair():
-            row_index = self._pair_row_index()
-            table_index = 2
-        elif self._is_soft():
-            row_index = self._soft_row_index()
-            table_index = 1
-        else:
-            row_index = self._hard_row_index()
-            table_index = 0
-        
-        col_index = self._get_col_index()
-
-        return table_index, row_index, col_index
-
-    def _is_pair(self):
-        return (len(self.hand) == 2) and (self.hand[0].rank == self.hand[1].rank)
-
-    def _is_soft(self):
-        total = self.rules.hand_value(self.hand)
-        has_ace = any(card.rank == "A" for card in self.hand)
-        return has_ace and self.rules.hand_value(self.hand) < 21
-
-    def _pair_row_index(self):
-        rank = self.hand[0].rank
-        if rank == '2': return 0
-        if rank == '3': return 1
-        if rank == '4': return 2
-        if rank == '5': return 3
-        if rank == '6': return 4
-        if rank == '7': return 5
-        if rank == '8': return 6
-        if rank == '9': return 7
-        if rank in ['10', 'J', 'Q', 'K']: return 8
-        if rank == 'A': return 9
-        return 0
+from array import array
+
+# Chart column (and pair row) for each rank code: 2-9, then 10/J/Q/K share a column, then A
+RANK_COLUMNS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8, 9]
+
+STRATEGY_CONFIG = "config/strategy.yaml"
+SPREAD_CONFIG = "config/spread.yaml"
+
+# Action codes, in the order they are stored in the compiled table
+ACTIONS = ["H", "S", "DH", "DS", "P", "PH", "RH"]
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+HIT, STAND, DOUBLE_HIT, DOUBLE_STAND, SPLIT, SPLIT_HIT, SURRENDER_HIT = range(len(ACTIONS))
 
-    def _soft_row_index(self):
-        total = self.rules.hand_value(self.hand)
-        if total >= 19:
-            return 6
-        row = total - 13
-        if row < 0:
-            row = 0
-        return row
-
-    def _hard_row_index(self):
-        total = self.rules.hand_value(self.hand)
-        if total < 9:
-            return 0
-        if total >= 17:
-            return 9
-        return total - 8
-
-    def _get_col_index(self):
-        return self.dealer_index_map[self.dealer_card.rank]
+# Compiled chart layout: layer (true count) x table (hard/soft/pair) x row x dealer column
+TABLE_SIZE = 10 * 10
+LAYER_SIZE = 3 * TABLE_SIZE
+
+def _hard_row(total):
+    if total < 9:
+        return 0
+    if total >= 17:
+        return 9
+    return total - 8
+
+def _soft_row(total):
+    if total >= 19:
+        return 6
+    return max(total - 13, 0)
+
+# Offset of the chart row within a layer, indexed by [soft][total] (pairs use PAIR_ROWS)
+HAND_ROWS = [
+    [_hard_row(total) * 10 for total in range(32)],
+    [TABLE_SIZE + _soft_row(total) * 10 for total in range(32)],
+]
+PAIR_ROWS = [2 * TABLE_SIZE + column * 10 for column in RANK_COLUMNS]
+
+def compile_chart(counts):
+    """
+        Flatten the nested YAML charts into one action-code array. Tables with fewer
+        than 10 rows (soft) are padded by repeating their last row.
+    """
+    table = array("B")
+    for layer in counts:
+        for rows in layer:
+            rows = list(rows) + [rows[-1]] * (10 - len(rows))
+            for row in rows:
+                table.extend(ACTION_CODES[action] for action in row)
+    return table
+
+def _compile_strategy(data, strategy_name):
+    charts = data[strategy_name]["counts"]
+    return charts, compile_chart(charts)
+
+def compile_ramp(data, spread_name):
+    """
+        Bet multiplier of a spread for each whole true count, as (low, multipliers) with
+        multipliers[0] at true count low. Each entry is the bet of the last threshold in list
+        order that the count reaches (1 if none).
+        Counts below low or past the end bet like the nearest entry.
+    """
+    thresholds = data[spread_name]["thresholds"]
+    if not thresholds:
+        return None
+    low = math.floor(min(x["count"] for x in thresholds)) - 1
+    high = math.ceil(max(x["count"] for x in thresholds))
+    multipliers = []
+    for tc in range(low, high + 1):
+        chosen_bet = 1
+        for x in thresholds:
+            if tc >= x["count"]:
+                chosen_bet = x["bet"]
+        multipliers.append(chosen_bet)
+    return low, multipliers
+
+def compile_count_records(ramp, layers, layer_offset, insurance_count_threshold):
+    """
+        One (bet multiplier, take insurance, chart layer base) record per whole true count,
+        as (low, records) with records[0] at true count low. The range covers the spread,
+        every chart layer and the insurance threshold, so clamping a count into it gives the
+        same answer as the unclamped count.
+    """
+    low, high = -layer_offset, layers - 1 - layer_offset
+    if ramp is not None:
+        low, high = min(low, ramp[0]), max(high, ramp[0] + len(ramp[1]) - 1)
+    if insurance_count_threshold:
+        insurance = math.ceil(insurance_count_threshold)
+        low, high = min(low, insurance - 1), max(high, insurance)
+
+    records = []
+    for tc in range(low, high + 1):
+        if ramp is None:
+            multiplier = 1
+        else:
+            multiplier = ramp[1][min(max(tc - ramp[0], 0), len(ramp[1]) - 1)]
+        insure = bool(insurance_count_threshold) and tc >= insurance_count_threshold
+        layer = min(max(tc, -layer_offset), layers - 1 - layer_offset) + layer_offset
+        records.append((multiplier, insure, layer * LAYER_SIZE))
+    return low, records
+
+def hand_state(codes):
+    # (total, soft) for a list of rank codes, counting one ace as 11 when it fits
+    total = 0
+    has_ace = False
+    for code in codes:
+        if code == ACE:
+            total += 1
+            has_ace = True
+        else:
+            total += RANK_VALUES[code]
+    if has_ace and total <= 11:
+        return total + 10, True
+    return total, False
 
 class BasicStrategy:
     def __init__(self, bet=15, strategy_name="basic", spread_name="basic", counting_system="hi-lo", insurance_count_threshold=None):
@@ -79,173 +128,45 @@ class BasicStrategy:
         self.strategy_name = strategy_name
         self.spread_name = spread_name
 
-        with open ("config/strategy.yaml", "r") as f:
-            data = yaml.safe_load(f)
+        self._tags = load_count_tags(counting_system)
 
-        if self.strategy_name:
-            self._all_charts = data[strategy_name]["counts"]
-        else:    
-            self._all_charts = data["basic"]["counts"]
-        
+        # Parsed and compiled charts/spreads are cached in-process and on disk (see cache.py)
+        chart_name = strategy_name or "basic"
+        self._all_charts, self._table = compiled(STRATEGY_CONFIG, ("chart", chart_name), lambda data: _compile_strategy(data, chart_name))
+        self._layers = len(self._all_charts)
+        self._layer_offset = self._layers // 2      # Layer of true count 0 in deviation charts
 
+        # Spreads (including the GUI's custom one, saved to spread.yaml) compile to a ramp
+        # indexed by true count; editing the file recompiles it
         if self.spread_name:
-            with open("config/spread.yaml", "r") as f:
-                data = yaml.safe_load(f)
-            self._spread = data[spread_name]["thresholds"]
-        else: 
-            self._spread = None
+            self._ramp = compiled(SPREAD_CONFIG, ("spread", spread_name), lambda data: compile_ramp(data, spread_name))
+        else:
+            self._ramp = None
+        self._compile_records()
+
+    def _compile_records(self):
+        self._records_low, self._records = compile_count_records(self._ramp, self._layers, self._layer_offset, self.insurance_count_threshold)
+
+    def __getstate__(self):
+        # Checkpoints keep the compiled table but not the nested YAML charts or count records
+        state = self.__dict__.copy()
+        del state["_all_charts"]
+        del state["_records"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        chart_name = self.strategy_name or "basic"
+        self._all_charts = compiled(STRATEGY_CONFIG, ("chart", chart_name), lambda data: _compile_strategy(data, chart_name))[0]
+        self._compile_records()
 
 # ================COUNTING SYSETMS=================
+    # Tags live in config/counting.yaml, compiled to one entry per rank code
     def update_count(self, card):
-        # Hi-Lo Example (2-6 = +1, 7-9 = 0, 10-Ace = -1)
-        rank = card.rank
-        if self.counting_system == "hi-lo":
-            if rank in ["2", "3", "4", "5", "6"]:
-                self.running_count += 1
-            elif rank in ["10", "J", "Q", "K", "A"]:
-                self.running_count -= 1
-
-        elif self.counting_system == "hi-lo opt I":
-            if rank in ["3", "4", "5", "6"]:
-                self.running_count += 1
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 1
-        
-        elif self.counting_system == "hi-lo opt II":
-            if rank in ["2", "3", "6", "7"]:
-                self.running_count += 1
-            elif rank in ["4", "5"]:
-                self.running_count += 2
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 2
-        
-        elif self.counting_system == "k-o":
-            if rank in ["2", "3", "4", "5", "6", "7"]:
-                self.running_count += 1
-            elif rank in ["10", "J", "Q", "K", "A"]:
-                self.running_count -= 1
-
-        elif self.counting_system == "mentor":
-            if rank in ["2", "7"]:
-                self.running_count += 1
-            elif rank in ["3", "4", "5", "6"]:
-                self.running_count += 2
-            elif rank in ["9", "A"]:
-                self.running_count -= 1
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 2
-
-        elif self.counting_system == "omega II":
-            if rank in ["2", "3", "7"]:
-                self.running_count += 1
-            elif rank in ["4", "5", "6"]:
-                self.running_count += 2
-            elif rank == "9":
-                self.running_count -= 1
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 2
-
-        elif self.counting_system == "reko":
-            if rank in ["2", "3", "4", "5", "6", "7"]:
-                self.running_count += 1
-            elif rank in ["10", "J", "Q", "K", "A"]:
-                self.running_count -= 1
-
-        elif self.counting_system == "reverse point count":
-            if rank in ["2", "7"]:
-                self.running_count += 1
-            elif rank in ["3", "4", "5", "6"]:
-                self.running_count += 2
-            elif rank in ["10", "J", "Q", "K", "A"]:
-                self.running_count -= 2
-
-        elif self.counting_system == "reverse 14 count":
-            if rank == "7":
-                self.running_count += 1
-            elif rank in ["2", "3", "6"]:
-                self.running_count += 2
-            elif rank == "4":
-                self.running_count += 3
-            elif rank == "5":
-                self.running_count += 4
-            elif rank == "9":
-                self.running_count -= 2
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 3
-
-        elif self.counting_system == "reverse rapc":
-            if rank in ["2", "7"]:
-                self.running_count += 2
-            elif rank in ["3", "4", "6"]:
-                self.running_count += 3
-            elif rank == "5":
-                self.running_count += 4
-            elif rank == "9":
-                self.running_count -= 1
-            elif rank in  ["10", "J", "Q", "K"]:
-                self.running_count -= 3
-            elif rank == "A":
-                self.running_count -= 4
-
-        elif self.counting_system == "silver fox":
-            if rank in ["2", "3", "4", "5", "6", "7"]:
-                self.running_count += 1
-            elif rank in ["9", "10", "J", "Q", "K", "A"]:
-                self.running_count -= 1
-
-        elif self.counting_system == "unbalanced zen 2":
-            if rank in ["2", "7"]:
-                self.running_count += 1
-            elif rank in ["3", "4", "5", "6"]:
-                self.running_count += 2
-            elif rank == "A":
-                self.running_count -= 1
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 2
-
-        elif self.counting_system == "uston apc":
-            if rank in ["2", "8"]:
-                self.running_count += 1
-            elif rank in ["3", "4", "6", "7"]:
-                self.running_count += 2
-            elif rank == "5":
-                self.running_count += 3
-            elif rank == "9":
-                self.running_count -= 1
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 3
-
-        elif self.counting_system == "uston ss":
-            if rank == "7":
-                self.running_count += 1
-            elif rank in ["2", "3", "4", "6"]:
-                self.running_count += 2
-            elif rank == "9":
-                self.running_count -= 1
-            elif rank in ["10", "J", "Q", "K", "A"]:
-                self.running_count -= 2
-
-        elif self.counting_system == "wong halves":
-            if rank in ["2", "7"]:
-                self.running_count += 0.5
-            elif rank in ["3", "4", "6"]:
-                self.running_count += 1
-            elif rank == "5":
-                self.running_count += 1.5
-            elif rank == "9":
-                self.running_count -= 0.5
-            elif rank in ["10", "J", "Q", "K", "A"]:
-                self.running_count -= 1
-
-        elif self.counting_system == "zen count":
-            if rank in ["2", "3", "7"]:
-                self.running_count += 1
-            elif rank in ["4", "5", "6"]:
-                self.running_count += 2
-            elif rank == "A":
-                self.running_count -= 1
-            elif rank in ["10", "J", "Q", "K"]:
-                self.running_count -= 2
+        self.running_count += self._tags[card.code]
+
+    def update_count_code(self, code):
+        self.running_count += self._tags[code]
 # =================================================
 
     def reset_count(self):
@@ -256,29 +177,43 @@ class BasicStrategy:
             return self.running_count
         return self.running_count / (decks_remaining)
 
-    # FIXME: Change to add spread.yaml and pull values from there
-    # Rework all logic in here
+    def count_record(self, decks_remaining):
+        # (bet multiplier, take insurance, chart layer base) for the current floored true count
+        running_count = self.running_count
+        tc = running_count / decks_remaining if decks_remaining >= 1 else running_count
+        index = math.floor(tc) - self._records_low
+        records = self._records
+        if index < 0:
+            return records[0]
+        if index >= len(records):
+            return records[-1]
+        return records[index]
+
     def get_bet(self, decks_remaining):
-        tc = math.floor(self.get_true_count(decks_remaining))
-        chosen_bet = 1 # Default
-        if not self._spread:
-            return self.bet
-        for x in self._spread:
-            threshold = x["count"] 
-            if tc >= threshold:
-                chosen_bet = x["bet"]
-        return chosen_bet * self.bet
+        return self.count_record(decks_remaining)[0] * self.bet
+
+    def take_insurance(self, decks_remaining):
+        return self.count_record(decks_remaining)[1]
 
     def decide_player_action(self, hand, dealer_card, rules, decks_remaining):
-        # TC_index Logic Goes here in other versions
-        if self.strategy_name != "basic":
-            tc = math.floor(self.get_true_count(decks_remaining))
-            tc = min(max(tc, -6), 6)
-            chart = self._all_charts[tc + 6]
+        codes = [card.code for card in hand]
+        return ACTIONS[self.decide_player_action_codes(codes, dealer_card.code, rules, decks_remaining)]
+
+    def decide_player_action_codes(self, codes, dealer_code, rules, decks_remaining):
+        total, soft = hand_state(codes)
+        pair_code = codes[0] if len(codes) == 2 and codes[0] == codes[1] else -1
+        return self.decide_action(total, soft, pair_code, dealer_code, decks_remaining)
+
+    def decide_action(self, total, soft, pair_code, dealer_code, decks_remaining):
+        # Returns an action code; pair_code is the paired rank code or -1
+        if self._layers > 1:
+            base = self.count_record(decks_remaining)[2]
         else:
-            chart = self._all_charts[0]
+            base = 0
 
-        strategy = Strategy(hand, dealer_card, rules)
-        table_index, row_index, col_index = strategy.get_coordinates()
+        if pair_code >= 0:
+            row = PAIR_ROWS[pair_code]
+        else:
+            row = HAND_ROWS[soft][total]
 
-        return chart[table_index][row_index][col_index]
+        return self._table[base + row + RANK_COLUMNS[dealer_code]]
@@ -0,0 +1,171 @@
+# blackjack/sweep.py
+
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .simulation import Simulator
+from .strategy import BasicStrategy
+from .utils import derive_seed, load_settings
+
+# Short grid names for the common axes; any other grid key must be a Simulator.setup argument
+SWEEP_AXES = {
+    "decks": "num_decks",
+    "penetration": "penetration",
+    "dealer_hits_soft_17": "dealer_hits_soft_17",
+    "counting": "counting_system",
+    "spread": "spread_name",
+    "strategy": "strategy_name",
+}
+
+# Batches per cell for the batch-means house edge CI
+SWEEP_BATCHES = 20
+
+RESULT_COLUMNS = ["num_hands", "seed", "hands_played", "amount_bet", "final_bankroll", "house_edge",
+                  "house_edge_CI_low", "house_edge_CI_high", "mean_result", "stddev_result", "seconds"]
+
+def load_sweep(path="config/settings.yaml"):
+    sweep = load_settings(path).get("sweep")
+    if not sweep or not sweep.get("grid"):
+        raise ValueError(f"No sweep grid in {path}")
+    return sweep
+
+def cell_key(setup_kwargs, num_hands, seed):
+    # Stable id of a cell, used to skip cells that are already in the results file
+    text = json.dumps([sorted(setup_kwargs.items()), num_hands, seed])
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+def expand_grid(sweep):
+    """
+        Every cell of the sweep as a dict of Simulator.setup arguments, in grid order:
+        sweep["base"] gives the fixed arguments and each sweep["grid"] entry a list of values.
+    """
+    base = {"compact_shoe": True}
+    base.update(sweep.get("base") or {})
+    axes = [(SWEEP_AXES.get(name, name), values if isinstance(values, list) else [values])
+            for name, values in sweep["grid"].items()]
+    return [dict(base, **dict(zip([name for name, _ in axes], combination)))
+            for combination in itertools.product(*[values for _, values in axes])]
+
+def sweep_columns(cells):
+    columns = ["cell"]
+    for cell in cells:
+        columns.extend(name for name in cell if name not in columns)
+    return columns + RESULT_COLUMNS
+
+def run_cell(setup_kwargs, num_hands, seed, batches=SWEEP_BATCHES):
+    # The house edge CI comes from batch means (see Simulator.run_until_precision): with a
+    # count-based spread, bets and outcomes within a shoe are correlated, so per-hand variance
+    # would give a falsely tight interval
+    start = time.perf_counter()
+    simulator = Simulator(seed=seed)
+    simulator.setup(**setup_kwargs)
+    result = simulator.run_until_precision(0.0, batch_hands=-(-num_hands // batches), min_batches=batches, max_hands=num_hands)
+
+    low, high = result["CI_95"]
+    row = dict(setup_kwargs)
+    row.update({
+        "num_hands": num_hands,
+        "seed": seed,
+        "hands_played": result["hands_played"],
+        "amount_bet": result["amount_bet"],
+        "final_bankroll": result["final_bankroll"],
+        "house_edge": result["House Advantage (%)"],
+        "house_edge_CI_low": low,
+        "house_edge_CI_high": high,
+        "mean_result": result["mean_result"],
+        "stddev_result": result["stddev_result"],
+        "seconds": time.perf_counter() - start,
+    })
+    return row
+
+def _parse(value):
+    # CSV cells back to bool/int/float where they look like one
+    if value in ("True", "False"):
+        return value == "True"
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
+
+def read_results(path):
+    with open(path, newline="") as f:
+        return [{name: value if name == "cell" else _parse(value) for name, value in row.items()}
+                for row in csv.DictReader(f)]
+
+def _warm_tables(cells):
+    # Build each strategy/spread/counting combination once up front: bad names fail before any
+    # work starts, and the compiled tables land in the config cache the workers load from
+    seen = set()
+    for cell in cells:
+        names = (cell.get("strategy_name", "basic"), cell.get("spread_name", "basic"), cell.get("counting_system", "hi-lo"))
+        if names not in seen:
+            seen.add(names)
+            BasicStrategy(strategy_name=names[0], spread_name=names[1], counting_system=names[2])
+
+def run_sweep(sweep, output_path=None, max_workers=None, on_cell=None):
+    """
+        Run every cell of a sweep (see expand_grid) for sweep["num_hands"] hands across a process
+        pool and append one row per cell to the CSV at output_path (default sweep["output"]).
+            - cells already in the file (same arguments, num_hands and seed) are skipped, so an
+              interrupted or extended sweep only runs what is missing
+            - cell seeds come from sweep["seed"] and the cell's arguments, not its position, so
+              adding values to an axis leaves existing cells unchanged
+        on_cell(row, done, total) is called as cells finish. Returns all rows in grid order.
+    """
+    output_path = output_path or sweep.get("output", "sweep_results.csv")
+    num_hands = sweep.get("num_hands", 100000)
+    master_seed = sweep.get("seed", 0)
+    cells = expand_grid(sweep)
+    columns = sweep_columns(cells)
+
+    keys = []
+    for cell in cells:
+        key = cell_key(cell, num_hands, master_seed)
+        keys.append((key, derive_seed(master_seed, int(key, 16))))
+
+    rows = {}
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, newline="") as f:
+            header = next(csv.reader(f))
+        if header != columns:
+            raise ValueError(f"{output_path} has different columns than this sweep; use another output file")
+        rows = {row["cell"]: row for row in read_results(output_path)}
+    else:
+        with open(output_path, "w", newline="") as f:
+            csv.writer(f).writerow(columns)
+
+    pending = [(cell, key, seed) for cell, (key, seed) in zip(cells, keys) if key not in rows]
+    done = len(cells) - len(pending)
+    _warm_tables([cell for cell, _, _ in pending])
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    with open(output_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+
+        def finish(key, row):
+            nonlocal done
+            row = dict(row, cell=key)
+            writer.writerow(row)
+            f.flush()
+            rows[key] = row
+            done += 1
+            if on_cell:
+                on_cell(row, done, len(cells))
+
+        if max_workers <= 1:
+            for cell, key, seed in pending:
+                finish(key, run_cell(cell, num_hands, seed))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(run_cell, cell, num_hands, seed): key for cell, key, seed in pending}
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+
+    return [rows[key] for key, _ in keys]
@@ -2,6 +2,7 @@
 
 import yaml
 import random
+import numpy as np
 
 def load_settings(file_path):
     with open(file_path, "r") as f:
@@ -13,4 +14,8 @@ def save_to_yaml(data, filename):
 
 
 def set_random_seed(seed_val):
-    random.seed(seed_val)
\ No newline at end of file
+    random.seed(seed_val)
+
+def derive_seed(master_seed, index):
+    # Independent, reproducible seed for stream `index` of a master seed
+    return int(np.random.SeedSequence(master_seed, spawn_key=(index,)).generate_state(1)[0])
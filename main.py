@@ -3,16 +3,23 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
+import queue
+import multiprocessing
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
 import time  # Used for simulating a long-running task
+import random
 import platform
-
-# Import the Simulator class from your simulation module
-from blackjack.simulation import Simulator  # Adjust the import path as needed
-from blackjack.analysis import analyze_simulation_results
+import numpy as np
+
+from blackjack.batch import BatchSimulator
+from blackjack.parallel import run_parallel, run_parallel_until_precision
+from blackjack.analysis import RunningStats, analyze_simulation_results, batch_means_half_width
+from blackjack.plotting import aggregate_histories, draw_bankroll_bands
+from blackjack.results import write_results, write_summary_csv
+from blackjack.ror import risk_of_ruin
 from blackjack.utils import load_settings, save_to_yaml
+from blackjack.counting import load_counting_systems
 
 class BlackjackGUI:
     def __init__(self, root):
@@ -36,8 +43,22 @@ class BlackjackGUI:
         # Set minimum and maximum sizes (optional)
         self.root.minsize(1200, 800)
         self.root.maxsize(2000, 1600)
+
+        # Results and setup of the last finished simulation, for Export Results
+        self.last_results = None
+        self.last_params = None
+
+        # The simulation runs on a background thread that never touches Tk: it posts to
+        # self.messages, and workers post hand counts to self.progress_queue (a Manager queue,
+        # so pool processes can reach it). poll_messages drains both on the Tk thread.
+        self.messages = queue.Queue()
+        self.manager = None
+        self.progress_queue = None
+        self.cancel_event = None
+        self.job = None
         
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_widgets(self):
         # Main Frame
@@ -98,12 +119,7 @@ class BlackjackGUI:
         # Counting System Selection
         ttk.Label(sim_params_frame, text="Counting System:").grid(row=4, column=0, padx=5, pady=5, sticky="e")
         self.counting_var = tk.StringVar()
-        counting_systems = [
-            "hi-lo", "hi-lo opt I", "hi-lo opt II", "k-o", "mentor", "omega II",
-            "rkeo", "reverse point count", "reverse 14 count", "reverse rapc",
-            "silver fox", "unbalanced zen 2", "uston apc", "uston ss",
-            "wong halves", "zen count"
-        ]
+        counting_systems = list(load_counting_systems())
         self.counting_combo = ttk.Combobox(sim_params_frame, textvariable=self.counting_var,
                                            values=counting_systems, state="readonly", width=20)
         self.counting_combo.current(0)
@@ -132,6 +148,20 @@ class BlackjackGUI:
         self.spread_combo.current(0)
         self.spread_combo.grid(row=7, column=1, padx=5, pady=5, sticky="w")
 
+        # Batch Engine (plays every run as one lane of the NumPy batch simulator)
+        self.batch_engine_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(sim_params_frame, text="Batch Engine (NumPy, no Target CI)", variable=self.batch_engine_var).grid(row=8, column=1, padx=5, pady=5, sticky="w")
+
+        # Target Precision (keeps adding batches of runs until the house edge / risk of ruin CI is this tight)
+        ttk.Label(sim_params_frame, text="Target CI \u00b1 (%, 0 = off):").grid(row=9, column=0, padx=5, pady=5, sticky="e")
+        self.target_precision_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(sim_params_frame, textvariable=self.target_precision_var, width=15).grid(row=9, column=1, padx=5, pady=5, sticky="w")
+
+        # Win Goal (Risk of Ruin trials also stop once the bankroll has grown by this much)
+        ttk.Label(sim_params_frame, text="Win Goal ($, 0 = none):").grid(row=10, column=0, padx=5, pady=5, sticky="e")
+        self.win_goal_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(sim_params_frame, textvariable=self.win_goal_var, width=15).grid(row=10, column=1, padx=5, pady=5, sticky="w")
+
         # ---------------- Game Rules ----------------
 
         # Number of Decks
@@ -204,13 +234,24 @@ class BlackjackGUI:
         self.reset_button = ttk.Button(button_frame, text="Reset Fields", command=self.reset_fields)
         self.reset_button.pack(side="left", padx=5)
 
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_simulation, state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+
         self.export_button = ttk.Button(button_frame, text="Export Results", command=self.export_results, state="disabled")
         self.export_button.pack(side="left", padx=5)
 
         # ---------------- Progress Bar ----------------
 
-        self.progress = ttk.Progressbar(main_frame, orient='horizontal', mode='determinate')
-        self.progress.grid(row=3, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=3, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
+        progress_frame.columnconfigure(0, weight=1)
+
+        self.progress = ttk.Progressbar(progress_frame, orient='horizontal', mode='determinate')
+        self.progress.grid(row=0, column=0, sticky="ew")
+
+        # Running statistics while a simulation is in progress
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(progress_frame, textvariable=self.status_var).grid(row=1, column=0, sticky="w")
 
         # ---------------- Results Display ----------------
 
@@ -257,6 +298,9 @@ class BlackjackGUI:
         self.strategy_combo.current(0)
         self.spread_combo.current(0)
         self.penetration_var.set(0.25)
+        self.batch_engine_var.set(False)
+        self.target_precision_var.set(0.0)
+        self.win_goal_var.set(0.0)
 
         # Reset Game Rules
         self.hit_soft_17_var.set(True)
@@ -276,6 +320,7 @@ class BlackjackGUI:
 
         # Reset Progress Bar
         self.progress['value'] = 0
+        self.status_var.set("")
 
         # Disable Export Button
         self.export_button.config(state="disabled")
@@ -298,7 +343,10 @@ class BlackjackGUI:
             "insurance_allowed": self.insurance_allowed_var.get(),
             "insurance_threshold": self.insurance_threshold_var.get(),
             "counting_system": self.counting_var.get(),
-            "sim_type": self.sim_type_var.get()
+            "sim_type": self.sim_type_var.get(),
+            "batch_engine": self.batch_engine_var.get(),
+            "target_precision": self.target_precision_var.get(),
+            "win_goal": self.win_goal_var.get()
         }
 
         # Input Validation
@@ -330,46 +378,162 @@ class BlackjackGUI:
             messagebox.showerror("Invalid Input", "Insurance Threshold cannot be negative.")
             return
 
+        if params['target_precision'] < 0:
+            messagebox.showerror("Invalid Input", "Target CI cannot be negative.")
+            return
+
+        # The batch engine plays a fixed number of hands per lane, so it cannot chase a CI target
+        if params['batch_engine'] and params['target_precision'] > 0:
+            messagebox.showerror("Invalid Input", "Target CI is not available with the Batch Engine. "
+                                 "Set Target CI to 0 or untick Batch Engine.")
+            return
+
+        if params['win_goal'] < 0:
+            messagebox.showerror("Invalid Input", "Win Goal cannot be negative.")
+            return
+
+        # Checked for every mode: a Target CI on Risk of Ruin still needs a starting bankroll
+        if params['sim_type'] == "Risk of Ruin" and params['bankroll_limit'] <= 0:
+            messagebox.showerror("Invalid Input", "Risk of Ruin needs a Bankroll Limit greater than 0.")
+            return
+
+        if params['spread_name'] == "custom":
+            self.save_custom_spread()
+
         # Disable Run button to prevent multiple clicks
         self.run_button.config(state="disabled")
         self.export_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
         self.results_text.config(state="normal")
         self.results_text.delete('1.0', tk.END)
         self.results_text.config(state="disabled")
         self.ax.clear()
         self.canvas.draw()
+        self.ax2.clear()
+        self.canvas2.draw()
         self.progress['value'] = 0
+        self.status_var.set("Starting...")
+
+        if self.manager is None:
+            self.manager = multiprocessing.Manager()
+        self.progress_queue = self.manager.Queue()
+        self.cancel_event = self.manager.Event()
+        self.job = {
+            "params": params,
+            "mode": self.simulation_mode(params),
+            "hands": {},                # run -> hands played so far
+            "house_edges": RunningStats(),
+            "final_bankrolls": RunningStats(),
+            "running": True,
+        }
 
-        # Start simulation in a new thread
-        thread = threading.Thread(target=self.simulation_thread, args=(params,))
+        # Start simulation in a new thread; its results come back through poll_messages
+        thread = threading.Thread(target=self.simulation_thread, args=(params,), daemon=True)
         thread.start()
+        self.root.after(100, self.poll_messages)
 
-    def simulation_thread(self, params):
-        results_list = []
-        simulator = Simulator(debug=False)  # Initialize a single Simulator instance
+    def save_custom_spread(self):
+        spreads = load_settings("config/spread.yaml")
 
-        if params['spread_name'] == "custom":
-            custom_vars = [int(var.get()) for var in self.spread_config_vars]
-
-            spreads = load_settings("config/spread.yaml")
-
-            # custom_spread = [int(var.get()) for var in self.spread_config_vars]
+        custom_spread = []
+        for i, num in enumerate(range(-8, 9)):
+            if int(self.spread_config_vars[i].get()) != 0:
+                custom_spread += [{"count": num if i != 0 else -999, "bet": int(self.spread_config_vars[i].get())}]
 
-            custom_spread = []
-            for i, num in enumerate(range(-8, 9)):                    
-                if int(self.spread_config_vars[i].get()) != 0:
-                    custom_spread += [{"count": num if i != 0 else -999, "bet": int(self.spread_config_vars[i].get())}]
+        if "custom" in spreads:
+            spreads["custom"]["thresholds"] = custom_spread
+        else:
+            sp = {"thresholds": custom_spread}
+            spreads.update({"custom": sp})
+
+        save_to_yaml(spreads, "config/spread.yaml")
+
+    def cancel_simulation(self):
+        # Runs not yet started are dropped and running ones stop within a few thousand hands
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.cancel_button.config(state="disabled")
+        self.status_var.set("Cancelling...")
+
+    def on_close(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        if self.manager is not None:
+            self.manager.shutdown()
+        self.root.destroy()
+
+    def simulation_mode(self, params):
+        # ror = bankroll trials on the risk of ruin engine, precision = runs until the CI target,
+        # runs = a fixed number of runs
+        if params['target_precision'] > 0:
+            return "precision"
+        if params['sim_type'] == "Risk of Ruin":
+            return "ror"
+        return "runs"
 
-            if "custom" in spreads:
-                spreads["custom"]["thresholds"] = custom_spread
+    def simulation_thread(self, params):
+        # Runs off the Tk thread: it must not touch any widget, only post to self.messages
+        try:
+            precision = None
+            if self.simulation_mode(params) == "ror":
+                self.messages.put(("ror_done", self.ror_simulation(params), params))
+                return
+            if params['batch_engine']:
+                results_list = self.batch_simulation(params)
+            elif params['target_precision'] > 0:
+                results_list, precision = self.precision_simulation(params)
             else:
-                sp = {"thresholds": custom_spread}
-                spreads.update({"custom": sp})
+                # Fan the runs out across a process pool, one freshly seeded Simulator per run
+                results_list = run_parallel(
+                    self.setup_kwargs(params),
+                    params['num_runs'],
+                    num_hands=params['num_hands'],
+                    bankroll_limit=params['bankroll_limit'] if params['bankroll_limit'] > 0 else None,
+                    master_seed=random.randrange(2**32),
+                    on_result=lambda run, result: self.messages.put(("result", run, result)),
+                    history="stride",
+                    history_stride=self.history_stride(params),
+                    progress_queue=self.progress_queue,
+                    cancel_event=self.cancel_event
+                )
+            self.messages.put(("done", [result for result in results_list if result is not None], params, precision))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+
+    def ror_simulation(self, params):
+        # num_runs bankroll trials, each stopping at ruin, the win goal or num_hands hands
+        return risk_of_ruin(
+            self.setup_kwargs(params),
+            params['num_runs'],
+            params['bankroll_limit'],
+            win_goal=params['win_goal'] if params['win_goal'] > 0 else None,
+            max_hands=params['num_hands'],
+            master_seed=random.randrange(2**32),
+            on_batch=lambda report: self.messages.put(("ror_batch", report)),
+            cancel_event=self.cancel_event
+        )
 
-            save_to_yaml(spreads, "config/spread.yaml")
+    def precision_simulation(self, params):
+        # Batches of num_runs runs until the CI half-width reaches the target (at most 100 batches)
+        return run_parallel_until_precision(
+            self.setup_kwargs(params),
+            params['target_precision'],
+            metric="risk_of_ruin" if params["sim_type"] == "Risk of Ruin" else "house_edge",
+            num_hands=params['num_hands'],
+            bankroll_limit=params['bankroll_limit'] if params['bankroll_limit'] > 0 else None,
+            batch_runs=params['num_runs'],
+            min_runs=2 * params['num_runs'],
+            max_runs=100 * params['num_runs'],
+            master_seed=random.randrange(2**32),
+            on_batch=lambda results, precision: self.messages.put(("batch", precision)),
+            history="stride",
+            history_stride=self.history_stride(params),
+            progress_queue=self.progress_queue,
+            cancel_event=self.cancel_event
+        )
 
-        # Setup the simulator with the collected parameters
-        simulator.setup(
+    def setup_kwargs(self, params):
+        return dict(
             num_decks=params['num_decks'],
             num_hands=params['num_hands'],
             base_bet=params['base_bet'],
@@ -383,39 +547,131 @@ class BlackjackGUI:
             spread_name=params['spread_name'],
             penetration=params['penetration']
         )
-        i = 0
-        for run in range(1, params['num_runs'] + 1):
-            # Update progress
-            progress_percentage = (run - 1) / params['num_runs'] * 100
-            self.progress['value'] = progress_percentage
-            self.root.update_idletasks()
-
-            # Run simulation
-            result = simulator.run_simulation(
-                num_hands=params['num_hands'],
-                bankroll_limit=params['bankroll_limit'] if params['bankroll_limit'] > 0 else None
-            )
-            results_list.append(result)
-
-            if params['num_runs'] > 1:
-                # Update progress to 90%
-                self.progress['value'] = (100 / params['num_runs']) * (i)
-                self.root.update_idletasks()
-
-        # Update progress to 100%
-        self.progress['value'] = 100
-        self.root.update_idletasks()
-
-        # Analyze and display results
-        if params["sim_type"] == "Risk of Ruin":
-            self.display_results(results_list, params)
-        else:
-            self.display_results_nolim(results_list, params)
 
-        # Re-enable Run button
+    def history_stride(self, params):
+        # Keep about 2000 bankroll samples per run for the "Average Bankroll Over Time" plot
+        return max(1, params['num_hands'] // 2000)
+
+    def batch_simulation(self, params):
+        def on_progress(hands_played):
+            self.messages.put(("hands", "batch", hands_played * params['num_runs']))
+            return self.cancel_event.is_set()
+
+        simulator = BatchSimulator(num_shoes=params['num_runs'])
+        simulator.setup(**self.setup_kwargs(params))
+        return simulator.run_simulation(
+            num_hands=params['num_hands'],
+            bankroll_limit=params['bankroll_limit'] if params['bankroll_limit'] > 0 else None,
+            history="stride",
+            history_stride=self.history_stride(params),
+            on_progress=on_progress
+        )
+
+    def poll_messages(self):
+        # Tk thread: apply everything the simulation posted since the last poll
+        job = self.job
+        try:
+            while True:
+                _, run, hands_played = self.progress_queue.get_nowait()
+                job["hands"][run] = hands_played
+        except (queue.Empty, EOFError, OSError):
+            pass
+
+        try:
+            while True:
+                self.handle_message(self.messages.get_nowait())
+        except queue.Empty:
+            pass
+
+        if job["running"]:
+            params = job["params"]
+            if job["mode"] == "runs":
+                total_hands = params['num_runs'] * params['num_hands']
+                self.progress['value'] = min(100, 100 * sum(job["hands"].values()) / total_hands)
+            self.root.after(100, self.poll_messages)
+
+    def handle_message(self, message):
+        job = self.job
+        params = job["params"]
+        kind = message[0]
+
+        if kind == "hands":
+            job["hands"][message[1]] = message[2]
+
+        elif kind == "result":
+            _, run, result = message
+            job["hands"][run] = params['num_hands']          # Finished, even if it went broke early
+            job["house_edges"].push(result["House Advantage (%)"])
+            job["final_bankrolls"].push(max(result["final_bankroll"], 0.0))
+            edges = job["house_edges"]
+            status = f"{edges.count}/{params['num_runs']} runs finished, average house edge {edges.mean:.3f}%"
+            if edges.count > 1:
+                status += f" \u00b1 {batch_means_half_width(edges):.3f}"
+            if params['bankroll_limit'] > 0:
+                status += f", risk of ruin so far {100 * job['final_bankrolls'].ruin_count / edges.count:.1f}%"
+            self.status_var.set(status)
+
+        elif kind == "batch":
+            precision = message[1]
+            self.progress['value'] = min(100, 100 * (params['target_precision'] / precision['half_width']) ** 2)
+            self.status_var.set(f"{precision['runs']} runs, estimate {precision['estimate']:.3f}% "
+                                f"\u00b1 {precision['half_width']:.3f} (target {params['target_precision']})")
+
+        elif kind == "ror_batch":
+            report = message[1]
+            self.progress['value'] = 100 * report['trials'] / params['num_runs']
+            low, high = report['CI_95']
+            self.status_var.set(f"{report['trials']}/{params['num_runs']} trials, risk of ruin "
+                                f"{100 * report['risk_of_ruin']:.2f}% ({100 * low:.2f}% to {100 * high:.2f}%)")
+
+        elif kind == "ror_done":
+            _, report, params = message
+            cancelled = self.cancel_event.is_set()
+            self.finish_job()
+            if not report['trials']:
+                self.status_var.set("Cancelled before any trial finished")
+                return
+            self.progress['value'] = 100
+            self.display_ror(report, params)
+            self.status_var.set(f"Cancelled: showing the {report['trials']} trials played" if cancelled else "Done")
+
+        elif kind == "error":
+            self.finish_job()
+            self.status_var.set("Simulation failed")
+            messagebox.showerror("Simulation Failed", f"An error occurred while simulating:\n{message[1]}")
+
+        elif kind == "done":
+            _, results_list, params, precision = message
+            cancelled = self.cancel_event.is_set()
+            self.finish_job()
+            if not results_list:
+                self.status_var.set("Cancelled before any run finished")
+                return
+
+            self.progress['value'] = 100
+            params = dict(params, num_runs=len(results_list))
+            if params["sim_type"] == "Risk of Ruin":
+                self.display_results(results_list, params)
+            else:
+                self.display_results_nolim(results_list, params)
+
+            if precision is not None:
+                low, high = precision['CI_95']
+                status = "reached" if precision['converged'] else "NOT reached (run limit)"
+                self.results_text.config(state="normal")
+                self.results_text.insert(tk.END, f"95% CI: {low:.3f}% to {high:.3f}% (\u00b1{precision['half_width']:.3f}, target {status})\n")
+                self.results_text.config(state="disabled")
+            self.status_var.set(f"Cancelled: showing the {len(results_list)} runs played (some may be partial)" if cancelled else "Done")
+
+    def finish_job(self):
+        self.job["running"] = False
         self.run_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
 
     def display_results_nolim(self, results, params):
+        self.last_results = results
+        self.last_params = params
+
         # Aggregate results
         total_hands_played = sum(result["hands_played"] for result in results)
         average_final_bankroll = sum(result["final_bankroll"] for result in results) / len(results)
@@ -445,28 +701,16 @@ class BlackjackGUI:
         self.ax.set_ylabel("Frequency")
         self.canvas.draw()
 
-        bankroll_histories = [result["bankroll_history"] for result in results]
-
-        min_length = min(len(history) for history in bankroll_histories)
-
-        truncated_histories = [history[:min_length] for history in bankroll_histories]
-
-        average_bankroll_history = [sum(hand_bankrolls) / len(hand_bankrolls) for hand_bankrolls in zip(*truncated_histories)]
-
-        hands_played = list(range(1, min_length + 1))
-
-        self.ax2.plot(hands_played, average_bankroll_history, color='green')
-        self.ax2.set_title("Average Bankroll Over Time")
-        self.ax2.set_xlabel("Hands Played")
-        self.ax2.set_ylabel("Average Bankroll ($)")
-        self.ax2.grid(True)
-        self.canvas2.draw()
+        self.plot_bankroll_histories(results)
 
         # Enable Export button
         self.export_button.config(state="normal")
 
 
     def display_results(self, results, params):
+        self.last_results = results
+        self.last_params = params
+
         # Aggregate results
         total_hands_played = sum(result["hands_played"] for result in results)
         average_final_bankroll = sum(result["final_bankroll"] for result in results) / len(results)
@@ -505,47 +749,83 @@ class BlackjackGUI:
         self.ax.set_ylabel("Frequency")
         self.canvas.draw()
         
-        bankroll_histories = [result["bankroll_history"] for result in results]
+        self.plot_bankroll_histories(results)
 
-        min_length = min(len(history) for history in bankroll_histories)
+        # Enable Export button
+        self.export_button.config(state="normal")
 
-        truncated_histories = [history[:min_length] for history in bankroll_histories]
+    def display_ror(self, report, params):
+        # Bankroll trials have no per-run histories, so there is nothing to export
+        self.last_results = None
+        low, high = report['CI_95']
+        stats = (
+            f"Trials: {report['trials']}\n"
+            f"Starting Bankroll: ${report['bankroll']:.2f}\n"
+            f"Risk of Ruin: {100 * report['risk_of_ruin']:.2f}% (95% CI {100 * low:.2f}% to {100 * high:.2f}%)\n"
+        )
+        if report['win_goal']:
+            stats += f"Reached Win Goal (+${report['win_goal']:.2f}): {100 * report['win_probability']:.2f}%\n"
+        stats += (
+            f"Reached Hand Limit ({report['max_hands']}): {100 * report['hand_limit'] / report['trials']:.2f}%\n"
+            f"Average Hands per Trial: {report['mean_hands']:.1f}\n"
+            f"Average Final Bankroll: ${report['mean_final_bankroll']:.2f}\n"
+        )
+        percentiles = report['ruin_hands_percentiles']
+        if percentiles:
+            stats += "Hands to Ruin (5/25/50/75/95%): " + " / ".join(f"{value:.0f}" for value in percentiles.values()) + "\n"
 
-        average_bankroll_history = [sum(hand_bankrolls) / len(hand_bankrolls) for hand_bankrolls in zip(*truncated_histories)]
+        self.results_text.config(state="normal")
+        self.results_text.insert(tk.END, stats)
+        self.results_text.config(state="disabled")
 
-        hands_played = list(range(1, min_length + 1))
+        ruin_hands = report['ruin_hands']
+        if len(ruin_hands):
+            self.ax.hist(ruin_hands, bins=40, color='salmon', edgecolor='black')
+        self.ax.set_title("Hands to Ruin")
+        self.ax.set_xlabel("Hands Played")
+        self.ax.set_ylabel("Trials")
+        self.canvas.draw()
 
-        self.ax2.plot(hands_played, average_bankroll_history, color='green')
-        self.ax2.set_title("Average Bankroll Over Time")
+        # Share of all trials ruined by each hand count
+        self.ax2.clear()
+        if len(ruin_hands):
+            hands, counts = np.unique(ruin_hands, return_counts=True)
+            self.ax2.step(hands, 100 * np.cumsum(counts) / report['trials'], where='post', color='darkred')
+        self.ax2.set_title("Risk of Ruin by Hands Played")
         self.ax2.set_xlabel("Hands Played")
-        self.ax2.set_ylabel("Average Bankroll ($)")
+        self.ax2.set_ylabel("Ruined (%)")
         self.ax2.grid(True)
         self.canvas2.draw()
 
-        # Enable Export button
-        self.export_button.config(state="normal")
+    def plot_bankroll_histories(self, results):
+        # Mean, min/max envelope and percentile bands, downsampled to about one point per pixel
+        self.ax2.clear()
+        aggregate = aggregate_histories([result["bankroll_history"] for result in results],
+                                        stride=results[0].get("history_stride", 1),
+                                        num_hands=max(result["hands_played"] for result in results),
+                                        max_points=max(200, self.canvas2.get_tk_widget().winfo_width()))
+        if aggregate is not None:
+            draw_bankroll_bands(self.ax2, aggregate)
+        self.ax2.set_title("Bankroll Over Time")
+        self.ax2.set_xlabel("Hands Played")
+        self.ax2.set_ylabel("Bankroll ($)")
+        self.ax2.grid(True)
+        self.canvas2.draw()
 
     def export_results(self):
-        # Ask user where to save the CSV
+        # Per-run summaries as a CSV, or a results store (summaries plus bankroll histories)
+        # that blackjack.results.read_summary / read_histories load without the GUI
         file_path = filedialog.asksaveasfilename(defaultextension=".csv",
-                                                 filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+                                                 filetypes=[("CSV summary", "*.csv"), ("Results store", "*.results"), ("All files", "*.*")],
                                                  title="Save Results")
-        if not file_path:
+        if not file_path or not self.last_results:
             return  # User cancelled
 
-        # Extract data from results_text (simple example)
-        # For a more detailed export, you should modify the simulation to store results in a structured format
-        stats = self.results_text.get("1.0", tk.END).strip().split("\n")
-        data = {}
-        for stat in stats:
-            if ": " in stat:
-                key, value = stat.split(": ", 1)
-                data[key.strip()] = value.strip()
-
-        # Convert to DataFrame and save
-        df = pd.DataFrame([data])
         try:
-            df.to_csv(file_path, index=False)
+            if file_path.endswith(".csv"):
+                write_summary_csv(self.last_results, file_path)
+            else:
+                write_results(self.last_results, file_path, meta=self.last_params)
             messagebox.showinfo("Export Successful", f"Results exported to {file_path}")
         except Exception as e:
             messagebox.showerror("Export Failed", f"An error occurred while exporting:\n{e}")
@@ -0,0 +1,40 @@
+# scripts/analyze_results.py
+#
+# Summarize a results store written by run_parallel(results_path=...) or the GUI export:
+#   python scripts/analyze_results.py runs.results
+
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackjack.analysis import wilson_interval
+from blackjack.results import read_meta, read_summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a stored set of simulation runs")
+    parser.add_argument("path", help="results store directory")
+    args = parser.parse_args()
+
+    summary = read_summary(args.path)
+    if not summary:
+        print(f"No runs in {args.path}")
+        return 1
+    meta = read_meta(args.path)
+    runs = len(summary["run"])
+    ruined = int(np.sum(summary["final_bankroll"] <= 0))
+    low, high = wilson_interval(ruined, runs)
+
+    if meta.get("setup_kwargs"):
+        print(f"Setup: {meta['setup_kwargs']}")
+    print(f"Runs: {runs}")
+    print(f"Total Hands Played: {int(summary['hands_played'].sum())}")
+    print(f"Average Final Bankroll: ${summary['final_bankroll'].mean():.2f}")
+    print(f"Average House Advantage: {summary['house_edge'].mean():.3f}% (stddev {summary['house_edge'].std():.3f})")
+    print(f"Runs Ending at or Below 0: {100 * ruined / runs:.2f}% (95% CI {100 * low:.2f}% to {100 * high:.2f}%)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# scripts/benchmark.py
+#
+# Measure simulation throughput and compare it with the stored baseline:
+#   python scripts/benchmark.py                      # run, write benchmark_results.json, compare
+#   python scripts/benchmark.py --update-baseline    # store this machine's numbers as the baseline
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackjack.benchmark import (BASELINE_PATH, compare_to_baseline, load_results, run_benchmarks,
+                                 write_results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack simulator throughput benchmarks")
+    parser.add_argument("--hands", type=int, default=20000, help="hands per simulation benchmark")
+    parser.add_argument("--number", type=int, default=20000, help="calls per microbenchmark")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(num_hands=args.hands, micro_number=args.number)
+    for name, value in sorted(results.items()):
+        print(f"{name:40s} {value:14,.0f}/s")
+    write_results(results, args.output)
+
+    if args.update_baseline:
+        write_results(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare_to_baseline(results, load_results(args.baseline), args.threshold)
+    for name, reference, current, change in regressions:
+        print(f"REGRESSION {name}: {reference:,.0f}/s -> {current:,.0f}/s ({change:+.0%})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
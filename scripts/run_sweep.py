@@ -0,0 +1,35 @@
+# scripts/run_sweep.py
+#
+# Run the parameter sweep in config/settings.yaml and write one CSV row per cell:
+#   python scripts/run_sweep.py                         # resume/extend the sweep in settings.yaml
+#   python scripts/run_sweep.py --output weekly.csv --workers 4
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackjack.sweep import load_sweep, run_sweep
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack parameter sweep")
+    parser.add_argument("--config", default="config/settings.yaml")
+    parser.add_argument("--output", default=None, help="results CSV (default: the sweep's output setting)")
+    parser.add_argument("--hands", type=int, default=None, help="hands per cell (default: the sweep's num_hands)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    sweep = load_sweep(args.config)
+    if args.hands:
+        sweep["num_hands"] = args.hands
+
+    def report(row, done, total):
+        print(f"[{done}/{total}] {row['cell']}  house edge {row['house_edge']:.3f}%  ({row['seconds']:.1f}s)")
+
+    rows = run_sweep(sweep, args.output, args.workers, on_cell=report)
+    print(f"{len(rows)} cells in {args.output or sweep.get('output', 'sweep_results.csv')}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import math
+import statistics
+
+VALUES = [12.0, -3.5, 0.0, 40.25, 7.0, 7.0, -19.0, 2.5]
+
+def test_running_stats_matches_statistics():
+    from blackjack.analysis import RunningStats
+
+    stats = RunningStats().extend(VALUES)
+    assert stats.count == len(VALUES)
+    assert math.isclose(stats.mean, statistics.mean(VALUES))
+    assert math.isclose(stats.std_dev(), statistics.pstdev(VALUES))
+    assert stats.min == min(VALUES) and stats.max == max(VALUES)
+    assert stats.ruin_count == 3
+
+def test_running_stats_merge_is_split_independent():
+    from blackjack.analysis import RunningStats, merge_stats
+
+    whole = RunningStats().extend(VALUES)
+    parts = [RunningStats().extend(VALUES[:3]), RunningStats(), RunningStats().extend(VALUES[3:])]
+    merged = merge_stats(parts)
+    assert merged.count == whole.count
+    assert math.isclose(merged.mean, whole.mean)
+    assert math.isclose(merged.m2, whole.m2)
+    assert merged.ruin_count == whole.ruin_count
+
+def test_analyze_accepts_dicts_accumulators_and_streams():
+    from blackjack.analysis import accumulate_results, analyze_simulation_results
+
+    results = [{"final_bankroll": value} for value in VALUES]
+    from_dicts = analyze_simulation_results(results, 10)
+    from_stream = analyze_simulation_results(iter(results), 10)
+    from_parts = analyze_simulation_results([accumulate_results(results[:5]), accumulate_results(results[5:])], 10)
+
+    clipped = [max(value, 0.0) for value in VALUES]
+    assert math.isclose(from_dicts["mean_profit"], statistics.mean(clipped) - 10)
+    assert math.isclose(from_dicts["stddev_profit"], statistics.pstdev(clipped))
+    assert from_dicts["risk_of_ruin"] == 3 / len(VALUES)
+    for other in (from_stream, from_parts):
+        for key in ("mean_profit", "stddev_profit", "risk_of_ruin", "max_final_bankroll"):
+            assert math.isclose(other[key], from_dicts[key])
+    assert analyze_simulation_results([], 10) == {}
+
+def test_wilson_interval_handles_extremes():
+    from blackjack.analysis import wilson_interval
+
+    low, high = wilson_interval(0, 50)
+    assert low == 0 and 0 < high < 0.1
+    low, high = wilson_interval(25, 100)
+    assert low < 0.25 < high
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+def test_batch_means_half_width():
+    from blackjack.analysis import RunningStats, batch_means_half_width
+
+    assert batch_means_half_width(RunningStats().push(1.0)) == math.inf
+    stats = RunningStats().extend([1.0, 3.0, 2.0, 2.0])
+    assert math.isclose(batch_means_half_width(stats), 1.96 * math.sqrt(statistics.variance([1.0, 3.0, 2.0, 2.0]) / 4))
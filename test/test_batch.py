@@ -0,0 +1,68 @@
+def _batch(num_shoes=200, **kwargs):
+    from blackjack.batch import BatchSimulator
+
+    batch = BatchSimulator(num_shoes=num_shoes, seed=7)
+    batch.setup(num_decks=6, base_bet=10, **kwargs)
+    return batch
+
+def test_batch_result_shape():
+    from blackjack.simulation import Simulator
+
+    sim = Simulator()
+    sim.setup(num_decks=6, num_hands=10, compact_shoe=True)
+    expected_keys = set(sim.run_simulation().keys())
+
+    results = _batch().run_simulation(num_hands=50)
+    assert len(results) == 200
+    for result in results:
+        assert set(result.keys()) == expected_keys
+        assert result["hands_played"] == 50
+        assert len(result["bankroll_history"]) == 50
+        assert result["bankroll_history"][-1] == result["final_bankroll"]
+
+def test_batch_bankroll_limit_stops_lanes():
+    results = _batch(spread_name="none").run_simulation(num_hands=2000, bankroll_limit=30)
+    for result in results:
+        if result["hands_played"] < 2000:
+            assert result["final_bankroll"] < 0
+    assert any(result["hands_played"] < 2000 for result in results)
+
+def test_batch_matches_analysis():
+    from blackjack.analysis import analyze_simulation_results
+
+    results = _batch(spread_name="none").run_simulation(num_hands=100, bankroll_limit=500)
+    analysis = analyze_simulation_results(results, 500)
+    assert 0 <= analysis["risk_of_ruin"] <= 1
+
+def test_batch_reproducible():
+    first = _batch(num_shoes=20).run_simulation(num_hands=100, history="off")
+    second = _batch(num_shoes=20).run_simulation(num_hands=100, history="off")
+    assert [r["final_bankroll"] for r in first] == [r["final_bankroll"] for r in second]
+
+def test_batch_history_file(tmp_path):
+    import numpy as np
+    import pytest
+
+    def run(**kwargs):
+        return _batch(num_shoes=3).run_simulation(num_hands=120, bankroll_limit=60, history="stride", history_stride=4, **kwargs)
+
+    in_memory = run()
+    path = str(tmp_path / "histories.npy")
+    on_disk = run(history_file=path)
+    histories = np.load(path)
+    for row, (expected, result) in enumerate(zip(in_memory, on_disk)):
+        assert histories[row, :result["history_length"]].tolist() == pytest.approx(list(expected["bankroll_history"]))
+        assert np.isnan(histories[row, result["history_length"]:]).all()
+
+def test_batch_matches_scalar_edge_with_spread():
+    from blackjack.simulation import Simulator
+
+    # A count-based spread makes the edge depend on sizing the bet before the player's cards are counted
+    setup = dict(spread_name="basic", penetration=1.5)
+    batch = _batch(num_shoes=2000, **setup).run_simulation(num_hands=250, history="off")
+    batch_edge = -100 * sum(r["final_bankroll"] for r in batch) / sum(r["amount_bet"] for r in batch)
+
+    sim = Simulator(seed=7)
+    sim.setup(num_decks=6, base_bet=10, compact_shoe=True, **setup)
+    scalar_edge = sim.run_simulation(num_hands=100000, history="off")["House Advantage (%)"]
+    assert abs(batch_edge - scalar_edge) < 1.5
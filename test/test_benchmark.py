@@ -0,0 +1,28 @@
+import os
+import pytest
+
+def test_compare_to_baseline_flags_slowdowns():
+    from blackjack.benchmark import compare_to_baseline
+
+    baseline = {"sim/base": 100000.0, "micro/get_bet": 500000.0, "sim/removed": 1.0}
+    results = {"sim/base": 75000.0, "micro/get_bet": 450000.0, "sim/new": 1.0}
+    regressions = compare_to_baseline(results, baseline, threshold=0.2)
+    assert [name for name, *_ in regressions] == ["sim/base"]
+    assert regressions[0][3] == pytest.approx(-0.25)
+
+def test_results_round_trip(tmp_path):
+    from blackjack.benchmark import load_results, write_results
+
+    path = tmp_path / "results.json"
+    write_results({"sim/base": 1234.5}, str(path))
+    assert load_results(str(path)) == {"sim/base": 1234.5}
+
+@pytest.mark.benchmark
+def test_throughput_against_baseline():
+    from blackjack.benchmark import BASELINE_PATH, compare_to_baseline, load_results, run_benchmarks
+
+    threshold = float(os.environ.get("BLACKJACK_BENCH_THRESHOLD", "0.3"))
+    results = run_benchmarks(num_hands=5000, micro_number=10000)
+    regressions = compare_to_baseline(results, load_results(BASELINE_PATH), threshold)
+    assert not regressions, "\n".join(f"{name}: {reference:,.0f}/s -> {current:,.0f}/s ({change:+.0%})"
+                                      for name, reference, current, change in regressions)
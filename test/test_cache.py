@@ -0,0 +1,29 @@
+def test_load_config_invalidates_on_change(tmp_path):
+    import os
+    from blackjack.cache import load_config
+
+    path = tmp_path / "spread.yaml"
+    path.write_text("basic:\n  thresholds: [1]\n")
+    assert load_config(str(path)) == {"basic": {"thresholds": [1]}}
+    assert load_config(str(path)) is load_config(str(path))
+
+    path.write_text("basic:\n  thresholds: [1, 2]\n")
+    os.utime(path, ns=(0, 0))            # Guard against a coarse mtime clock
+    assert load_config(str(path)) == {"basic": {"thresholds": [1, 2]}}
+    assert len(os.listdir(tmp_path / ".cache")) == 2
+
+def test_compiled_is_cached_on_disk(tmp_path):
+    from blackjack.cache import clear_memory_cache, compiled
+
+    path = tmp_path / "counting.yaml"
+    path.write_text("hi-lo:\n  tags: [1, 1, 1, 1, 1, 0, 0, 0, -1, -1]\n")
+    calls = []
+    def build(data):
+        calls.append(1)
+        return sum(data["hi-lo"]["tags"])
+
+    assert compiled(str(path), ("tags", "hi-lo"), build) == 3
+    assert compiled(str(path), ("tags", "hi-lo"), build) == 3
+    clear_memory_cache()                 # As in a fresh process
+    assert compiled(str(path), ("tags", "hi-lo"), build) == 3
+    assert len(calls) == 1
@@ -31,3 +31,49 @@ def test_shoe_init():
     shoe = Shoe(6)
     assert len(shoe.cards) == 6 * 52
 
+
+def test_card_code():
+    from blackjack.cards import Card, RANKS
+    for code, rank in enumerate(RANKS):
+        assert Card(rank, "♠").code == code
+
+def test_compact_shoe_init():
+    from blackjack.cards import CompactShoe
+    shoe = CompactShoe(6)
+    assert len(shoe.cards) == 6 * 52
+    assert sorted(shoe.cards).count(12) == 6 * 4  # 24 aces
+    assert shoe.cards_remaining() == 6 * 52
+
+def test_compact_shoe_deal_and_reshuffle():
+    from blackjack.cards import CompactShoe
+    shoe = CompactShoe(1)
+    buffer = shoe.cards
+    dealt = [shoe.deal_card() for _ in range(52)]
+    assert sorted(dealt) == sorted(buffer)
+    assert shoe.decks_remaining() == 0
+    # Dealing past the end reshuffles the same buffer in place
+    shoe.deal_card()
+    assert shoe.cards is buffer
+    assert shoe.cards_remaining() == 51
+
+def test_hand_value_codes():
+    from blackjack.rules import BlackjackRules
+    from blackjack.cards import RANK_CODES
+    rules = BlackjackRules(6)
+    codes = [RANK_CODES[r] for r in ("A", "A", "9")]
+    assert rules.hand_value_codes(codes) == 21
+    assert rules.is_blackjack_codes([RANK_CODES["A"], RANK_CODES["K"]])
+
+def test_shoe_rng_reproducible():
+    import random
+    import numpy as np
+    from blackjack.cards import Shoe, CompactShoe
+
+    first = Shoe(2, random.Random(5))
+    second = Shoe(2, random.Random(5))
+    assert [c.code for c in first.cards] == [c.code for c in second.cards]
+
+    first = CompactShoe(2, np.random.default_rng(5))
+    second = CompactShoe(2, np.random.default_rng(5))
+    assert first.cards == second.cards
+    assert sorted(first.cards) == sorted(CompactShoe(2).cards)
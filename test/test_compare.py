@@ -0,0 +1,72 @@
+import pytest
+
+BASE = dict(num_decks=2, base_bet=10, spread_name="basic")
+
+def test_identical_configurations_have_zero_difference():
+    from blackjack.compare import compare_configurations
+
+    report = compare_configurations([BASE, dict(BASE)], num_hands=500, seed=2)
+    first, second = report["configs"]
+    assert first["mean_result"] == second["mean_result"]
+    assert report["differences"][0]["mean"] == 0
+    assert report["differences"][0]["CI_95"] == (0, 0)
+
+def test_paired_difference_beats_independent_runs():
+    from blackjack.compare import compare_configurations
+
+    report = compare_configurations([BASE, dict(BASE, strategy_name="deviations")], num_hands=3000, seed=2,
+                                    names=["basic", "deviations"])
+    difference = report["differences"][0]
+    assert difference["name"] == "deviations - basic"
+    lower, upper = difference["CI_95"]
+    independent_lower, independent_upper = difference["independent_CI_95"]
+    assert upper - lower < independent_upper - independent_lower
+    assert difference["variance_reduction"] > 5
+
+def test_configurations_must_share_the_shoe():
+    from blackjack.compare import compare_configurations
+
+    with pytest.raises(ValueError):
+        compare_configurations([BASE, dict(BASE, num_decks=6)], num_hands=10)
+    with pytest.raises(ValueError):
+        compare_configurations([BASE], num_hands=10)
+
+def test_rounds_running_into_the_next_shoe_keep_counting(monkeypatch):
+    import random
+    import blackjack.compare
+    from blackjack.compare import SharedShoe, ShoeView, compare_configurations
+    from blackjack.simulation import Simulator
+    from blackjack.strategy import BasicStrategy
+
+    shared = SharedShoe(1, random.Random(1))
+    view = ShoeView(shared)
+    view.cursor = 52 + 10
+    assert view.decks_remaining() == 42 / 52
+    assert view.rank_counts().sum() == 42
+
+    # Without a penetration cut every shoe change happens mid-round. At the next round, each
+    # count must be exactly the cards that round already dealt from the new shoe.
+    tags = BasicStrategy(spread_name=None)._tags
+    shoes, checked = [], []
+    class RecordedShoe(SharedShoe):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.changes = 0
+            shoes.append(self)
+        def next_shoe(self, start=0):
+            super().next_shoe(start)
+            self.changes += 1
+    class RecordedSimulator(Simulator):
+        def play_hand(self):
+            shoe = shoes[0]
+            if shoe.changes != getattr(self, "_changes", 0):
+                self._changes = shoe.changes
+                assert self.strategy.running_count == sum(tags[code] for code in shoe.cards[:shoe.start])
+                checked.append(shoe.start)
+            return super().play_hand()
+    monkeypatch.setattr(blackjack.compare, "Simulator", RecordedSimulator)
+    monkeypatch.setattr(blackjack.compare, "SharedShoe", RecordedShoe)
+
+    config = dict(num_decks=1, base_bet=10, spread_name="none", penetration=0)
+    compare_configurations([config, dict(config)], num_hands=300, seed=5)
+    assert any(start > 0 for start in checked)
@@ -0,0 +1,105 @@
+import math
+
+def _brute_force_dealer(comp, total, soft, rules):
+    from blackjack.ev import BUST, _add_card
+
+    probs = [0.0] * 6
+    if not rules.dealer_should_hit_total(total, soft):
+        probs[BUST if total > 21 else total - 17] = 1.0
+        return probs
+    n = sum(comp)
+    for index, count in enumerate(comp):
+        if count:
+            rest = list(comp)
+            rest[index] -= 1
+            sub = _brute_force_dealer(rest, *_add_card(total, soft, index), rules)
+            for outcome in range(6):
+                probs[outcome] += count / n * sub[outcome]
+    return probs
+
+def test_dealer_probabilities_match_enumeration():
+    from blackjack.ev import EVCalculator, _add_card
+    from blackjack.rules import BlackjackRules
+
+    rules = BlackjackRules(decks=1, dealer_hits_soft_17=True)
+    comp = (1, 1, 2, 1, 1, 2, 1, 1, 4, 1)
+    calculator = EVCalculator(rules, composition=comp)
+    upcard = 4          # A six, so there is no peek
+    rest = list(comp)
+    rest[upcard] -= 1
+    expected = _brute_force_dealer(rest, *_add_card(0, False, upcard), rules)
+    actual = calculator.dealer_probabilities(upcard)
+    assert all(math.isclose(a, e) for a, e in zip(actual, expected))
+    assert math.isclose(sum(actual), 1.0)
+
+def test_dealer_peek_excludes_naturals():
+    from blackjack.ev import EVCalculator, ACE_INDEX, TEN
+    from blackjack.rules import BlackjackRules
+
+    calculator = EVCalculator(BlackjackRules(decks=1))
+    # Under an ace the dealer cannot finish on 21 with the hole card alone
+    probs = calculator.dealer_probabilities(ACE_INDEX)
+    assert math.isclose(sum(probs), 1.0)
+    assert math.isclose(calculator.dealer_blackjack_probability(ACE_INDEX), 16 / 51)
+    assert math.isclose(sum(calculator.dealer_probabilities(TEN)), 1.0)
+
+def test_action_evs_known_values():
+    from blackjack.ev import EVCalculator, TEN
+    from blackjack.rules import BlackjackRules
+
+    calculator = EVCalculator(BlackjackRules(decks=6, surrender_allowed=True))
+    evs = calculator.action_evs(TEN, 4, TEN)       # Hard 16 against a ten
+    assert math.isclose(evs["S"], -0.541, abs_tol=0.002)
+    assert math.isclose(evs["H"], -0.535, abs_tol=0.002)
+    assert evs["R"] == -0.5
+    assert max(evs, key=evs.get) == "R"
+    evs = calculator.action_evs(TEN, 9, 4)         # Soft 21 is a stand
+    assert max(evs, key=evs.get) == "S"
+
+def test_house_edge_blackjack_payout_difference():
+    from blackjack.ev import EVCalculator, ACE_INDEX, TEN
+    from blackjack.rules import BlackjackRules
+
+    comp = (1, 1, 1, 1, 1, 1, 1, 1, 4, 2)
+    n = sum(comp)
+    three_to_two = EVCalculator(BlackjackRules(decks=1), composition=comp).house_edge()
+    six_to_five = EVCalculator(BlackjackRules(decks=1, blackjack_payout=1.2), composition=comp).house_edge()
+
+    # Only player naturals that the dealer does not match change with the payout
+    p_natural = 2 * comp[TEN] / n * comp[ACE_INDEX] / (n - 1)
+    rest = n - 2
+    p_dealer_natural = (comp[TEN] - 1) / rest * (comp[ACE_INDEX] - 1) / (rest - 1) * 2
+    expected = p_natural * (1 - p_dealer_natural) * 0.3 * 100
+    assert math.isclose(six_to_five - three_to_two, expected)
+
+def test_dealer_outcome_cache_matches_exact_for_large_shoe():
+    from blackjack.cards import RANKS
+    from blackjack.ev import DealerOutcomeCache, EVCalculator
+    from blackjack.rules import BlackjackRules
+
+    rules = BlackjackRules(decks=500, dealer_hits_soft_17=True)
+    cache = DealerOutcomeCache(rules, resolution=52)
+    exact = EVCalculator(rules)
+    rank_counts = [4 * 500] * len(RANKS)
+    for code, column in ((0, 0), (4, 4), (8, 8), (12, 9)):
+        probs = cache.probabilities(code, rank_counts)
+        assert math.isclose(sum(probs), 1.0)
+        assert all(abs(a - e) < 1e-3 for a, e in zip(probs, exact.dealer_probabilities(column)))
+    assert cache.misses == 1 and cache.hits == 3
+
+def test_chart_play_follows_the_chart():
+    from blackjack.ev import EVCalculator, TEN
+    from blackjack.rules import BlackjackRules
+
+    calculator = EVCalculator(BlackjackRules(decks=6))
+    # Hard 16 against a ten is RH in the basic chart: without surrender it hits, then stands
+    assert math.isclose(calculator.chart_ev(TEN, 4, TEN, "basic"), calculator.action_evs(TEN, 4, TEN)["H"])
+    # Hard 11 (6, 5) against a four is DH
+    assert math.isclose(calculator.chart_ev(4, 3, 2, "basic"), calculator.action_evs(4, 3, 2)["D"])
+
+def test_optimal_play_beats_chart_play():
+    from blackjack.ev import EVCalculator
+    from blackjack.rules import BlackjackRules
+
+    calculator = EVCalculator(BlackjackRules(decks=1), composition=(1, 1, 1, 1, 1, 1, 1, 1, 4, 2))
+    assert calculator.house_edge() <= calculator.house_edge(chart="basic") + 1e-12
@@ -0,0 +1,111 @@
+import pytest
+
+def _record(policy, stride, results, start=0.0):
+    from blackjack.history import BankrollRecorder
+
+    recorder = BankrollRecorder(policy, stride, start)
+    bankroll = start
+    for result in results:
+        bankroll += result
+        recorder.record(bankroll, result)
+    return recorder.summary()
+
+def test_stride_history_samples_every_nth_hand():
+    summary = _record("stride", 2, [1, 1, -1, 1, 1])
+    assert summary["bankroll_history"] == [2, 2, 3]     # The partial last stride ends on the final bankroll
+    assert summary["history_stride"] == 2
+
+def test_minmax_history_keeps_bucket_extremes():
+    summary = _record("minmax", 3, [5, -10, 2, 1, 1])
+    assert summary["bankroll_history"] == [-3, -1]
+    assert summary["history_min"] == [-5, -2]
+    assert summary["history_max"] == [5, -1]
+
+def test_off_history_still_tracks_accumulators():
+    summary = _record("off", 1, [10, -30, 5], start=100)
+    assert summary["bankroll_history"] == []
+    assert summary["result_sum"] == -15
+    assert summary["result_sum_sq"] == 100 + 900 + 25
+    assert summary["min_bankroll"] == 80
+    assert summary["peak_bankroll"] == 110
+    assert summary["max_drawdown"] == 30
+
+def test_unknown_history_policy():
+    from blackjack.history import BankrollRecorder
+
+    with pytest.raises(ValueError):
+        BankrollRecorder("sometimes")
+
+def test_history_file_rows_match_in_memory_history(tmp_path, monkeypatch):
+    import numpy as np
+    import blackjack.history
+    from blackjack.history import create_history_file, open_history_file
+    from blackjack.simulation import Simulator
+
+    # Flush to the file several times during the run
+    monkeypatch.setattr(blackjack.history, "FILE_FLUSH_SAMPLES", 7)
+    path = str(tmp_path / "histories.npy")
+    create_history_file(path, 2, 50, dtype=np.float64)
+
+    def run(**kwargs):
+        simulator = Simulator(seed=4)
+        simulator.setup(num_decks=2, base_bet=10, spread_name="none", compact_shoe=True)
+        return simulator.run_simulation(num_hands=100, history="stride", history_stride=2, **kwargs)
+
+    in_memory = run()
+    on_disk = run(history_file=path, history_row=1)
+    assert on_disk["bankroll_history"] == [] and on_disk["history_length"] == 50
+    histories = open_history_file(path)
+    assert histories[1].tolist() == in_memory["bankroll_history"]
+    assert np.isnan(histories[0]).all()
+
+def test_history_file_needs_sampled_policy(tmp_path):
+    from blackjack.history import BankrollRecorder
+
+    with pytest.raises(ValueError):
+        BankrollRecorder("minmax", 2, history_file=str(tmp_path / "histories.npy"))
+
+def test_analysis_reads_history_matrix(tmp_path):
+    import numpy as np
+    from blackjack.analysis import analyze_simulation_results, mean_bankroll_history
+    from blackjack.parallel import run_parallel
+
+    path = str(tmp_path / "histories.npy")
+    setup = dict(num_decks=2, base_bet=10, spread_name="none", compact_shoe=True)
+    results = run_parallel(setup, 4, num_hands=300, bankroll_limit=100, master_seed=9, max_workers=2,
+                           history="full", history_file=path)
+    histories = np.load(path, mmap_mode="r")
+    assert histories.shape == (4, 300)
+    for row, result in enumerate(results):
+        assert result["history_length"] == result["hands_played"]
+        assert histories[row, result["hands_played"] - 1] == np.float32(result["final_bankroll"])
+
+    from_results = analyze_simulation_results(results, 100)
+    from_matrix = analyze_simulation_results(histories, 100)
+    assert from_matrix["risk_of_ruin"] == from_results["risk_of_ruin"]
+    assert from_matrix["mean_profit"] == pytest.approx(from_results["mean_profit"])
+    assert mean_bankroll_history(histories)[0] == pytest.approx(np.mean(histories[:, 0]))
+
+def test_stride_history_ends_on_final_bankroll(tmp_path):
+    import numpy as np
+    from blackjack.analysis import analyze_simulation_results
+    from blackjack.batch import BatchSimulator
+    from blackjack.parallel import run_parallel
+
+    # Runs that go broke mid-stride must still end their row on the ruined bankroll
+    path = str(tmp_path / "histories.npy")
+    setup = dict(num_decks=2, base_bet=10, spread_name="none", compact_shoe=True)
+    results = run_parallel(setup, 40, num_hands=1000, bankroll_limit=150, master_seed=3, max_workers=1,
+                           history="stride", history_stride=100, history_file=path)
+    from_results = analyze_simulation_results(results, 150)
+    assert from_results["risk_of_ruin"] > 0
+    assert analyze_simulation_results(np.load(path, mmap_mode="r"), 150)["risk_of_ruin"] == from_results["risk_of_ruin"]
+
+    batch = BatchSimulator(num_shoes=40, seed=3)
+    batch.setup(num_decks=2, base_bet=10, spread_name="none")
+    batch_path = str(tmp_path / "batch.npy")
+    lanes = batch.run_simulation(num_hands=1000, bankroll_limit=150, history="stride", history_stride=100, history_file=batch_path)
+    histories = np.load(batch_path)
+    for row, result in enumerate(lanes):
+        assert histories[row, result["history_length"] - 1] == np.float32(result["final_bankroll"])
+    assert analyze_simulation_results(histories, 150)["risk_of_ruin"] == analyze_simulation_results(lanes, 150)["risk_of_ruin"]
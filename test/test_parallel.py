@@ -0,0 +1,104 @@
+SETUP = dict(num_decks=2, base_bet=10, spread_name="none", compact_shoe=True)
+
+def test_parallel_results_independent_of_worker_count():
+    from blackjack.parallel import run_parallel
+
+    serial = run_parallel(SETUP, 4, num_hands=300, master_seed=11, max_workers=1)
+    pooled = run_parallel(SETUP, 4, num_hands=300, master_seed=11, max_workers=2)
+    assert [r["final_bankroll"] for r in serial] == [r["final_bankroll"] for r in pooled]
+    assert [r["hands_played"] for r in pooled] == [300] * 4
+
+def test_parallel_runs_use_distinct_streams():
+    from blackjack.parallel import run_parallel
+
+    results = run_parallel(SETUP, 4, num_hands=300, master_seed=11, max_workers=1)
+    histories = [tuple(r["bankroll_history"]) for r in results]
+    assert len(set(histories)) == 4
+
+def test_parallel_on_result_callback():
+    from blackjack.parallel import run_parallel
+
+    seen = []
+    run_parallel(SETUP, 3, num_hands=50, max_workers=2, on_result=lambda run, result: seen.append(run))
+    assert sorted(seen) == [0, 1, 2]
+
+def test_parallel_stats_match_result_dicts():
+    from blackjack.analysis import analyze_simulation_results
+    from blackjack.parallel import run_parallel, run_parallel_stats
+
+    results = run_parallel(SETUP, 6, num_hands=200, bankroll_limit=100, master_seed=3, max_workers=1)
+    stats = run_parallel_stats(SETUP, 6, num_hands=200, bankroll_limit=100, master_seed=3, max_workers=2, chunk_size=4)
+    expected = analyze_simulation_results(results, 100)
+    actual = analyze_simulation_results(stats, 100)
+    for key in ("mean_profit", "stddev_profit", "risk_of_ruin", "min_final_bankroll", "max_final_bankroll"):
+        assert abs(actual[key] - expected[key]) < 1e-9
+
+def test_parallel_checkpoint_dir_resumes(tmp_path):
+    import os
+    from blackjack.parallel import run_parallel
+
+    first = run_parallel(SETUP, 3, num_hands=200, master_seed=4, max_workers=1, checkpoint_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["run-0.ckpt", "run-1.ckpt", "run-2.ckpt"]
+    os.remove(tmp_path / "run-1.ckpt")
+    again = run_parallel(SETUP, 3, num_hands=200, master_seed=4, max_workers=1, checkpoint_dir=str(tmp_path))
+    assert again == first
+
+def test_parallel_until_precision_risk_of_ruin():
+    from blackjack.parallel import run_parallel, run_parallel_until_precision
+
+    batches = []
+    results, precision = run_parallel_until_precision(SETUP, 30, metric="risk_of_ruin", num_hands=300, bankroll_limit=50,
+                                                      batch_runs=4, min_runs=8, max_runs=40, master_seed=6, max_workers=1,
+                                                      on_batch=lambda results, precision: batches.append(len(results)))
+    assert precision["runs"] == len(results) == batches[-1]
+    assert batches[0] == 4 and len(results) >= 8
+    low, high = precision["CI_95"]
+    assert low <= precision["estimate"] <= high
+    # Runs are seeded like one run_parallel call of the same size
+    same = run_parallel(SETUP, len(results), num_hands=300, bankroll_limit=50, master_seed=6, max_workers=1, history="full")
+    assert [r["final_bankroll"] for r in same] == [r["final_bankroll"] for r in results]
+
+def test_parallel_writes_results_store(tmp_path):
+    from blackjack.parallel import run_parallel
+    from blackjack.results import read_histories, read_summary
+
+    path = str(tmp_path / "runs.results")
+    results = run_parallel(SETUP, 3, num_hands=200, master_seed=2, max_workers=2, results_path=path)
+    summary = read_summary(path)
+    assert summary["final_bankroll"].tolist() == [r["final_bankroll"] for r in results]
+    histories = read_histories(path)
+    assert [histories[run].tolist() for run in range(3)] == [r["bankroll_history"] for r in results]
+
+def test_parallel_progress_and_cancel():
+    import multiprocessing
+    from blackjack.parallel import run_parallel
+
+    with multiprocessing.Manager() as manager:
+        progress, cancel = manager.Queue(), manager.Event()
+        results = run_parallel(SETUP, 2, num_hands=300, master_seed=1, max_workers=2, progress_queue=progress,
+                               cancel_event=cancel, progress_every=100)
+        messages = []
+        while not progress.empty():
+            messages.append(progress.get())
+        assert sorted(messages) == [("hands", run, hands) for run in (0, 1) for hands in (100, 200, 300)]
+        assert [r["hands_played"] for r in results] == [300, 300]
+
+        # Cancelling stops the running run at its next progress check and skips the rest
+        def stop_after_first(run, result):
+            cancel.set()
+
+        cancel.clear()
+        results = run_parallel(SETUP, 3, num_hands=300, master_seed=1, max_workers=1, on_result=stop_after_first,
+                               cancel_event=cancel, progress_every=100)
+        assert results[0]["hands_played"] == 300 and results[1:] == [None, None]
+
+def test_simulation_stops_when_progress_callback_asks():
+    from blackjack.simulation import Simulator
+
+    simulator = Simulator(seed=3)
+    simulator.setup(**SETUP)
+    seen = []
+    result = simulator.run_simulation(num_hands=1000, history="off", progress_every=150,
+                                      on_progress=lambda hands: seen.append(hands) or hands >= 300)
+    assert seen == [150, 300]
+    assert result["hands_played"] == 300
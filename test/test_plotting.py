@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+def test_stopped_runs_carry_their_final_bankroll():
+    from blackjack.parallel import run_parallel
+    from blackjack.plotting import aggregate_histories
+
+    aggregate = aggregate_histories([[10, 20, 30, 40], [5, -1]], stride=10)
+    assert aggregate["hands"].tolist() == [10, 20, 30, 40]
+    assert aggregate["mean"].tolist() == [7.5, 9.5, 14.5, 19.5]
+    assert aggregate["stopped"].tolist() == [0.0, 0.0, 0.5, 0.5]
+    assert aggregate["bands"][50].tolist() == [7.5, 9.5, 14.5, 19.5]
+    assert aggregate["runs"] == 2
+
+    # Recorded with stride > 1, runs that go broke mid-stride plateau at their ruined bankroll
+    setup = dict(num_decks=2, base_bet=10, spread_name="none", compact_shoe=True)
+    results = run_parallel(setup, 20, num_hands=1000, bankroll_limit=150, master_seed=3, max_workers=1,
+                           history="stride", history_stride=100)
+    assert any(result["final_bankroll"] < 0 for result in results)
+    aggregate = aggregate_histories([result["bankroll_history"] for result in results], stride=100)
+    assert aggregate["mean"][-1] == pytest.approx(np.mean([result["final_bankroll"] for result in results]))
+
+    # The trailing sample of a partial last stride is plotted at the real final hand
+    aggregate = aggregate_histories([[1, 2, 3], [1, 2, 3]], stride=100, num_hands=250)
+    assert aggregate["hands"].tolist() == [100, 200, 250]
+
+def test_downsampling_keeps_bucket_extremes():
+    from blackjack.plotting import aggregate_histories
+
+    history = np.zeros(10000)
+    history[1234] = 500.0                # A spike between two plotted points
+    aggregate = aggregate_histories([history], max_points=100)
+    assert len(aggregate["hands"]) == 100
+    assert aggregate["hands"][-1] == 10000
+    assert aggregate["mean"].max() == 0.0
+    assert aggregate["mean_max"].max() == 500.0
+
+def test_matrix_and_list_inputs_agree():
+    from blackjack.plotting import aggregate_histories
+
+    rng = np.random.default_rng(0)
+    histories = [np.cumsum(rng.normal(size=length)) for length in (300, 120, 300, 7)]
+    matrix = np.full((5, 300), np.nan)   # The last row never recorded anything
+    for row, history in enumerate(histories):
+        matrix[row, :len(history)] = history
+
+    from_lists = aggregate_histories(histories, max_points=50)
+    from_matrix = aggregate_histories(matrix, max_points=50, block_rows=2)
+    assert from_matrix["runs"] == 4
+    for key in ("hands", "mean", "mean_min", "mean_max", "stopped"):
+        assert from_matrix[key] == pytest.approx(from_lists[key])
+    for percentile in (5, 25, 50, 75, 95):
+        assert from_matrix["bands"][percentile] == pytest.approx(from_lists["bands"][percentile])
+
+def test_nothing_to_plot():
+    from blackjack.plotting import aggregate_histories
+
+    assert aggregate_histories([[], []]) is None
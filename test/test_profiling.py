@@ -0,0 +1,40 @@
+def _simulator(**kwargs):
+    from blackjack.simulation import Simulator
+
+    sim = Simulator(seed=3, **kwargs)
+    sim.setup(num_decks=2, base_bet=10, compact_shoe=True)
+    return sim
+
+def test_profiling_counts_phases_without_changing_results():
+    plain = _simulator().run_simulation(num_hands=500, history="off")
+
+    sim = _simulator()
+    profiler = sim.enable_profiling()
+    assert sim.run_simulation(num_hands=500, history="off") == plain
+
+    stats = profiler.stats()
+    assert stats["play_hand"]["calls"] == 500
+    assert stats["get_bet"]["calls"] == 500
+    assert stats["deal_card"]["calls"] >= 4 * 500
+    assert stats["update_count"]["calls"] > 0
+    assert "dealer_turn" in sim.profile_report()
+
+def test_disable_profiling_restores_methods():
+    from blackjack.simulation import Simulator
+
+    sim = _simulator(debug=True)
+    assert sim.profiler is not None
+    assert "deal_code" in sim.shoe.__dict__
+    sim.disable_profiling()
+    assert "deal_code" not in sim.shoe.__dict__
+    assert "play_hand" not in sim.__dict__
+    assert sim.profile_report() == "Profiling is not enabled"
+
+def test_profiled_simulator_checkpoints(tmp_path):
+    from blackjack.simulation import Simulator
+
+    sim = _simulator()
+    sim.enable_profiling()
+    path = str(tmp_path / "run.ckpt")
+    result = sim.run_simulation(num_hands=200, history="off", checkpoint_path=path)
+    assert Simulator.resume(path) == result
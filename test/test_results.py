@@ -0,0 +1,37 @@
+def test_results_store_round_trip(tmp_path):
+    from blackjack.results import ResultsWriter, read_histories, read_meta, read_summary
+
+    path = str(tmp_path / "runs.results")
+    results = [{"hands_played": 10, "final_bankroll": float(run), "House Advantage (%)": 0.5 * run,
+                "bankroll_history": [float(run)] * (run + 1), "history_policy": "full"} for run in range(5)]
+    with ResultsWriter(path, meta={"num_hands": 10}, chunk_runs=2) as writer:
+        for run in (3, 0, 4, 1, 2):
+            writer.add(run, results[run])
+
+    summary = read_summary(path)
+    assert summary["run"].tolist() == [0, 1, 2, 3, 4]
+    assert summary["final_bankroll"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert summary["house_edge"].tolist() == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert "history_policy" not in summary
+    assert read_meta(path) == {"num_hands": 10}
+
+    histories = read_histories(path, runs=[1, 4])
+    assert sorted(histories) == [1, 4]
+    assert histories[4].tolist() == [4.0] * 5
+
+    # Appending a run again keeps the latest copy
+    with ResultsWriter(path) as writer:
+        writer.add(0, dict(results[0], final_bankroll=-1.0))
+    assert read_summary(path)["final_bankroll"].tolist() == [-1.0, 1.0, 2.0, 3.0, 4.0]
+
+def test_history_sampling_and_csv(tmp_path):
+    import csv
+    from blackjack.results import read_histories, write_results, write_summary_csv
+
+    results = [{"hands_played": 6, "final_bankroll": 1.0, "bankroll_history": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]}]
+    write_results(results, str(tmp_path / "sampled"), history_every=2)
+    assert read_histories(str(tmp_path / "sampled"))[0].tolist() == [2.0, 4.0, 6.0]
+
+    write_summary_csv(results, str(tmp_path / "runs.csv"))
+    with open(tmp_path / "runs.csv", newline="") as f:
+        assert list(csv.DictReader(f)) == [{"run": "0", "hands_played": "6", "final_bankroll": "1.0"}]
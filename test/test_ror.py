@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+SETUP = dict(num_decks=2, base_bet=10, spread_name="none")
+
+def test_trials_stop_at_ruin_goal_or_limit():
+    from blackjack.ror import HAND_LIMIT, RUINED, WON, run_ror_trials
+
+    outcome, hands, finals = run_ror_trials(SETUP, 300, 50, win_goal=50, max_hands=40, seed=1)
+    assert set(outcome.tolist()) <= {RUINED, WON, HAND_LIMIT}
+    assert (finals[outcome == RUINED] <= 0).all()
+    assert (finals[outcome == WON] >= 100).all()
+    limited = outcome == HAND_LIMIT
+    assert (hands[limited] == 40).all() and ((finals[limited] > 0) & (finals[limited] < 100)).all()
+    assert (hands[~limited] <= 40).all()
+
+def test_trials_need_a_stopping_rule():
+    from blackjack.ror import run_ror_trials
+
+    with pytest.raises(ValueError):
+        run_ror_trials(SETUP, 10, 100)
+    with pytest.raises(ValueError):
+        run_ror_trials(SETUP, 10, 0, max_hands=10)
+
+def test_risk_of_ruin_report_independent_of_workers():
+    from blackjack.ror import risk_of_ruin
+
+    batches = []
+    serial = risk_of_ruin(SETUP, 500, 60, max_hands=200, master_seed=4, trials_per_batch=200, max_workers=1,
+                          on_batch=lambda report: batches.append(report["trials"]))
+    pooled = risk_of_ruin(SETUP, 500, 60, max_hands=200, master_seed=4, trials_per_batch=200, max_workers=2)
+    assert batches == [200, 400, 500]
+    assert serial["ruined"] == pooled["ruined"] and serial["ruin_hands"].tolist() == pooled["ruin_hands"].tolist()
+    assert serial["ruined"] + serial["won"] + serial["hand_limit"] == 500
+    low, high = serial["CI_95"]
+    assert low < serial["risk_of_ruin"] < high
+    assert len(serial["ruin_hands"]) == serial["ruined"]
+    assert np.all(np.diff(serial["ruin_hands"]) >= 0)
+    assert serial["ruin_hands_percentiles"][50] == np.median(serial["ruin_hands"])
+
+def test_cancelled_study_reports_finished_trials():
+    import threading
+    from blackjack.ror import risk_of_ruin
+
+    cancel = threading.Event()
+    report = risk_of_ruin(SETUP, 600, 60, max_hands=100, trials_per_batch=200, max_workers=1,
+                          on_batch=lambda report: cancel.set(), cancel_event=cancel)
+    assert report["trials"] == 200
+
+def test_risk_of_ruin_matches_scalar_runs_with_spread():
+    from blackjack.parallel import run_parallel_stats
+    from blackjack.ror import risk_of_ruin
+
+    # Same spread, bankroll and hand limit played by the batch lanes and by Simulator runs
+    setup = dict(SETUP, spread_name="basic")
+    report = risk_of_ruin(setup, 2000, 200, max_hands=300, master_seed=2, max_workers=1)
+    stats = run_parallel_stats(setup, 400, num_hands=300, bankroll_limit=200, master_seed=2, max_workers=1)
+    assert abs(report["risk_of_ruin"] - stats.ruin_count / stats.count) < 0.1
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+SETUP = dict(num_decks=2, base_bet=10, spread_name="none", compact_shoe=True)
+
+def test_shuffle_matrix_rows_are_full_shoes():
+    from blackjack.shuffles import shuffle_matrix
+
+    shoes = shuffle_matrix(50, 2, rng=3)
+    assert shoes.shape == (50, 104) and shoes.dtype == np.uint8
+    for shoe in shoes:
+        assert np.bincount(shoe, minlength=13).tolist() == [8] * 13
+    assert len({shoe.tobytes() for shoe in shoes}) == 50
+    assert (shuffle_matrix(50, 2, rng=3) == shoes).all()
+
+def test_compact_shoe_replays_bank_in_order(tmp_path):
+    import pickle
+    from blackjack.cards import CompactShoe
+    from blackjack.shuffles import ShuffleBank, create_shuffle_bank
+
+    path = str(tmp_path / "bank.npy")
+    bank = create_shuffle_bank(path, 3, 1, seed=8, block=2)
+    shoe = CompactShoe(1, shuffles=ShuffleBank(path))
+    assert list(shoe.cards) == bank[0].tolist()
+    for row in (1, 2, 0):                   # Wraps around after the last shoe
+        shoe.reshuffle()
+        assert list(shoe.cards) == bank[row].tolist()
+
+    restored = pickle.loads(pickle.dumps(shoe))
+    restored.reshuffle()
+    assert list(restored.cards) == bank[1].tolist()
+
+    with pytest.raises(ValueError):
+        CompactShoe(2, shuffles=ShuffleBank(path))
+
+def test_simulations_replay_the_same_shoes(tmp_path):
+    from blackjack.shuffles import create_shuffle_bank
+    from blackjack.simulation import Simulator
+
+    path = str(tmp_path / "bank.npy")
+    create_shuffle_bank(path, 200, 2, seed=1)
+
+    def run(seed, shuffles):
+        simulator = Simulator(seed=seed)
+        simulator.setup(shuffles=shuffles, **SETUP)
+        return simulator.run_simulation(num_hands=2000, history="off")["final_bankroll"]
+
+    assert run(1, path) == run(2, path)
+    assert run(5, "batch") == run(5, "batch")
+
+    simulator = Simulator(seed=1)
+    with pytest.raises(ValueError):
+        simulator.setup(shuffles="batch", **dict(SETUP, compact_shoe=False))
+
+def test_compare_replays_shuffle_bank(tmp_path):
+    from blackjack.compare import compare_configurations
+    from blackjack.shuffles import create_shuffle_bank
+
+    path = str(tmp_path / "bank.npy")
+    create_shuffle_bank(path, 100, 2, seed=2)
+    configs = [SETUP, dict(SETUP, strategy_name="deviations")]
+    first = compare_configurations(configs, num_hands=500, seed=1, shuffles=path)
+    second = compare_configurations(configs, num_hands=500, seed=2, shuffles=path)
+    assert first["differences"][0]["mean"] == second["differences"][0]["mean"]
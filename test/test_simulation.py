@@ -155,4 +155,160 @@ def test_insurance_win():
     with patch.object(sim.shoe, 'deal_card', side_effect=deal_sequence):
         result = sim.play_hand()
         # If player takes insurance, and dealer has blackjack => push
-        assert result == 0.0
\ No newline at end of file
+        assert result == 0.0
+
+def test_compact_shoe_simulation():
+    from blackjack.simulation import Simulator
+
+    sim = Simulator()
+    sim.setup(num_decks=2, num_hands=2000, compact_shoe=True)
+    result = sim.run_simulation()
+    assert result["hands_played"] == 2000
+    assert len(result["bankroll_history"]) == 2000
+
+
+def _setup_simulator(**kwargs):
+    from blackjack.simulation import Simulator
+
+    sim = Simulator()
+    sim.setup(num_decks=6, base_bet=10, spread_name="none", **kwargs)
+    return sim
+
+def test_hand_totals_incremental():
+    from blackjack.hand import Hand, BUSTED, ACTIVE
+    from blackjack.cards import RANK_CODES
+
+    hand = Hand()
+    hand.start(RANK_CODES["A"], RANK_CODES["6"])
+    assert (hand.total, hand.soft, hand.pair) == (17, True, False)
+    hand.add(RANK_CODES["9"])
+    assert (hand.total, hand.soft, hand.status) == (16, False, ACTIVE)
+    hand.add(RANK_CODES["K"])
+    assert hand.status == BUSTED
+
+    hand.start(RANK_CODES["8"], RANK_CODES["8"])
+    assert hand.pair and hand.pair_code() == RANK_CODES["8"]
+    assert hand.status == ACTIVE
+
+def test_split_hands_both_play():
+    from blackjack.cards import Card
+
+    sim = _setup_simulator()
+    # Player 8,8 vs dealer 6 (hole 10): split, each hand gets a 10 and stands on 18
+    deal_sequence = [
+        Card("8","♠"), Card("8","♥"),   # Player
+        Card("6","♦"), Card("10","♣"),  # Dealer
+        Card("10","♦"), Card("K","♣"),  # One card for each split hand
+        Card("9","♠"),                  # Dealer draws to 25
+    ]
+    with patch.object(sim.shoe, 'deal_card', side_effect=deal_sequence):
+        result = sim.play_hand()
+    assert result == 20
+    assert sim.amount_bet == 20
+
+def test_run_simulation_counts_bankroll_once():
+    sim = _setup_simulator()
+    results = []
+    play_hand = sim.play_hand
+
+    def recording_play_hand():
+        results.append(play_hand())
+        return results[-1]
+
+    sim.play_hand = recording_play_hand
+    result = sim.run_simulation(num_hands=500)
+    assert result["final_bankroll"] == pytest.approx(sum(results))
+
+def test_setup_surrender():
+    from blackjack.cards import Card
+
+    sim = _setup_simulator(surrender_allowed=True)
+    deal_sequence = [
+        Card("9","♠"), Card("7","♥"),     # Player hard 16
+        Card("10","♦"), Card("4","♣"),    # Dealer shows 10
+        Card("5","♠"),                    # Dealer still draws to 19
+    ]
+    with patch.object(sim.shoe, 'deal_card', side_effect=deal_sequence):
+        result = sim.play_hand()
+    assert result == -5
+
+def test_seeded_simulators_reproducible():
+    import numpy as np
+    from blackjack.simulation import Simulator
+
+    def run(**kwargs):
+        sim = Simulator(**kwargs)
+        sim.setup(num_decks=2, num_hands=500, compact_shoe=True)
+        return sim.run_simulation()["bankroll_history"]
+
+    assert run(seed=3) == run(seed=3)
+    assert run(seed=3) != run(seed=4)
+    assert run(rng=np.random.default_rng(3)) == run(rng=np.random.default_rng(3))
+
+def test_expected_settlement_reduces_variance():
+    from blackjack.simulation import Simulator
+
+    stddevs = {}
+    for settlement in ("sampled", "expected"):
+        sim = Simulator(seed=5)
+        sim.setup(num_decks=6, base_bet=10, spread_name="none", compact_shoe=True, settlement=settlement)
+        result = sim.run_simulation(num_hands=3000, history="off")
+        assert result["hands_played"] == 3000
+        stddevs[settlement] = result["stddev_result"]
+    assert stddevs["expected"] < 0.8 * stddevs["sampled"]
+
+def test_unknown_settlement():
+    import pytest
+    from blackjack.simulation import Simulator
+
+    with pytest.raises(ValueError):
+        Simulator().setup(settlement="guess")
+
+def _checkpointed_setup(rng_kind):
+    import numpy as np
+    from blackjack.simulation import Simulator
+
+    rng = np.random.default_rng(9) if rng_kind == "numpy" else None
+    sim = Simulator(seed=9, rng=rng)
+    sim.setup(num_decks=2, base_bet=10, strategy_name="deviations", compact_shoe=rng_kind == "numpy")
+    return sim
+
+def test_resume_from_checkpoint_is_bit_identical(tmp_path, monkeypatch):
+    import shutil
+    from blackjack.simulation import Simulator
+
+    for rng_kind in ("random", "numpy"):
+        expected = _checkpointed_setup(rng_kind).run_simulation(num_hands=3000, history="stride", history_stride=7)
+
+        # Keep a copy of every checkpoint, then resume from the first as if the run had crashed
+        save = Simulator.save_checkpoint
+        def save_copy(self, path):
+            save(self, path)
+            shutil.copy(path, f"{path}.{self.hands_played}")
+        monkeypatch.setattr(Simulator, "save_checkpoint", save_copy)
+        path = str(tmp_path / f"{rng_kind}.ckpt")
+        finished = _checkpointed_setup(rng_kind).run_simulation(num_hands=3000, history="stride", history_stride=7,
+                                                                checkpoint_path=path, checkpoint_every=1000)
+        monkeypatch.undo()
+
+        assert finished == expected
+        assert Simulator.resume(f"{path}.1000") == expected
+        assert Simulator.resume(path) == expected         # Finished run: results only
+
+def test_run_until_precision_stops_at_target():
+    from blackjack.simulation import Simulator
+
+    sim = Simulator(seed=12)
+    sim.setup(num_decks=6, base_bet=10, spread_name="none", compact_shoe=True)
+    result = sim.run_until_precision(2.0, batch_hands=1000, min_batches=5, max_hands=200000)
+    assert result["converged"]
+    assert result["half_width"] <= 2.0
+    assert result["batches"] >= 5
+    assert result["hands_played"] == result["batches"] * 1000
+    low, high = result["CI_95"]
+    assert low < result["House Advantage (%)"] < high
+
+    capped = Simulator(seed=12)
+    capped.setup(num_decks=6, base_bet=10, spread_name="none", compact_shoe=True)
+    result = capped.run_until_precision(0.001, batch_hands=1000, max_hands=2500)
+    assert not result["converged"] and result["hands_played"] == 2500
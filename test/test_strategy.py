@@ -41,3 +41,89 @@ def test_basic_strategy_pair_8s_vs_dealer_10():
     dealer_up = Card("K","♦")  # treat K as 10
     action = strategy.decide_player_action(player_hand, dealer_up, rules, 1)
     assert action == "P"  # or "PH" if your chart says so
+
+def test_count_tags_from_config():
+    from blackjack.strategy import BasicStrategy
+    from blackjack.cards import Card
+
+    strategy = BasicStrategy(bet=15, strategy_name=None, spread_name=None, counting_system="wong halves")
+    for rank in ["2", "5", "9", "K", "A"]:
+        strategy.update_count(Card(rank, "♠"))
+    # 0.5 + 1.5 - 0.5 - 1 - 1
+    assert strategy.running_count == -0.5
+
+def test_unknown_counting_system():
+    import pytest
+    from blackjack.strategy import BasicStrategy
+
+    with pytest.raises(ValueError):
+        BasicStrategy(bet=15, strategy_name=None, spread_name=None, counting_system="rkeo")
+
+def test_deviation_layer_lookup():
+    from blackjack.strategy import BasicStrategy
+    from blackjack.cards import Card
+    from blackjack.rules import BlackjackRules
+
+    strategy = BasicStrategy(bet=15, strategy_name="deviations", spread_name=None)
+    rules = BlackjackRules(6)
+    player_hand = [Card("10","♠"), Card("6","♥")]  # hard 16
+    dealer_up = Card("K", "♦")
+
+    for tc in (-9, -6, 0, 3, 6, 9):
+        strategy.running_count = tc * 2
+        clamped = min(max(tc, -6), 6)
+        expected = strategy._all_charts[clamped + 6][0][8][8]
+        assert strategy.decide_player_action(player_hand, dealer_up, rules, 2) == expected
+
+def test_multi_card_ace_hand_is_hard():
+    from blackjack.strategy import BasicStrategy
+    from blackjack.cards import Card
+    from blackjack.rules import BlackjackRules
+
+    strategy = BasicStrategy(bet=15, strategy_name=None, spread_name="basic")
+    rules = BlackjackRules(6)
+
+    # A,6,9 is a hard 16 => stand vs 2 like any other hard 16
+    player_hand = [Card("A","♠"), Card("6","♥"), Card("9","♣")]
+    dealer_up = Card("2", "♦")
+    assert strategy.decide_player_action(player_hand, dealer_up, rules, 1) == "S"
+
+def test_compiled_ramp_matches_threshold_scan():
+    import math
+    from blackjack.cache import load_config
+    from blackjack.strategy import BasicStrategy, SPREAD_CONFIG, compile_ramp
+
+    # Unsorted on purpose: the last threshold reached in list order wins
+    data = {"odd": {"thresholds": [{"count": -999, "bet": 0}, {"count": 2, "bet": 4}, {"count": 1, "bet": 3}, {"count": 5, "bet": 8}]}}
+    low, multipliers = compile_ramp(data, "odd")
+    for tc in (-1500, -999, -3, 0, 1, 2, 3, 5, 40):
+        expected = 1
+        for x in data["odd"]["thresholds"]:
+            if tc >= x["count"]:
+                expected = x["bet"]
+        assert multipliers[min(max(tc - low, 0), len(multipliers) - 1)] == expected
+
+    strategy = BasicStrategy(bet=10, strategy_name=None, spread_name="basic")
+    for running_count, decks in ((-7, 2.5), (-1, 3), (0, 6), (5, 2), (9, 0.5), (100, 1)):
+        strategy.running_count = running_count
+        tc = math.floor(strategy.get_true_count(decks))
+        expected = 1
+        for x in load_config(SPREAD_CONFIG)["basic"]["thresholds"]:
+            if tc >= x["count"]:
+                expected = x["bet"]
+        assert strategy.get_bet(decks) == expected * 10
+
+def test_count_record_insurance_and_layers():
+    from blackjack.strategy import BasicStrategy, LAYER_SIZE
+
+    strategy = BasicStrategy(bet=15, strategy_name="deviations", spread_name="none", insurance_count_threshold=3)
+    strategy.running_count = 5.9
+    assert not strategy.take_insurance(2)        # True count 2.95 floors to 2
+    strategy.running_count = 6
+    assert strategy.take_insurance(2)
+    assert strategy.count_record(2)[2] == (3 + 6) * LAYER_SIZE
+    strategy.running_count = -100
+    assert strategy.count_record(2) == (1, False, 0)
+
+    strategy.bet = 20                            # Bet changes apply without recompiling
+    assert strategy.get_bet(2) == 20
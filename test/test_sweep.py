@@ -0,0 +1,43 @@
+SWEEP = {
+    "num_hands": 200,
+    "seed": 3,
+    "base": {"base_bet": 10, "spread_name": "none"},
+    "grid": {"decks": [1, 2], "dealer_hits_soft_17": [True, False], "strategy": ["basic"]},
+}
+
+def test_expand_grid_maps_axes_to_setup_arguments():
+    from blackjack.sweep import expand_grid
+
+    cells = expand_grid(SWEEP)
+    assert len(cells) == 4
+    assert cells[0] == {"compact_shoe": True, "base_bet": 10, "spread_name": "none", "num_decks": 1,
+                        "dealer_hits_soft_17": True, "strategy_name": "basic"}
+    assert [cell["num_decks"] for cell in cells] == [1, 1, 2, 2]
+
+def test_sweep_skips_finished_cells(tmp_path):
+    from blackjack.sweep import read_results, run_sweep
+
+    output = str(tmp_path / "sweep.csv")
+    calls = []
+    rows = run_sweep(SWEEP, output, max_workers=1, on_cell=lambda row, done, total: calls.append((done, total)))
+    assert calls == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert [row["hands_played"] for row in rows] == [200] * 4
+    assert rows[0]["house_edge_CI_low"] < rows[0]["house_edge"] < rows[0]["house_edge_CI_high"]
+
+    # Extending an axis only runs the new cells; existing cells keep their seeds and results
+    extended = dict(SWEEP, grid=dict(SWEEP["grid"], decks=[1, 2, 6]))
+    calls.clear()
+    more = run_sweep(extended, output, max_workers=2, on_cell=lambda row, done, total: calls.append((done, total)))
+    assert [done for done, _ in calls] == [5, 6]
+    assert len(more) == 6 and len(read_results(output)) == 6
+    assert [row["final_bankroll"] for row in more[:4]] == [row["final_bankroll"] for row in rows]
+    assert more[0]["dealer_hits_soft_17"] is True and more[0]["cell"] == rows[0]["cell"]
+
+def test_sweep_rejects_mismatched_results_file(tmp_path):
+    import pytest
+    from blackjack.sweep import run_sweep
+
+    output = str(tmp_path / "sweep.csv")
+    run_sweep(dict(SWEEP, grid={"decks": [1]}), output, max_workers=1)
+    with pytest.raises(ValueError):
+        run_sweep(SWEEP, output, max_workers=1)